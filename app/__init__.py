@@ -1,14 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware # Import CORSMiddleware
-from app.utils.db import engine, Base
+from app.utils.db import engine, async_engine, Base
 from app.api import question_router
 from app.config.config import Config
+from app.core import llm_service
+from app.core.audio_service import transcode_pool
+from app.core import kafka_producer_service
+from app.core.outbox_relay import outbox_relay
+from app.core.voice_answer_worker import voice_answer_worker
+from app.core.daily_question_scheduler import daily_question_scheduler
+from app.core import question_cache
+from app.core.http_clients import http_clients
+from app.core import user_service
+from app.utils import security
+from app.core import embedding_store
+from app.core import question_dedup
 
 # 모든 모델을 임포트하여 Base.metadata에 등록
 from app.models.question import Question, Answer
+from app.models.outbox import OutboxEvent
+from app.models.voice_answer_job import VoiceAnswerJob
+from app.models.embedding import StoredEmbedding
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 프로세스 전역 OpenAI 비동기 클라이언트 (STT, 임베딩) 생성
+    llm_service.init_openai_client()
+    # 업스트림(Dify, user-service, 음성 분석)별 공유 HTTP 클라이언트 생성
+    http_clients.start()
+    # 오디오 트랜스코딩 프로세스 풀 시작
+    transcode_pool.start()
+    # 프로세스 전역 Kafka 프로듀서 시작 (종료 시에만 flush)
+    kafka_producer_service.start_producer()
+    # outbox에 쌓인 점수 업데이트 이벤트를 Kafka로 발행하는 relay 시작
+    if Config.OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+    # 비동기 모드 음성 답변 작업 워커 시작
+    await voice_answer_worker.start()
+    # 다음 날 질문 사전 생성 스케줄러 시작
+    if Config.PREGENERATE_ENABLED:
+        await daily_question_scheduler.start()
+    # 다른 워커/인스턴스의 질문 수정/삭제 알림을 받아 질문 캐시 무효화
+    if Config.QUESTION_CACHE_ENABLED and Config.QUESTION_CACHE_INVALIDATION_ENABLED:
+        await question_cache.invalidation_listener.start()
+    yield
+    await question_cache.invalidation_listener.stop()
+    await daily_question_scheduler.stop()
+    await voice_answer_worker.stop()
+    outbox_relay.stop()
+    kafka_producer_service.stop_producer()
+    transcode_pool.stop()
+    await http_clients.close()
+    await llm_service.close_openai_client()
+    await async_engine.dispose()
 
 def create_app():
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     # Add CORS middleware
     origins = ["*"]
@@ -19,6 +67,7 @@ def create_app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Location", "Retry-After"], # 브라우저 클라이언트가 페이지네이션 커서 등을 읽을 수 있도록 노출
     )
 
     app.config = Config()
@@ -31,4 +80,19 @@ def create_app():
     def read_root():
         return {"message": "Welcome to the Daily Question Service"}
 
+    @app.get("/internal/metrics")
+    def read_metrics():
+        return {
+            "outbox_relay": outbox_relay.metrics(),
+            "transcode_pool": transcode_pool.stats(),
+            "voice_answer_jobs": voice_answer_worker.stats(),
+            "daily_question_pregeneration": daily_question_scheduler.stats(),
+            "question_cache": question_cache.stats(),
+            "http_clients": http_clients.stats(),
+            "user_cache": user_service.stats(),
+            "token_cache": security.token_cache_stats(),
+            "embedding_store": embedding_store.stats(),
+            "question_dedup": question_dedup.stats(),
+        }
+
     return app
\ No newline at end of file
@@ -1,24 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import datetime
 
 from app.schemas import question_schema
-from app.utils.db import get_db
+from app.utils.db import get_db, get_async_db
 from app.config.config import Config
 from app.helper import question_helper
 from app.core.s3_service import S3Service
 from app.core import crud_service # crud_service 임포트 추가
+from app.core import async_crud_service # async 라우트는 AsyncSession 사용
+from app.core.audio_service import transcode_pool, TranscodeQueueFullError, AudioTooLargeError
 from fastapi.security import HTTPBearer
 from app.utils.security import decode_access_token
+from app.utils.json_records import iter_json_array, iter_ndjson
+from app.utils.pagination import InvalidCursorError, decode_cursor, clamp_page_size, optional, paginate
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor" # 다음 페이지 커서 (마지막 페이지면 헤더 없음)
 
 oauth2_scheme = HTTPBearer()
 
 async def get_current_user_validated(token: str = Depends(oauth2_scheme)):
     payload = decode_access_token(token.credentials)
-    user_id: int = payload.get("sub") # Assuming user_id is stored in the token
-    print(f"[DEBUG] Extracted user_id from token: {user_id}")
-    if user_id is None:
+    sub = payload.get("sub") # Assuming user_id is stored in the token
+    print(f"[DEBUG] Extracted user_id from token: {sub}")
+    # sub 클레임은 문자열이므로 여기서 한 번만 정수로 변환 (asyncpg는 Integer 컬럼에 문자열을 받지 않음)
+    try:
+        user_id = int(sub)
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="유효하지 않은 인증 토큰입니다.",
@@ -31,9 +43,28 @@ router = APIRouter(
     tags=["Questions"]
 )
 
+def parse_cursor(cursor: Optional[str], *parsers) -> Optional[tuple]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, *parsers)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+def listing_response(content, next_cursor: Optional[str] = None) -> ORJSONResponse:
+    # 이미 응답 스키마와 같은 키의 dict이므로 response_model 재검증 없이 orjson으로 한 번만 직렬화
+    # (Response를 직접 반환하면 FastAPI가 검증/직렬화를 건너뜀. response_model은 문서화 용도로 유지)
+    response = ORJSONResponse(content=content)
+    set_next_cursor(response, next_cursor)
+    return response
+
 @router.get("/daily-questions", response_model=question_schema.Question)
 async def get_daily_question(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_validated),
     user_id: Optional[int] = None # New optional user_id parameter
 ):
@@ -50,36 +81,105 @@ async def get_daily_question(
 @router.get("/daily-questions/history", response_model=List[question_schema.Question])
 async def get_daily_questions_by_date_range(
     user_id: int,
+    response: Response,
     start_date: Optional[datetime.date] = None,
     end_date: Optional[datetime.date] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None, # 이전 응답의 X-Next-Cursor 값
+    limit: int = Config.DEFAULT_PAGE_SIZE,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    questions = crud_service.get_questions_by_user_and_date_range(
-        db=db, user_id=user_id, start_date=start_date, end_date=end_date
+    # 날짜 범위를 지정하지 않으면 daily_date가 없는 질문도 날짜가 있는 질문 뒤에 포함됨
+    page_size = clamp_page_size(limit)
+    questions = await async_crud_service.get_questions_by_user_and_date_range(
+        db=db, user_id=user_id, start_date=start_date, end_date=end_date,
+        after=parse_cursor(cursor, optional(datetime.date.fromisoformat), int),
+        limit=page_size + 1 # 다음 페이지 존재 여부 확인용으로 한 행 더 조회
     )
-    return questions
+    page, next_cursor = paginate(questions, page_size, lambda question: (question.daily_date, question.id))
+    set_next_cursor(response, next_cursor)
+    return page
 
 @router.post("/", response_model=question_schema.Question)
-def create_question(question: question_schema.QuestionCreate, db: Session = Depends(get_db)):
-    return crud_service.create_question(db=db, question=question) # crud_service로 변경
+async def create_question(question: question_schema.QuestionCreate, db: AsyncSession = Depends(get_async_db)):
+    return await question_helper.create_question_with_embeddings(db=db, question=question) # 임베딩을 함께 저장
+
+@router.post("/bulk", response_model=question_schema.QuestionImportSummary)
+async def import_questions(
+    request: Request,
+    batch_size: int = Config.QUESTION_IMPORT_BATCH_SIZE,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 본문: QuestionCreate 객체의 JSON 배열, 또는 Content-Type이 application/x-ndjson이면 한 줄에 하나씩 (스트리밍 처리)
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        records = iter_ndjson(request.stream())
+    else:
+        try:
+            records = iter_json_array(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"요청 본문을 해석할 수 없습니다: {e}")
+    return await question_helper.import_questions(db=db, records=records, batch_size=batch_size)
 
 @router.get("/", response_model=List[question_schema.Question])
-def read_questions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud_service.read_questions(db=db, skip=skip, limit=limit) # crud_service로 변경
+def read_questions(
+    response: Response,
+    cursor: Optional[str] = None, # 이전 응답의 X-Next-Cursor 값
+    limit: int = Config.DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_db)
+):
+    page_size = clamp_page_size(limit)
+    after = parse_cursor(cursor, int)
+    questions = crud_service.read_questions(
+        db=db, limit=page_size + 1, after_id=after[0] if after else None
+    )
+    page, next_cursor = paginate(questions, page_size, lambda question: (question.id,))
+    set_next_cursor(response, next_cursor)
+    return page
 
 @router.get("/answers", response_model=List[question_schema.Answer])
 def get_answers_by_user(
     user_id: int,
     start_date: Optional[datetime.datetime] = None,
     end_date: Optional[datetime.datetime] = None,
+    cursor: Optional[str] = None, # 이전 응답의 X-Next-Cursor 값
+    limit: int = Config.DEFAULT_PAGE_SIZE,
     db: Session = Depends(get_db)
 ):
-    answers = crud_service.get_answers_by_user(db=db, user_id=user_id, start_date=start_date, end_date=end_date) # crud_service로 변경
-    return answers
+    page_size = clamp_page_size(limit)
+    answers = crud_service.get_answers_by_user(
+        db=db, user_id=user_id, start_date=start_date, end_date=end_date,
+        after=parse_cursor(cursor, datetime.datetime.fromisoformat, int),
+        limit=page_size + 1 # 다음 페이지 존재 여부 확인용으로 한 행 더 조회
+    )
+    page, next_cursor = paginate(answers, page_size, lambda answer: (answer["created_at"], answer["id"]))
+    return listing_response(page, next_cursor)
+
+@router.post("/answers/bulk", response_model=List[question_schema.UserAnswers])
+async def get_answers_by_users(query: question_schema.AnswersBulkQuery, db: AsyncSession = Depends(get_async_db)):
+    # 대시보드용: 여러 사용자의 질문별 최신 답변을 한 번의 쿼리로 조회하여 사용자별로 묶어 반환
+    user_ids = list(dict.fromkeys(query.user_ids)) # 요청 순서를 유지하며 중복 제거
+    if len(user_ids) > Config.BULK_ANSWERS_MAX_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"한 번에 조회할 수 있는 사용자는 최대 {Config.BULK_ANSWERS_MAX_USERS}명입니다."
+        )
+    per_user_limit = query.per_user_limit or Config.BULK_ANSWERS_DEFAULT_PER_USER
+    per_user_limit = max(1, min(per_user_limit, Config.BULK_ANSWERS_MAX_PER_USER))
+
+    answers = await async_crud_service.get_latest_answers_by_users(
+        db=db, user_ids=user_ids, start_date=query.start_date, end_date=query.end_date, per_user_limit=per_user_limit
+    )
+    answers_by_user = {user_id: [] for user_id in user_ids}
+    for answer in answers:
+        answers_by_user[answer["user_id"]].append(answer)
+    return listing_response([
+        {"user_id": user_id, "answers": user_answers}
+        for user_id, user_answers in answers_by_user.items()
+    ])
 
 @router.get("/{question_id}", response_model=question_schema.Question)
 def read_question(question_id: int, db: Session = Depends(get_db)):
-    question = crud_service.read_question(db=db, question_id=question_id) # crud_service로 변경
+    question = crud_service.read_question_cached(db=db, question_id=question_id) # read-through 캐시 사용
     if question is None:
         raise HTTPException(status_code=404, detail="Question not found")
     return question
@@ -112,19 +212,57 @@ def delete_answer(answer_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Answer not found")
     return db_answer
 
-@router.post("/voice-answers", response_model=question_schema.Answer)
+@router.post(
+    "/voice-answers",
+    response_model=question_schema.Answer,
+    responses={status.HTTP_202_ACCEPTED: {"model": question_schema.VoiceAnswerJob}}
+)
 async def upload_voice_answer(
     question_id: int = Form(...),
     audio_file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    async_mode: bool = Form(False), # True이면 업로드만 저장하고 202 + 작업 ID를 바로 반환
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_validated)
 ):
-    db_answer, error_message = await question_helper.upload_and_save_voice_answer(
-        db=db,
-        question_id=question_id,
-        user_id=current_user_id,
-        audio_file=audio_file
-    )
+    if async_mode:
+        try:
+            job = await question_helper.enqueue_voice_answer_job(
+                db=db,
+                question_id=question_id,
+                user_id=current_user_id,
+                audio_file=audio_file
+            )
+        except AudioTooLargeError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(question_schema.VoiceAnswerJob.model_validate(job)),
+            headers={"Location": f"/questions/voice-answers/jobs/{job.id}"}
+        )
+
+    # 트랜스코딩 풀이 포화 상태면 업로드를 처리하기 전에 바로 거절
+    if transcode_pool.is_saturated():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="오디오 변환 작업이 많아 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "5"}
+        )
+
+    try:
+        db_answer, error_message = await question_helper.upload_and_save_voice_answer(
+            db=db,
+            question_id=question_id,
+            user_id=current_user_id,
+            audio_file=audio_file
+        )
+    except TranscodeQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except AudioTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     if error_message:
         print(f"Error message from helper: {error_message}") # Debugging line
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_message)
@@ -133,4 +271,16 @@ async def upload_voice_answer(
     if db_answer is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Answer could not be created or found.")
         
-    return db_answer
\ No newline at end of file
+    return db_answer
+
+@router.get("/voice-answers/jobs/{job_id}", response_model=question_schema.VoiceAnswerJob)
+def get_voice_answer_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_validated)
+):
+    job = crud_service.get_voice_answer_job(db=db, job_id=job_id)
+    # 다른 사용자의 작업은 존재 여부도 노출하지 않음
+    if job is None or job.user_id != current_user_id:
+        raise HTTPException(status_code=404, detail="Voice answer job not found")
+    return job
@@ -3,11 +3,121 @@ import os
 class Config:
     PHASE = 'default'
     DATABASE_URL = os.environ.get('DATABASE_URL')
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL') # 없으면 DATABASE_URL을 postgresql+asyncpg로 변환하여 사용
+    # DB 커넥션 풀 설정 (동기 엔진: 동기 라우트/outbox relay, 비동기 엔진: async 라우트/백그라운드 작업)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', '10'))
+    ASYNC_DB_MAX_OVERFLOW = int(os.environ.get('ASYNC_DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT_SECONDS = float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', '30'))
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    # OpenAI 비동기 클라이언트 (STT, 임베딩) 커넥션 풀/타임아웃/재시도 설정
+    OPENAI_TIMEOUT_SECONDS = float(os.environ.get('OPENAI_TIMEOUT_SECONDS', '60'))
+    OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('OPENAI_CONNECT_TIMEOUT_SECONDS', '5'))
+    OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', '3'))
+    OPENAI_MAX_CONNECTIONS = int(os.environ.get('OPENAI_MAX_CONNECTIONS', '100'))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '20'))
     DIFY_APP_API_KEY = os.environ.get('DIFY_APP_API_KEY')
     USER_SERVICE_URL = os.environ.get('USER_SERVICE_URL', 'http://localhost:8000')
+    # user-service 사용자 검증 결과 캐시 설정
+    TRUST_JWT_SUB = os.environ.get('TRUST_JWT_SUB', 'false').lower() == 'true' # True면 user-service 조회 없이 JWT sub를 신뢰
+    USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', '10000'))
+    USER_CACHE_POSITIVE_TTL_SECONDS = float(os.environ.get('USER_CACHE_POSITIVE_TTL_SECONDS', '600'))
+    USER_CACHE_NEGATIVE_TTL_SECONDS = float(os.environ.get('USER_CACHE_NEGATIVE_TTL_SECONDS', '30'))
+    USER_CACHE_STALE_GRACE_SECONDS = float(os.environ.get('USER_CACHE_STALE_GRACE_SECONDS', '600')) # user-service 장애 시 만료된 긍정 결과 사용 허용 시간
+    # 검증된 JWT 클레임 캐시 설정
+    TOKEN_CACHE_ENABLED = os.environ.get('TOKEN_CACHE_ENABLED', 'true').lower() == 'true'
+    TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', '10000'))
+    TOKEN_CACHE_TTL_SECONDS = float(os.environ.get('TOKEN_CACHE_TTL_SECONDS', '300')) # 토큰 exp가 더 이르면 exp까지만 캐시
     VOICE_ANALYSIS_SERVICE_URL = os.environ.get('VOICE_ANALYSIS_SERVICE_URL', 'http://localhost:8003')
-    KAFKA_BROKER_URL = os.environ.get('KAFKA_BROKER_URL', 'kafka:9092')
+    # 업스트림 HTTP 클라이언트 커넥션 풀/타임아웃 설정
+    HTTP2_ENABLED = os.environ.get('HTTP2_ENABLED', 'false').lower() == 'true' # httpx[http2] 필요
+    HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('HTTP_CONNECT_TIMEOUT_SECONDS', '5'))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20'))
+    HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.environ.get('HTTP_KEEPALIVE_EXPIRY_SECONDS', '30'))
+    DIFY_TIMEOUT_SECONDS = float(os.environ.get('DIFY_TIMEOUT_SECONDS', '60'))
+    DIFY_MAX_CONNECTIONS = int(os.environ.get('DIFY_MAX_CONNECTIONS', '20'))
+    USER_SERVICE_TIMEOUT_SECONDS = float(os.environ.get('USER_SERVICE_TIMEOUT_SECONDS', '5'))
+    USER_SERVICE_MAX_CONNECTIONS = int(os.environ.get('USER_SERVICE_MAX_CONNECTIONS', '50'))
+    VOICE_ANALYSIS_TIMEOUT_SECONDS = float(os.environ.get('VOICE_ANALYSIS_TIMEOUT_SECONDS', '30'))
+    VOICE_ANALYSIS_MAX_CONNECTIONS = int(os.environ.get('VOICE_ANALYSIS_MAX_CONNECTIONS', '20'))
+    KAFKA_BROKER_URL = os.environ.get('KAFKA_BROKER_URL', 'kafka:9092') # memory:// 이면 인메모리 프로듀서 사용
+    # Kafka 프로듀서 배치/압축/멱등성 설정
+    KAFKA_LINGER_MS = int(os.environ.get('KAFKA_LINGER_MS', '20'))
+    KAFKA_BATCH_SIZE = int(os.environ.get('KAFKA_BATCH_SIZE', '65536'))
+    KAFKA_COMPRESSION_TYPE = os.environ.get('KAFKA_COMPRESSION_TYPE', 'lz4')
+    KAFKA_ENABLE_IDEMPOTENCE = os.environ.get('KAFKA_ENABLE_IDEMPOTENCE', 'true').lower() == 'true'
+    KAFKA_QUEUE_BUFFERING_MAX_MESSAGES = int(os.environ.get('KAFKA_QUEUE_BUFFERING_MAX_MESSAGES', '100000'))
+    KAFKA_FLUSH_TIMEOUT_SECONDS = float(os.environ.get('KAFKA_FLUSH_TIMEOUT_SECONDS', '10'))
+    # score-updates outbox relay 설정
+    OUTBOX_RELAY_ENABLED = os.environ.get('OUTBOX_RELAY_ENABLED', 'true').lower() == 'true'
+    OUTBOX_RELAY_BATCH_SIZE = int(os.environ.get('OUTBOX_RELAY_BATCH_SIZE', '200'))
+    OUTBOX_RELAY_POLL_INTERVAL_SECONDS = float(os.environ.get('OUTBOX_RELAY_POLL_INTERVAL_SECONDS', '1'))
+    OUTBOX_RELAY_MAX_BACKOFF_SECONDS = float(os.environ.get('OUTBOX_RELAY_MAX_BACKOFF_SECONDS', '60'))
+    OUTBOX_RELAY_DELIVERY_TIMEOUT_SECONDS = float(os.environ.get('OUTBOX_RELAY_DELIVERY_TIMEOUT_SECONDS', '10'))
+    OUTBOX_RETENTION_DAYS = float(os.environ.get('OUTBOX_RETENTION_DAYS', '7')) # 발행 완료 후 이 기간이 지난 이벤트는 삭제
+    OUTBOX_PRUNE_INTERVAL_SECONDS = float(os.environ.get('OUTBOX_PRUNE_INTERVAL_SECONDS', '3600'))
+    OUTBOX_PRUNE_BATCH_SIZE = int(os.environ.get('OUTBOX_PRUNE_BATCH_SIZE', '10000')) # DELETE 한 번에 지울 행 수 (긴 잠금 방지)
+    # 오디오 트랜스코딩 프로세스 풀 설정
+    TRANSCODE_MAX_WORKERS = int(os.environ.get('TRANSCODE_MAX_WORKERS', str(os.cpu_count() or 1)))
+    TRANSCODE_MAX_QUEUE = int(os.environ.get('TRANSCODE_MAX_QUEUE', '16')) # 모든 워커가 사용 중일 때 대기 가능한 작업 수
+    # 음성 업로드 스트리밍 처리 설정
+    MAX_AUDIO_UPLOAD_BYTES = int(os.environ.get('MAX_AUDIO_UPLOAD_BYTES', str(25 * 1024 * 1024))) # Whisper 업로드 제한과 동일
+    MAX_AUDIO_DURATION_SECONDS = int(os.environ.get('MAX_AUDIO_DURATION_SECONDS', '600')) # MP3 변환 시 이 길이까지만 사용
+    AUDIO_UPLOAD_CHUNK_SIZE = int(os.environ.get('AUDIO_UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+    S3_MULTIPART_CHUNK_SIZE = int(os.environ.get('S3_MULTIPART_CHUNK_SIZE', str(5 * 1024 * 1024))) # S3 최소 파트 크기 5MB
+    # 비동기 음성 답변 작업 설정
+    VOICE_JOB_STORAGE_DIR = os.environ.get('VOICE_JOB_STORAGE_DIR', '/var/lib/daily-question-service/voice-answer-jobs') # 재시작 후에도 유지되는 볼륨 경로
+    VOICE_JOB_WORKERS = int(os.environ.get('VOICE_JOB_WORKERS', '2')) # 동시에 처리할 작업 수
+    VOICE_JOB_POLL_INTERVAL_SECONDS = float(os.environ.get('VOICE_JOB_POLL_INTERVAL_SECONDS', '1'))
+    VOICE_JOB_HEARTBEAT_SECONDS = float(os.environ.get('VOICE_JOB_HEARTBEAT_SECONDS', '15'))
+    VOICE_JOB_STALL_TIMEOUT_SECONDS = float(os.environ.get('VOICE_JOB_STALL_TIMEOUT_SECONDS', '300')) # heartbeat가 이 시간 이상 없으면 회수
+    VOICE_JOB_MAX_ATTEMPTS = int(os.environ.get('VOICE_JOB_MAX_ATTEMPTS', '3'))
+    # 다음 날 '오늘의 질문' 사전 생성 배치 설정
+    PREGENERATE_ENABLED = os.environ.get('PREGENERATE_ENABLED', 'true').lower() == 'true'
+    PREGENERATE_AT = os.environ.get('PREGENERATE_AT', '03:00') # 실행 시각 (서버 로컬 시간 HH:MM)
+    PREGENERATE_CONCURRENCY = int(os.environ.get('PREGENERATE_CONCURRENCY', '4')) # 동시 Dify 호출 수
+    PREGENERATE_RATE_PER_SECOND = float(os.environ.get('PREGENERATE_RATE_PER_SECOND', '2')) # 초당 Dify 호출 시작 수
+    PREGENERATE_RETRIES = int(os.environ.get('PREGENERATE_RETRIES', '2')) # 실패한 사용자 재시도 횟수
+    PREGENERATE_RETRY_DELAY_SECONDS = float(os.environ.get('PREGENERATE_RETRY_DELAY_SECONDS', '600'))
+    ACTIVE_USER_WINDOW_DAYS = int(os.environ.get('ACTIVE_USER_WINDOW_DAYS', '14')) # 최근 이 기간 내 답변했거나 질문을 직접 요청한 사용자를 활성 사용자로 간주 (사전 생성된 질문은 제외)
+    # 질문 조회 read-through 캐시 설정 (오늘의 질문은 하루 동안 바뀌지 않음)
+    QUESTION_CACHE_ENABLED = os.environ.get('QUESTION_CACHE_ENABLED', 'true').lower() == 'true'
+    QUESTION_CACHE_MAX_SIZE = int(os.environ.get('QUESTION_CACHE_MAX_SIZE', '10000'))
+    QUESTION_CACHE_TTL_SECONDS = float(os.environ.get('QUESTION_CACHE_TTL_SECONDS', '3600'))
+    # 질문 수정/삭제를 Postgres LISTEN/NOTIFY로 모든 워커의 캐시에 전파 (끄면 다른 워커는 TTL 동안 이전 질문을 반환할 수 있음)
+    QUESTION_CACHE_INVALIDATION_ENABLED = os.environ.get('QUESTION_CACHE_INVALIDATION_ENABLED', 'true').lower() == 'true'
+    QUESTION_CACHE_INVALIDATION_RECONNECT_SECONDS = float(os.environ.get('QUESTION_CACHE_INVALIDATION_RECONNECT_SECONDS', '5'))
+    # 목록 API 커서 페이지네이션 설정
+    DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '100'))
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '500'))
+    # 여러 사용자 답변 일괄 조회 설정
+    BULK_ANSWERS_MAX_USERS = int(os.environ.get('BULK_ANSWERS_MAX_USERS', '500'))
+    BULK_ANSWERS_DEFAULT_PER_USER = int(os.environ.get('BULK_ANSWERS_DEFAULT_PER_USER', '20'))
+    BULK_ANSWERS_MAX_PER_USER = int(os.environ.get('BULK_ANSWERS_MAX_PER_USER', '100'))
+    # 질문 일괄 가져오기 설정
+    QUESTION_IMPORT_BATCH_SIZE = int(os.environ.get('QUESTION_IMPORT_BATCH_SIZE', '1000')) # INSERT 한 번에 넣을 행 수
+    QUESTION_IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get('QUESTION_IMPORT_MAX_REPORTED_ERRORS', '1000'))
+    EMBEDDING_DIMENSIONS = int(os.environ.get('EMBEDDING_DIMENSIONS', '1024')) # 질문/답변 임베딩 차원
+    # 의미 유사도 채점 설정
+    SEMANTIC_SCORING_DIMENSIONS = int(os.environ.get('SEMANTIC_SCORING_DIMENSIONS', os.environ.get('EMBEDDING_DIMENSIONS', '1024'))) # EMBEDDING_DIMENSIONS보다 작으면 앞쪽 차원만 사용 (Matryoshka)
+    SEMANTIC_RELEVANCE_THRESHOLD = float(os.environ.get('SEMANTIC_RELEVANCE_THRESHOLD', '0.2')) # 질문과의 유사도가 이 값 미만이면 0점
+    SEMANTIC_TOP_K = int(os.environ.get('SEMANTIC_TOP_K', '3')) # 평균을 낼 상위 예상 답변 수
+    SEMANTIC_SIGMOID_K = float(os.environ.get('SEMANTIC_SIGMOID_K', '0.1'))
+    SEMANTIC_SIGMOID_X0 = float(os.environ.get('SEMANTIC_SIGMOID_X0', '50'))
+    # 비슷한 질문 반복 방지 설정 (사용자별 최근 질문 임베딩과 코사인 유사도 비교)
+    QUESTION_DEDUP_ENABLED = os.environ.get('QUESTION_DEDUP_ENABLED', 'true').lower() == 'true'
+    QUESTION_DEDUP_THRESHOLD = float(os.environ.get('QUESTION_DEDUP_THRESHOLD', '0.92')) # 이 값 이상이면 중복으로 판단
+    QUESTION_DEDUP_WINDOW = int(os.environ.get('QUESTION_DEDUP_WINDOW', '365')) # 비교할 사용자별 최근 질문 수
+    QUESTION_DEDUP_DIMENSIONS = int(os.environ.get('QUESTION_DEDUP_DIMENSIONS', '256')) # 비교에 사용할 앞쪽 차원 수 (Matryoshka)
+    QUESTION_DEDUP_MAX_REGENERATIONS = int(os.environ.get('QUESTION_DEDUP_MAX_REGENERATIONS', '2')) # 중복일 때 다시 생성할 횟수
+    QUESTION_DEDUP_MAX_USERS = int(os.environ.get('QUESTION_DEDUP_MAX_USERS', '10000')) # 메모리에 유지할 사용자 인덱스 수
+    QUESTION_DEDUP_TTL_SECONDS = float(os.environ.get('QUESTION_DEDUP_TTL_SECONDS', '3600')) # 다른 인스턴스에서 저장한 질문 반영 주기
+    # 임베딩 저장소 설정 (같은 텍스트는 한 번만 임베딩)
+    EMBEDDING_STORE_ENABLED = os.environ.get('EMBEDDING_STORE_ENABLED', 'true').lower() == 'true'
+    EMBEDDING_STORE_DTYPE = os.environ.get('EMBEDDING_STORE_DTYPE', 'float32') # float32 또는 float16 (절반 크기, 코사인 유사도 오차 ~1e-3)
+    EMBEDDING_STORE_CACHE_SIZE = int(os.environ.get('EMBEDDING_STORE_CACHE_SIZE', '10000')) # 인프로세스 캐시 항목 수
+    EMBEDDING_STORE_CACHE_TTL_SECONDS = float(os.environ.get('EMBEDDING_STORE_CACHE_TTL_SECONDS', '3600'))
     
     # AWS S3 관련 환경 변수 추가
     AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
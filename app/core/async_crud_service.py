@@ -0,0 +1,355 @@
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+import datetime
+from sqlalchemy import Date, cast, func, insert, or_, select, text, tuple_, union, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import models, schemas
+from app.core.kafka_producer_service import SCORE_UPDATES_TOPIC, build_score_update_payload
+from app.core import question_cache
+from app.core.crud_service import (
+    build_latest_answers_query,
+    build_latest_answers_for_users_query,
+    rows_to_dicts
+)
+
+# AsyncSession CRUD. async 라우트와 이벤트 루프 위의 백그라운드 작업에서 사용 (동기 라우트/outbox relay용은 crud_service)
+# 양쪽에서 쓰는 쿼리는 crud_service의 build_* 빌더를 공유하고, 한쪽에서만 쓰는 함수는 복제하지 않음
+# async 세션에서는 암묵적 lazy load가 불가능하므로 필요한 관계는 명시적으로 로드함
+
+# Question CRUD operations
+async def create_question(
+    db: AsyncSession,
+    question: schemas.QuestionCreate,
+    content_embedding: Optional[bytes] = None,
+    expected_answer_embeddings: Optional[bytes] = None,
+    embedding_dimensions: Optional[int] = None
+):
+    db_question = models.Question(
+        content=question.content,
+        expected_answers=question.expected_answers,
+        user_id=question.user_id,
+        daily_date=question.daily_date,
+        content_embedding=content_embedding, # 미리 계산된 질문 임베딩
+        expected_answer_embeddings=expected_answer_embeddings, # 미리 계산된 예상 답변 임베딩
+        embedding_dimensions=embedding_dimensions
+    )
+    db.add(db_question)
+    await db.commit()
+    await db.refresh(db_question)
+    return db_question
+
+async def upsert_daily_question(
+    db: AsyncSession,
+    question: schemas.QuestionCreate,
+    content_embedding: Optional[bytes] = None,
+    expected_answer_embeddings: Optional[bytes] = None,
+    embedding_dimensions: Optional[int] = None
+):
+    # (user_id, daily_date) 유니크 제약 충돌 시 새로 넣지 않고 이미 저장된 질문을 반환
+    # 반환값: (질문, 새로 생성 여부)
+    inserted_id = (await db.execute(
+        pg_insert(models.Question).values(
+            content=question.content,
+            expected_answers=question.expected_answers,
+            user_id=question.user_id,
+            daily_date=question.daily_date,
+            content_embedding=content_embedding,
+            expected_answer_embeddings=expected_answer_embeddings,
+            embedding_dimensions=embedding_dimensions
+        ).on_conflict_do_nothing(constraint='_user_daily_question_uc').returning(models.Question.id)
+    )).scalar()
+    await db.commit()
+    if inserted_id is not None:
+        return await read_question(db, inserted_id), True
+    return await get_question_by_user_and_date(db, question.user_id, question.daily_date), False
+
+async def bulk_insert_questions(db: AsyncSession, questions: List[schemas.QuestionCreate]) -> List[Tuple[int, Optional[int], Optional[datetime.date]]]:
+    # 여러 질문을 하나의 multi-row INSERT로 저장. (user_id, daily_date)가 이미 있는 행은 건너뜀
+    # 반환값: 실제로 저장된 행의 (id, user_id, daily_date) 목록
+    if not questions:
+        return []
+    rows = (await db.execute(
+        pg_insert(models.Question).values([
+            {
+                "content": question.content,
+                "expected_answers": question.expected_answers,
+                "user_id": question.user_id,
+                "daily_date": question.daily_date
+            }
+            for question in questions
+        ]).on_conflict_do_nothing(constraint='_user_daily_question_uc')
+        .returning(models.Question.id, models.Question.user_id, models.Question.daily_date)
+    )).all()
+    await db.commit()
+    return [tuple(row) for row in rows]
+
+async def lock_daily_question_generation(db: AsyncSession, user_id: int, daily_date: datetime.date):
+    # (user_id, daily_date) 단위 트랜잭션 advisory lock. 질문 저장 커밋(또는 세션 종료) 시 자동으로 해제됨
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:user_id, :day)"),
+        {"user_id": user_id, "day": daily_date.toordinal()}
+    )
+
+async def get_question_by_user_and_date(db: AsyncSession, user_id: int, daily_date: datetime.date) -> Optional[models.Question]:
+    return (await db.execute(
+        select(models.Question).where(
+            models.Question.user_id == user_id,
+            models.Question.daily_date == daily_date
+        ).limit(1)
+    )).scalars().first()
+
+async def get_question_by_user_and_date_cached(db: AsyncSession, user_id: int, daily_date: datetime.date) -> Optional[schemas.Question]:
+    # read-through 캐시: 적중 시 DB를 조회하지 않음
+    cached = question_cache.get(question_cache.daily_question_key(user_id, daily_date))
+    if cached is not None:
+        return cached
+    db_question = await get_question_by_user_and_date(db, user_id, daily_date)
+    if db_question is None:
+        return None
+    question = schemas.Question.model_validate(db_question)
+    question_cache.store(question)
+    return question
+
+async def read_question(db: AsyncSession, question_id: int):
+    return await db.get(models.Question, question_id)
+
+async def update_question_embeddings(
+    db: AsyncSession,
+    db_question: models.Question,
+    content_embedding: bytes,
+    expected_answer_embeddings: bytes,
+    embedding_dimensions: int
+) -> models.Question:
+    db_question.content_embedding = content_embedding
+    db_question.expected_answer_embeddings = expected_answer_embeddings
+    db_question.embedding_dimensions = embedding_dimensions
+    await db.commit()
+    await db.refresh(db_question)
+    return db_question
+
+async def get_questions_by_ids(db: AsyncSession, question_ids: Sequence[int]) -> List[models.Question]:
+    if not question_ids:
+        return []
+    return (await db.execute(select(models.Question).where(models.Question.id.in_(question_ids)))).scalars().all()
+
+async def get_recent_question_embeddings(db: AsyncSession, user_id: int, limit: int) -> list:
+    # 사용자의 최근 질문 임베딩 (중복 질문 검사 인덱스 적재용, 최신순)
+    return (await db.execute(
+        select(models.Question.id, models.Question.content_embedding, models.Question.embedding_dimensions).where(
+            models.Question.user_id == user_id,
+            models.Question.content_embedding.isnot(None)
+        ).order_by(models.Question.id.desc()).limit(limit)
+    )).all()
+
+async def get_questions_missing_embeddings(db: AsyncSession, after_id: int = 0, limit: int = 100) -> List[models.Question]:
+    # 임베딩이 아직 저장되지 않은 질문을 id 순으로 조회 (백필용)
+    return (await db.execute(
+        select(models.Question).where(
+            models.Question.id > after_id,
+            (models.Question.content_embedding.is_(None)) | (models.Question.expected_answer_embeddings.is_(None))
+        ).order_by(models.Question.id).limit(limit)
+    )).scalars().all()
+
+async def get_questions_by_user_and_date_range(
+    db: AsyncSession,
+    user_id: int,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+    after: Optional[Tuple[datetime.date, int]] = None,
+    limit: Optional[int] = None
+) -> List[models.Question]:
+    # (daily_date, id) 순 keyset 페이지네이션. after는 이전 페이지 마지막 행의 (daily_date, id)
+    # daily_date가 없는 질문(POST /questions로 만든 질문)도 기존처럼 포함하며 날짜가 있는 질문 뒤에 id 순으로 반환
+    query = select(models.Question).where(models.Question.user_id == user_id)
+    if start_date:
+        query = query.where(models.Question.daily_date >= start_date)
+    if end_date:
+        query = query.where(models.Question.daily_date <= end_date)
+    if after is not None:
+        after_date, after_id = after
+        if after_date is None:
+            query = query.where(models.Question.daily_date.is_(None), models.Question.id > after_id)
+        else:
+            query = query.where(or_(
+                tuple_(models.Question.daily_date, models.Question.id) > tuple_(after_date, after_id),
+                models.Question.daily_date.is_(None)
+            ))
+    query = query.order_by(models.Question.daily_date.asc().nulls_last(), models.Question.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return (await db.execute(query)).scalars().all()
+
+async def get_active_user_ids(db: AsyncSession, since_date: datetime.date) -> List[int]:
+    # 최근 답변했거나 질문을 직접 요청한 사용자 ID 목록
+    # 사전 생성된 질문은 전날 저장되므로(created_at 날짜 < daily_date) 활동으로 보지 않음.
+    # 그렇지 않으면 한 번 사전 생성된 사용자가 매일 다시 사전 생성되어 활성 사용자에서 빠지지 않음
+    question_users = select(models.Question.user_id).where(
+        models.Question.user_id.isnot(None),
+        models.Question.daily_date >= since_date,
+        cast(models.Question.created_at, Date) >= models.Question.daily_date
+    )
+    answer_users = select(models.Answer.user_id).where(
+        models.Answer.created_at >= datetime.datetime.combine(since_date, datetime.time.min)
+    )
+    return sorted((await db.execute(union(question_users, answer_users))).scalars().all())
+
+async def get_user_ids_with_question_on(db: AsyncSession, daily_date: datetime.date) -> List[int]:
+    return (await db.execute(
+        select(models.Question.user_id).where(
+            models.Question.user_id.isnot(None),
+            models.Question.daily_date == daily_date
+        )
+    )).scalars().all()
+
+async def try_advisory_lock(conn: AsyncConnection, key: int) -> bool:
+    # 커넥션 단위 Postgres advisory lock. 해제 전까지 같은 커넥션을 유지해야 하며,
+    # 트랜잭션을 열어 둔 채(idle in transaction) 오래 기다리지 않도록 AUTOCOMMIT 커넥션에서 사용
+    return bool((await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar())
+
+async def advisory_unlock(conn: AsyncConnection, key: int):
+    await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+
+# Answer CRUD operations
+async def create_answer_db(db: AsyncSession, answer: schemas.AnswerCreate, with_score_event: bool = False):
+    db_answer = models.Answer(
+        question_id=answer.question_id,
+        user_id=answer.user_id,
+        audio_file_url=answer.audio_file_url,
+        text_content=answer.text_content,
+        cognitive_score=answer.cognitive_score,
+        analysis_details=answer.analysis_details,
+        semantic_score=answer.semantic_score
+    )
+    db.add(db_answer)
+    if with_score_event and answer.cognitive_score is not None and answer.semantic_score is not None:
+        # 점수 업데이트 이벤트를 답변과 같은 트랜잭션에서 outbox에 기록 (발행은 outbox relay가 담당)
+        await db.flush() # answer id 할당
+        db.add(models.OutboxEvent(
+            topic=SCORE_UPDATES_TOPIC,
+            key=str(answer.user_id),
+            payload=build_score_update_payload(
+                user_id=str(answer.user_id),
+                answer_id=str(db_answer.id),
+                cognitive_score=answer.cognitive_score,
+                semantic_score=answer.semantic_score,
+                timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat()
+            )
+        ))
+    await db.commit()
+    await db.refresh(db_answer)
+    return db_answer
+
+async def get_latest_answers_by_users(
+    db: AsyncSession,
+    user_ids: List[int],
+    start_date: Optional[datetime.datetime] = None,
+    end_date: Optional[datetime.datetime] = None,
+    per_user_limit: int = 20
+) -> List[dict]:
+    query = build_latest_answers_for_users_query(user_ids, start_date, end_date, per_user_limit)
+    return rows_to_dicts(await db.execute(query))
+
+async def stream_answers_for_rescoring(db: AsyncSession, after_id: int = 0, chunk_size: int = 1000) -> AsyncIterator[list]:
+    # 텍스트가 있는 답변을 id 순으로 서버 측 커서(yield_per)로 읽어 chunk_size개씩 반환 (전체를 메모리에 올리지 않음)
+    # 커서가 열린 동안 같은 세션에서 커밋하면 안 되므로 쓰기는 별도 세션에서 수행해야 함
+    result = await db.stream(
+        select(
+            models.Answer.id,
+            models.Answer.question_id,
+            models.Answer.user_id,
+            models.Answer.text_content,
+            models.Answer.cognitive_score,
+            models.Answer.semantic_score
+        ).where(
+            models.Answer.id > after_id,
+            models.Answer.text_content.isnot(None),
+            models.Answer.text_content != ""
+        ).order_by(models.Answer.id).execution_options(yield_per=chunk_size)
+    )
+    async for partition in result.partitions():
+        yield partition
+
+async def update_answer_semantic_scores(db: AsyncSession, scores: List[dict], score_events: Optional[List[dict]] = None):
+    # scores: [{"id": answer_id, "semantic_score": 점수}] 를 기본 키 기준 bulk UPDATE (executemany)
+    # score_events가 있으면 같은 트랜잭션에서 outbox에 기록 (발행은 outbox relay가 담당)
+    if scores:
+        await db.execute(update(models.Answer), scores)
+    if score_events:
+        await db.execute(insert(models.OutboxEvent), score_events)
+    await db.commit()
+
+# Voice answer job operations
+async def create_voice_answer_job(db: AsyncSession, job_id: str, user_id: int, question_id: int, audio_file_path: str) -> models.VoiceAnswerJob:
+    db_job = models.VoiceAnswerJob(
+        id=job_id,
+        user_id=user_id,
+        question_id=question_id,
+        audio_file_path=audio_file_path,
+        status="pending",
+        attempts=0
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    await db.refresh(db_job, attribute_names=["answer"]) # 응답 직렬화 시 lazy load가 일어나지 않도록 미리 로드
+    return db_job
+
+async def claim_next_voice_answer_job(db: AsyncSession) -> Optional[models.VoiceAnswerJob]:
+    # 가장 오래된 대기 작업 하나를 잠그고 processing으로 변경 (여러 워커/프로세스가 같은 작업을 가져가지 않도록 SKIP LOCKED)
+    db_job = (await db.execute(
+        select(models.VoiceAnswerJob).where(
+            models.VoiceAnswerJob.status == "pending"
+        ).order_by(models.VoiceAnswerJob.created_at).limit(1).with_for_update(skip_locked=True)
+    )).scalars().first()
+    if db_job:
+        db_job.status = "processing"
+        db_job.attempts = db_job.attempts + 1
+        db_job.heartbeat_at = func.now()
+        await db.commit()
+        await db.refresh(db_job)
+    return db_job
+
+async def touch_voice_answer_job(db: AsyncSession, job_id: str):
+    await db.execute(
+        update(models.VoiceAnswerJob).where(
+            models.VoiceAnswerJob.id == job_id,
+            models.VoiceAnswerJob.status == "processing"
+        ).values(heartbeat_at=func.now()).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def finish_voice_answer_job(
+    db: AsyncSession,
+    job_id: str,
+    status: str,
+    answer_id: Optional[int] = None,
+    error: Optional[str] = None
+):
+    await db.execute(
+        update(models.VoiceAnswerJob).where(models.VoiceAnswerJob.id == job_id).values(
+            status=status,
+            answer_id=answer_id,
+            error=error,
+            heartbeat_at=None
+        ).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def requeue_stalled_voice_answer_jobs(db: AsyncSession, stall_timeout_seconds: float, max_attempts: int) -> int:
+    # heartbeat가 끊긴 processing 작업을 다시 대기 상태로 돌리고, 시도 횟수를 넘긴 작업은 실패 처리
+    stalled = (await db.execute(
+        select(models.VoiceAnswerJob).where(
+            models.VoiceAnswerJob.status == "processing",
+            models.VoiceAnswerJob.heartbeat_at < func.now() - datetime.timedelta(seconds=stall_timeout_seconds) # DB 시각 기준
+        ).with_for_update(skip_locked=True)
+    )).scalars().all()
+    for db_job in stalled:
+        if db_job.attempts >= max_attempts:
+            db_job.status = "failed"
+            db_job.error = "처리 중 작업이 중단되어 최대 재시도 횟수를 초과했습니다."
+        else:
+            db_job.status = "pending"
+        db_job.heartbeat_at = None
+    await db.commit()
+    return len(stalled)
@@ -0,0 +1,144 @@
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import UploadFile
+from pydub import AudioSegment
+
+from app.config.config import Config
+from app.core.s3_service import S3Service
+
+class TranscodeQueueFullError(Exception):
+    """
+    트랜스코딩 풀의 작업 슬롯과 대기열이 모두 찬 경우 발생합니다. (503으로 응답)
+    """
+    pass
+
+class AudioTooLargeError(Exception):
+    """
+    업로드된 오디오가 MAX_AUDIO_UPLOAD_BYTES를 넘는 경우 발생합니다. (413으로 응답)
+    """
+    pass
+
+async def save_upload_to_temp_file(upload: UploadFile, suffix: str = ".webm", directory: Optional[str] = None) -> str:
+    """
+    업로드 파일을 청크 단위로 임시 파일(directory 지정 시 해당 디렉터리)에 기록하고 경로를 반환합니다.
+    전체 내용을 메모리에 올리지 않으며, 크기 제한을 넘으면 AudioTooLargeError를 발생시킵니다.
+    """
+    written = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=directory) as tmp_file:
+        try:
+            while True:
+                chunk = await upload.read(Config.AUDIO_UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > Config.MAX_AUDIO_UPLOAD_BYTES:
+                    raise AudioTooLargeError(
+                        f"오디오 파일이 너무 큽니다. (최대 {Config.MAX_AUDIO_UPLOAD_BYTES // (1024 * 1024)}MB)"
+                    )
+                tmp_file.write(chunk)
+        except BaseException:
+            tmp_file.close()
+            os.remove(tmp_file.name)
+            raise
+    return tmp_file.name
+
+_worker_s3_service: Optional[S3Service] = None
+
+def transcode_and_upload_mp3(src_file_path: str, object_name: str, src_format: str = "webm") -> bool:
+    """
+    ffmpeg로 오디오를 MP3로 변환하면서 stdout 파이프를 그대로 S3 멀티파트 업로드로 흘려보냅니다.
+    중간 MP3 파일 없이 파트 크기만큼의 버퍼만 사용하며, MAX_AUDIO_DURATION_SECONDS 이후는 잘라냅니다.
+    워커 프로세스에서 실행됩니다.
+    """
+    global _worker_s3_service
+    if _worker_s3_service is None:
+        _worker_s3_service = S3Service() # 워커 프로세스마다 boto3 클라이언트 재사용
+
+    command = [
+        AudioSegment.converter, "-nostdin", "-loglevel", "error",
+        "-f", src_format, "-i", src_file_path,
+        "-t", str(Config.MAX_AUDIO_DURATION_SECONDS),
+        "-vn", "-f", "mp3", "pipe:1",
+    ]
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+        try:
+            uploaded = _worker_s3_service.upload_fileobj(process.stdout, object_name)
+        finally:
+            process.stdout.close()
+            return_code = process.wait()
+
+        if return_code != 0:
+            stderr_file.seek(0)
+            error_output = stderr_file.read().decode("utf-8", errors="replace")
+            if uploaded:
+                _worker_s3_service.delete_file(object_name) # 불완전하게 업로드된 객체 정리
+            raise RuntimeError(f"ffmpeg 변환 실패 (code {return_code}): {error_output}")
+    return uploaded
+
+class TranscodePool:
+    """
+    ffmpeg 트랜스코딩 + S3 업로드를 별도 프로세스 풀에서 실행하여 이벤트 루프를 막지 않도록 합니다.
+    동시에 처리(max_workers) + 대기(max_queue)할 수 있는 작업 수를 넘으면 TranscodeQueueFullError를 발생시킵니다.
+    in_flight 카운터는 이벤트 루프 스레드에서만 변경됩니다.
+    """
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._rejected = 0
+
+    def start(self):
+        if self._executor is None:
+            # spawn 컨텍스트: 이벤트 루프/스레드가 있는 프로세스를 fork하지 않음
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            print(f"Transcode pool started with {self.max_workers} workers (queue size {self.max_queue})")
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            print("Transcode pool stopped")
+
+    def is_saturated(self) -> bool:
+        return self._in_flight >= self.max_workers + self.max_queue
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self._rejected,
+        }
+
+    async def transcode_and_upload_mp3(self, src_file_path: str, object_name: str, src_format: str = "webm") -> bool:
+        if self.is_saturated():
+            self._rejected += 1
+            raise TranscodeQueueFullError("오디오 변환 작업이 많아 잠시 후 다시 시도해주세요.")
+
+        self._in_flight += 1
+        try:
+            if self._executor is None:
+                # lifespan 밖(배치 작업 등)에서는 스레드에서 변환
+                return await asyncio.to_thread(transcode_and_upload_mp3, src_file_path, object_name, src_format)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, transcode_and_upload_mp3, src_file_path, object_name, src_format
+            )
+        finally:
+            self._in_flight -= 1
+
+transcode_pool = TranscodePool(
+    max_workers=Config.TRANSCODE_MAX_WORKERS,
+    max_queue=Config.TRANSCODE_MAX_QUEUE
+)
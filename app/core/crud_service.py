@@ -1,41 +1,49 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import datetime
-from sqlalchemy import func
+from sqlalchemy import Select, func, select, tuple_
 
 from app import models, schemas
+from app.core import question_cache
+from app.core import question_dedup
 
 # Question CRUD operations
-def create_question(db: Session, question: schemas.QuestionCreate):
-    db_question = models.Question(
-        content=question.content,
-        expected_answers=question.expected_answers,
-        user_id=question.user_id, # user_id 추가
-        daily_date=question.daily_date # daily_date 추가
-    )
-    db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
-    return db_question
-
-def get_question_by_user_and_date(db: Session, user_id: int, daily_date: datetime.date) -> Optional[models.Question]:
-    return db.query(models.Question).filter(
-        models.Question.user_id == user_id,
-        models.Question.daily_date == daily_date
-    ).first()
-
-def read_questions(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Question).offset(skip).limit(limit).all()
+def read_questions(db: Session, limit: int = 100, after_id: Optional[int] = None):
+    # id 순 keyset 페이지네이션: 커서(after_id) 다음 행부터 조회하므로 페이지 깊이와 무관하게 비용이 일정
+    query = db.query(models.Question)
+    if after_id is not None:
+        query = query.filter(models.Question.id > after_id)
+    return query.order_by(models.Question.id).limit(limit).all()
 
 def read_question(db: Session, question_id: int):
     return db.query(models.Question).filter(models.Question.id == question_id).first()
 
+def read_question_cached(db: Session, question_id: int) -> Optional[schemas.Question]:
+    # read-through 캐시: 적중 시 DB를 조회하지 않음
+    cached = question_cache.get(question_cache.question_key(question_id))
+    if cached is not None:
+        return cached
+    db_question = read_question(db, question_id)
+    if db_question is None:
+        return None
+    question = schemas.Question.model_validate(db_question)
+    question_cache.store(question)
+    return question
+
 def update_question(db: Session, question_id: int, question: schemas.QuestionCreate):
     db_question = db.query(models.Question).filter(models.Question.id == question_id).first()
     if db_question:
         db_question.content = question.content
         db_question.expected_answers = question.expected_answers
+        # 내용이 바뀌었으므로 저장된 임베딩은 무효화 (채점 시 다시 계산됨)
+        db_question.content_embedding = None
+        db_question.expected_answer_embeddings = None
+        db_question.embedding_dimensions = None
+        # 커밋과 함께 다른 워커에도 캐시 무효화 알림 (NOTIFY는 커밋 시 전달됨)
+        db.execute(question_cache.build_invalidation_notify(db_question.id, db_question.user_id, db_question.daily_date))
         db.commit()
+        question_cache.invalidate(db_question.id, db_question.user_id, db_question.daily_date)
+        question_dedup.remove(db_question.user_id, db_question.id)
         db.refresh(db_question)
     return db_question
 
@@ -43,70 +51,102 @@ def delete_question(db: Session, question_id: int): # Corrected parameter name a
     db_question = db.query(models.Question).filter(models.Question.id == question_id).first()
     if db_question:
         db.delete(db_question)
+        db.execute(question_cache.build_invalidation_notify(db_question.id, db_question.user_id, db_question.daily_date))
         db.commit()
+        question_cache.invalidate(db_question.id, db_question.user_id, db_question.daily_date)
+        question_dedup.remove(db_question.user_id, db_question.id)
     return db_question
 
-def get_questions_by_user_and_date_range(
-    db: Session,
+# Answer CRUD operations
+# 답변 목록 응답(schemas.Answer)에 필요한 컬럼. 목록 조회는 ORM 객체를 만들지 않고 이 컬럼만 조회하여
+# schemas.Answer와 같은 키의 dict로 반환 (라우터에서 재검증 없이 바로 JSON 직렬화)
+ANSWER_LISTING_COLUMNS = (
+    models.Answer.id,
+    models.Answer.question_id,
+    models.Answer.user_id,
+    models.Answer.audio_file_url,
+    models.Answer.text_content,
+    models.Answer.cognitive_score,
+    models.Answer.analysis_details,
+    models.Answer.semantic_score,
+    models.Answer.created_at,
+)
+
+def _answer_listing_columns(source) -> list:
+    return [source.c[column.name] for column in ANSWER_LISTING_COLUMNS]
+
+def build_latest_answers_query(
     user_id: int,
-    start_date: Optional[datetime.date] = None,
-    end_date: Optional[datetime.date] = None
-) -> List[models.Question]:
-    query = db.query(models.Question).filter(models.Question.user_id == user_id)
+    start_date: Optional[datetime.datetime] = None,
+    end_date: Optional[datetime.datetime] = None,
+    after: Optional[Tuple[datetime.datetime, int]] = None,
+    limit: Optional[int] = None
+) -> Select:
+    # 질문별 최신 답변 1건씩: DISTINCT ON (question_id)을 ix_answers_user_question_created_at 순서대로 읽음
+    # (created_at, id) 내림차순이므로 같은 시각의 답변이 있어도 질문당 정확히 한 건만 반환
+    latest = select(*ANSWER_LISTING_COLUMNS).where(models.Answer.user_id == user_id)
     if start_date:
-        query = query.filter(models.Question.daily_date >= start_date)
+        latest = latest.where(models.Answer.created_at >= start_date)
     if end_date:
-        query = query.filter(models.Question.daily_date <= end_date)
-    return query.order_by(models.Question.daily_date).all()
+        latest = latest.where(models.Answer.created_at <= end_date)
+    latest = latest.distinct(models.Answer.question_id).order_by(
+        models.Answer.question_id, models.Answer.created_at.desc(), models.Answer.id.desc()
+    ).subquery()
 
-# Answer CRUD operations
-def create_answer_db(db: Session, answer: schemas.AnswerCreate): # Renamed to avoid conflict and clarify pure DB operation
-    db_answer = models.Answer(
-        question_id=answer.question_id,
-        user_id=answer.user_id,
-        audio_file_url=answer.audio_file_url,
-        text_content=answer.text_content,
-        cognitive_score=answer.cognitive_score,
-        analysis_details=answer.analysis_details,
-        semantic_score=answer.semantic_score
-    )
-    db.add(db_answer)
-    db.commit()
-    db.refresh(db_answer)
-    return db_answer
+    query = select(*_answer_listing_columns(latest), models.Question.content.label("question_content")) \
+        .join(models.Question, latest.c.question_id == models.Question.id)
+    # (created_at, id) 순 keyset 페이지네이션. after는 이전 페이지 마지막 답변의 (created_at, id)
+    if after is not None:
+        query = query.where(tuple_(latest.c.created_at, latest.c.id) > tuple_(*after))
+    query = query.order_by(latest.c.created_at, latest.c.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def build_latest_answers_for_users_query(
+    user_ids: List[int],
+    start_date: Optional[datetime.datetime] = None,
+    end_date: Optional[datetime.datetime] = None,
+    per_user_limit: int = 20
+) -> Select:
+    # 여러 사용자의 질문별 최신 답변을 한 번에 조회: DISTINCT ON (user_id, question_id) 후
+    # 사용자별 row_number()로 최근 답변 per_user_limit건까지만 남김 (사용자 ID, 최근 순 정렬)
+    latest = select(*ANSWER_LISTING_COLUMNS).where(models.Answer.user_id.in_(user_ids))
+    if start_date:
+        latest = latest.where(models.Answer.created_at >= start_date)
+    if end_date:
+        latest = latest.where(models.Answer.created_at <= end_date)
+    latest = latest.distinct(models.Answer.user_id, models.Answer.question_id).order_by(
+        models.Answer.user_id, models.Answer.question_id, models.Answer.created_at.desc(), models.Answer.id.desc()
+    ).subquery()
+
+    ranked = select(
+        latest,
+        func.row_number().over(
+            partition_by=latest.c.user_id,
+            order_by=(latest.c.created_at.desc(), latest.c.id.desc())
+        ).label("user_rank")
+    ).subquery()
+
+    return select(*_answer_listing_columns(ranked), models.Question.content.label("question_content")) \
+        .join(models.Question, ranked.c.question_id == models.Question.id) \
+        .where(ranked.c.user_rank <= per_user_limit) \
+        .order_by(ranked.c.user_id, ranked.c.user_rank)
+
+def rows_to_dicts(result) -> List[dict]:
+    # 컬럼 조회 결과를 dict 목록으로 변환 (ORM 객체/_sa_instance_state 복사 없음)
+    return [dict(row) for row in result.mappings()]
 
 def get_answers_by_user(
     db: Session,
     user_id: int,
     start_date: Optional[datetime.datetime] = None,
-    end_date: Optional[datetime.datetime] = None
-) -> List[schemas.Answer]:
-    # 각 question_id별로 최신 답변을 가져오기 위해 서브쿼리 사용
-    subquery = db.query(
-        models.Answer.question_id,
-        func.max(models.Answer.created_at).label("max_created_at")
-    ).filter(models.Answer.user_id == user_id)
-    if start_date:
-        subquery = subquery.filter(models.Answer.created_at >= start_date)
-    if end_date:
-        subquery = subquery.filter(models.Answer.created_at <= end_date)
-    subquery = subquery.group_by(models.Answer.question_id).subquery()
-
-    # 서브쿼리와 Answer, Question 테이블을 조인하여 최종 결과 가져오기
-    query = db.query(models.Answer, models.Question.content.label("question_content")) \
-        .join(subquery, 
-              (models.Answer.question_id == subquery.c.question_id) & 
-              (models.Answer.created_at == subquery.c.max_created_at)) \
-        .join(models.Question, models.Answer.question_id == models.Question.id)
-    
-    # 결과를 schemas.Answer 형식에 맞게 변환
-    answers_with_question_content = []
-    for answer, question_content in query.all():
-        answer_dict = answer.__dict__.copy() # 딕셔너리 복사본 사용
-        answer_dict["question_content"] = question_content
-        answers_with_question_content.append(schemas.Answer(**answer_dict))
-
-    return answers_with_question_content
+    end_date: Optional[datetime.datetime] = None,
+    after: Optional[Tuple[datetime.datetime, int]] = None,
+    limit: Optional[int] = None
+) -> List[dict]:
+    query = build_latest_answers_query(user_id, start_date, end_date, after, limit)
+    return rows_to_dicts(db.execute(query))
 
 def get_answer_by_id(db: Session, answer_id: int) -> Optional[schemas.Answer]:
     return db.query(models.Answer).filter(models.Answer.id == answer_id).first()
@@ -116,4 +156,42 @@ def delete_answer(db: Session, answer_id: int):
     if db_answer:
         db.delete(db_answer)
         db.commit()
-    return db_answer
\ No newline at end of file
+    return db_answer
+
+# Outbox operations
+def get_unpublished_outbox_events(db: Session, limit: int = 100) -> List[models.OutboxEvent]:
+    # 미발행 이벤트를 id 순으로 잠금 조회 (SKIP LOCKED를 쓰지 않아 여러 relay가 있어도 키별 순서가 유지됨)
+    return db.query(models.OutboxEvent).filter(
+        models.OutboxEvent.published_at.is_(None)
+    ).order_by(models.OutboxEvent.id).limit(limit).with_for_update().all()
+
+def mark_outbox_events_published(db: Session, event_ids: List[int]):
+    if event_ids:
+        db.query(models.OutboxEvent).filter(models.OutboxEvent.id.in_(event_ids)).update(
+            {models.OutboxEvent.published_at: func.now()}, synchronize_session=False
+        )
+
+def mark_outbox_events_failed(db: Session, errors: dict):
+    # errors: {event_id: error message}
+    for event_id, error in errors.items():
+        db.query(models.OutboxEvent).filter(models.OutboxEvent.id == event_id).update(
+            {
+                models.OutboxEvent.attempts: models.OutboxEvent.attempts + 1,
+                models.OutboxEvent.last_error: error
+            },
+            synchronize_session=False
+        )
+
+def delete_published_outbox_events(db: Session, retention: datetime.timedelta, limit: int = 10000) -> int:
+    # 발행 완료 후 retention이 지난 이벤트를 limit개씩 삭제 (published_at과 같은 DB 시각 기준, 삭제한 행 수 반환)
+    expired_ids = select(models.OutboxEvent.id).where(
+        models.OutboxEvent.published_at.isnot(None),
+        models.OutboxEvent.published_at < func.now() - retention
+    ).order_by(models.OutboxEvent.published_at).limit(limit)
+    return db.query(models.OutboxEvent).filter(models.OutboxEvent.id.in_(expired_ids.scalar_subquery())).delete(
+        synchronize_session=False
+    )
+
+# Voice answer job operations
+def get_voice_answer_job(db: Session, job_id: str) -> Optional[models.VoiceAnswerJob]:
+    return db.query(models.VoiceAnswerJob).filter(models.VoiceAnswerJob.id == job_id).first()
\ No newline at end of file
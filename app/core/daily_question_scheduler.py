@@ -0,0 +1,88 @@
+import asyncio
+import datetime
+from typing import Optional
+
+from app.config.config import Config
+from app.core import async_crud_service
+from app.helper import question_helper
+from app.utils.db import async_engine
+
+PREGENERATE_LOCK_KEY = 7_240_001 # 사전 생성 작업용 Postgres advisory lock 키
+
+class DailyQuestionScheduler:
+    """
+    매일 PREGENERATE_AT 시각(사용량이 적은 시간)에 다음 날 질문을 미리 생성하는 백그라운드 스케줄러.
+    여러 인스턴스가 떠 있어도 advisory lock으로 한 인스턴스만 실행하며,
+    실패한 사용자는 PREGENERATE_RETRY_DELAY_SECONDS 후 PREGENERATE_RETRIES회까지 다시 시도합니다.
+    """
+    def __init__(
+        self,
+        run_at: str = Config.PREGENERATE_AT,
+        retries: int = Config.PREGENERATE_RETRIES,
+        retry_delay: float = Config.PREGENERATE_RETRY_DELAY_SECONDS
+    ):
+        hour, minute = run_at.split(":")
+        self.run_at = datetime.time(int(hour), int(minute))
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+        self._next_run_at: Optional[datetime.datetime] = None
+        self._progress: dict = {}
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="daily-question-scheduler")
+            print(f"Daily question pre-generation scheduled at {self.run_at.strftime('%H:%M')}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "next_run_at": self._next_run_at.isoformat() if self._next_run_at else None,
+            "last_run": {key: value for key, value in self._progress.items() if key != "failed_user_ids"},
+        }
+
+    def _seconds_until_next_run(self) -> float:
+        now = datetime.datetime.now()
+        next_run = datetime.datetime.combine(now.date(), self.run_at)
+        if next_run <= now:
+            next_run += datetime.timedelta(days=1)
+        self._next_run_at = next_run
+        return (next_run - now).total_seconds()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self._seconds_until_next_run())
+            try:
+                await self.run(datetime.date.today() + datetime.timedelta(days=1))
+            except Exception as e:
+                print(f"질문 사전 생성 배치 실행 중 오류 발생: {e}")
+
+    async def run(self, daily_date: datetime.date) -> Optional[dict]:
+        # 커넥션 단위 advisory lock이므로 해제할 때까지 같은 커넥션을 유지
+        # AUTOCOMMIT으로 열어 배치 동안 idle in transaction 상태로 남지 않도록 함
+        # (idle_in_transaction_session_timeout에 커넥션이 끊기면 잠금도 조용히 풀림)
+        async with async_engine.connect() as lock_conn:
+            lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+            if not await async_crud_service.try_advisory_lock(lock_conn, PREGENERATE_LOCK_KEY):
+                print("다른 인스턴스에서 질문 사전 생성이 실행 중이므로 건너뜁니다.")
+                return None
+            try:
+                for attempt in range(self.retries + 1):
+                    self._progress = {"attempt": attempt + 1}
+                    result = await question_helper.pregenerate_daily_questions(daily_date, progress=self._progress)
+                    if not result["failed"] or attempt == self.retries:
+                        break
+                    # 이미 생성된 사용자는 건너뛰므로 다음 시도는 실패한 사용자만 처리
+                    await asyncio.sleep(self.retry_delay)
+                print(f"Pre-generation finished for {daily_date}: generated {result['generated']}, "
+                      f"skipped {result['skipped']}, failed {result['failed']}")
+                return result
+            finally:
+                await async_crud_service.advisory_unlock(lock_conn, PREGENERATE_LOCK_KEY)
+
+daily_question_scheduler = DailyQuestionScheduler()
@@ -0,0 +1,179 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config.config import Config
+from app.utils.cache import TTLCache
+from app.utils.db import AsyncSessionLocal
+
+STORE_DTYPES = {"float32": np.float32, "float16": np.float16}
+LOOKUP_BATCH_SIZE = 1000 # IN 조건 한 번에 조회할 키 수
+WRITE_BATCH_SIZE = 1000 # multi-row INSERT 한 번에 넣을 행 수
+EXPORT_CHUNK_SIZE = 10000 # 내보내기 시 서버 측 커서로 한 번에 읽을 행 수
+
+# DB 조회 전에 확인하는 인프로세스 캐시 (자주 쓰이는 예상 답변/기본 질문 등)
+_memory = TTLCache(
+    maxsize=Config.EMBEDDING_STORE_CACHE_SIZE,
+    ttl=Config.EMBEDDING_STORE_CACHE_TTL_SECONDS
+)
+_stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _store_dtype(dtype: str):
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"지원하지 않는 임베딩 저장 형식입니다: {dtype} (float32 또는 float16)")
+    return STORE_DTYPES[dtype]
+
+def pack_vector(vector, dtype: str = "float32") -> bytes:
+    """
+    임베딩 벡터를 float32/float16 바이트로 직렬화합니다. (JSON 리스트 대비 1/4~1/8 크기)
+    """
+    return np.asarray(vector, dtype=_store_dtype(dtype)).tobytes()
+
+def unpack_vector(data: bytes, dtype: str = "float32") -> np.ndarray:
+    """
+    pack_vector로 직렬화된 바이트를 float32 벡터로 복원합니다.
+    """
+    return np.frombuffer(data, dtype=_store_dtype(dtype)).astype(np.float32, copy=False)
+
+async def get_many(db: AsyncSession, hashes: Sequence[str], model: str, dimensions: int) -> Dict[str, np.ndarray]:
+    """
+    텍스트 해시 목록에 해당하는 저장된 임베딩을 {해시: float32 벡터}로 반환합니다. 없는 해시는 결과에 포함되지 않습니다.
+    """
+    found = {}
+    hashes = list(dict.fromkeys(hashes))
+    for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+        rows = (await db.execute(
+            select(models.StoredEmbedding.text_hash, models.StoredEmbedding.dtype, models.StoredEmbedding.vector).where(
+                models.StoredEmbedding.model == model,
+                models.StoredEmbedding.dimensions == dimensions,
+                models.StoredEmbedding.text_hash.in_(hashes[start:start + LOOKUP_BATCH_SIZE])
+            )
+        )).all()
+        for row in rows:
+            found[row.text_hash] = unpack_vector(row.vector, row.dtype)
+    return found
+
+async def put_many(db: AsyncSession, vectors: Dict[str, Sequence[float]], model: str, dimensions: int, dtype: Optional[str] = None) -> int:
+    """
+    {텍스트 해시: 벡터}를 저장합니다. 이미 저장된 키는 건너뛰며, 새로 저장한 행 수를 반환합니다.
+    """
+    dtype = dtype or Config.EMBEDDING_STORE_DTYPE
+    rows = [
+        {"text_hash": key, "model": model, "dimensions": dimensions, "dtype": dtype, "vector": pack_vector(vector, dtype)}
+        for key, vector in vectors.items()
+    ]
+    inserted = 0
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        result = await db.execute(
+            pg_insert(models.StoredEmbedding).values(rows[start:start + WRITE_BATCH_SIZE]).on_conflict_do_nothing()
+        )
+        inserted += result.rowcount
+    await db.commit()
+    return inserted
+
+async def lookup(texts: Sequence[str], model: str, dimensions: int) -> Dict[str, List[float]]:
+    """
+    인프로세스 캐시 → DB 순으로 저장된 임베딩을 찾아 {텍스트: 벡터}로 반환합니다.
+    저장소 오류는 기록만 하고 빈 결과로 처리하므로 호출자는 임베딩 API로 계산하면 됩니다.
+    """
+    found: Dict[str, np.ndarray] = {}
+    missing: Dict[str, str] = {}
+    for text in texts:
+        key = text_hash(text)
+        vector = _memory.get((key, model, dimensions))
+        if vector is not None:
+            found[text] = vector
+        else:
+            missing[key] = text
+
+    if missing:
+        try:
+            async with AsyncSessionLocal() as db:
+                stored = await get_many(db, list(missing), model, dimensions)
+        except Exception as e:
+            print(f"임베딩 저장소 조회 중 오류 발생: {e}")
+            _stats["errors"] += 1
+            stored = {}
+        for key, vector in stored.items():
+            _memory.set((key, model, dimensions), vector)
+            found[missing[key]] = vector
+
+    _stats["hits"] += len(found)
+    _stats["misses"] += len(texts) - len(found)
+    return {text: vector.tolist() for text, vector in found.items()}
+
+async def save(texts: Sequence[str], vectors: Sequence[Sequence[float]], model: str, dimensions: int):
+    """
+    새로 계산한 임베딩을 저장소와 인프로세스 캐시에 저장합니다. 저장 실패는 기록만 합니다.
+    """
+    dtype = Config.EMBEDDING_STORE_DTYPE
+    by_hash = {}
+    for text, vector in zip(texts, vectors):
+        key = text_hash(text)
+        by_hash[key] = vector
+        # 캐시에는 DB에서 다시 읽었을 때와 같은 값(저장 형식으로 반올림된 float32)을 넣음
+        _memory.set((key, model, dimensions), np.asarray(vector, dtype=_store_dtype(dtype)).astype(np.float32, copy=False))
+    try:
+        async with AsyncSessionLocal() as db:
+            _stats["writes"] += await put_many(db, by_hash, model, dimensions, dtype)
+    except Exception as e:
+        print(f"임베딩 저장소 저장 중 오류 발생: {e}")
+        _stats["errors"] += 1
+
+def keys_path(path) -> Path:
+    # 벡터 파일(embeddings.npy)과 같은 순서의 텍스트 해시 파일(embeddings.keys.npy)
+    path = Path(path)
+    return path.with_name(f"{path.stem}.keys.npy")
+
+async def export_npy(db: AsyncSession, path, model: str, dimensions: int, dtype: str = "float32") -> int:
+    """
+    (model, dimensions)의 저장된 임베딩 전체를 N x dimensions .npy 파일과 텍스트 해시 .keys.npy 파일로 내보냅니다.
+    전체를 메모리에 올리지 않도록 서버 측 커서로 읽어 메모리 맵 파일에 바로 씁니다. 내보낸 행 수를 반환합니다.
+    """
+    conditions = (models.StoredEmbedding.model == model, models.StoredEmbedding.dimensions == dimensions)
+    count = (await db.execute(select(func.count()).select_from(models.StoredEmbedding).where(*conditions))).scalar_one()
+    vectors = np.lib.format.open_memmap(path, mode="w+", dtype=_store_dtype(dtype), shape=(count, dimensions))
+    keys = np.lib.format.open_memmap(keys_path(path), mode="w+", dtype="S64", shape=(count,))
+
+    written = 0
+    result = await db.stream(
+        select(models.StoredEmbedding.text_hash, models.StoredEmbedding.dtype, models.StoredEmbedding.vector)
+        .where(*conditions)
+        .order_by(models.StoredEmbedding.text_hash)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    async for partition in result.partitions():
+        # 개수 조회 이후 추가된 행은 다음 내보내기에 포함
+        partition = partition[:count - written]
+        for offset, row in enumerate(partition):
+            keys[written + offset] = row.text_hash.encode("ascii")
+            vectors[written + offset] = np.frombuffer(row.vector, dtype=_store_dtype(row.dtype))
+        written += len(partition)
+        if written >= count:
+            break
+    await result.close()
+    vectors.flush()
+    keys.flush()
+    return written
+
+def load_npy(path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    export_npy로 내보낸 (텍스트 해시 배열, 벡터 행렬)을 메모리 맵으로 엽니다.
+    필요한 부분만 디스크에서 읽으므로 대량 스캔/행렬 연산에 바로 사용할 수 있습니다.
+    """
+    return np.load(keys_path(path), mmap_mode="r"), np.load(path, mmap_mode="r")
+
+def clear_cache():
+    _memory.clear()
+
+def stats() -> dict:
+    return dict(_stats, enabled=Config.EMBEDDING_STORE_ENABLED, dtype=Config.EMBEDDING_STORE_DTYPE, cache=_memory.stats())
@@ -0,0 +1,100 @@
+from typing import Dict, Optional
+
+import httpx
+
+from app.config.config import Config
+
+# 업스트림별 커넥션 풀/타임아웃 설정
+UPSTREAMS = {
+    "dify": {
+        "timeout": Config.DIFY_TIMEOUT_SECONDS,
+        "max_connections": Config.DIFY_MAX_CONNECTIONS,
+    },
+    "user_service": {
+        "timeout": Config.USER_SERVICE_TIMEOUT_SECONDS,
+        "max_connections": Config.USER_SERVICE_MAX_CONNECTIONS,
+    },
+    "voice_analysis": {
+        "timeout": Config.VOICE_ANALYSIS_TIMEOUT_SECONDS,
+        "max_connections": Config.VOICE_ANALYSIS_MAX_CONNECTIONS,
+    },
+}
+
+def _http2_available() -> bool:
+    if not Config.HTTP2_ENABLED:
+        return False
+    try:
+        import h2 # noqa: F401 (httpx[http2] 설치 시에만 HTTP/2 사용)
+        return True
+    except ImportError:
+        print("HTTP2_ENABLED가 설정되었지만 h2 패키지가 없어 HTTP/1.1을 사용합니다.")
+        return False
+
+class HttpClientRegistry:
+    """
+    업스트림(Dify, user-service, 음성 분석 서비스)별로 keep-alive 커넥션 풀을 가진 httpx.AsyncClient를 앱 전역에서 공유합니다.
+    요청마다 클라이언트를 만들면서 생기는 TCP/TLS 연결 및 DNS 조회 비용을 없앱니다.
+    """
+    def __init__(self, upstreams: dict = UPSTREAMS):
+        self.upstreams = upstreams
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._counters = {name: {"requests": 0, "responses": 0, "server_errors": 0} for name in upstreams}
+
+    def _create_client(self, name: str) -> httpx.AsyncClient:
+        settings = self.upstreams[name]
+        counters = self._counters[name]
+
+        async def on_request(request: httpx.Request):
+            counters["requests"] += 1
+
+        async def on_response(response: httpx.Response):
+            counters["responses"] += 1
+            if response.status_code >= 500:
+                counters["server_errors"] += 1
+
+        return httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=httpx.Timeout(settings["timeout"], connect=Config.HTTP_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=min(Config.HTTP_MAX_KEEPALIVE_CONNECTIONS, settings["max_connections"]),
+                keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            event_hooks={"request": [on_request], "response": [on_response]}
+        )
+
+    def start(self):
+        for name in self.upstreams:
+            self.get(name)
+
+    async def close(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """
+        업스트림 이름에 해당하는 공유 클라이언트를 반환합니다. (lifespan 밖에서는 최초 호출 시 생성)
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create_client(name)
+            self._clients[name] = client
+        return client
+
+    def _pool_stats(self, client: Optional[httpx.AsyncClient]) -> dict:
+        # httpx는 풀 상태를 공개 API로 제공하지 않으므로 httpcore 풀을 가능한 범위에서 조회
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+    def stats(self) -> dict:
+        return {
+            name: dict(self._counters[name], **self._pool_stats(self._clients.get(name)))
+            for name in self.upstreams
+        }
+
+http_clients = HttpClientRegistry()
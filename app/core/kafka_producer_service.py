@@ -1,9 +1,84 @@
 from confluent_kafka import Producer
 import json
+import threading
+from collections import defaultdict
+from typing import Optional
 from app.config.config import Config # Config 임포트
 
 # Kafka 브로커 URL을 Config에서 가져옵니다.
 KAFKA_BROKER_URL = Config.KAFKA_BROKER_URL
+SCORE_UPDATES_TOPIC = 'score-updates'
+
+class InMemoryMessage:
+    """
+    InMemoryProducer가 delivery callback에 넘기는 메시지 (confluent_kafka.Message와 같은 접근자 제공)
+    """
+    def __init__(self, topic: str, key: Optional[bytes], value: Optional[bytes], offset: int):
+        self._topic = topic
+        self._key = key
+        self._value = value
+        self._offset = offset
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return 0
+
+    def offset(self):
+        return self._offset
+
+    def key(self):
+        return self._key
+
+    def value(self):
+        return self._value
+
+class InMemoryProducer:
+    """
+    로컬 개발/테스트용 인메모리 브로커 대용 프로듀서.
+    confluent_kafka.Producer와 같은 produce/poll/flush 인터페이스를 제공하며,
+    전송된 메시지는 topic별로 self.messages에 쌓입니다. (KAFKA_BROKER_URL=memory:// 로 사용)
+    """
+    def __init__(self, config: Optional[dict] = None):
+        self.config = config or {}
+        self.messages = defaultdict(list)
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def produce(self, topic, value=None, key=None, callback=None, on_delivery=None):
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        with self._lock:
+            self._pending.append((topic, key, value, callback or on_delivery))
+
+    def poll(self, timeout: float = 0) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            delivered = []
+            for topic, key, value, callback in pending:
+                message = InMemoryMessage(topic, key, value, offset=len(self.messages[topic]))
+                self.messages[topic].append(message)
+                delivered.append((message, callback))
+        for message, callback in delivered:
+            if callback:
+                callback(None, message)
+        return len(delivered)
+
+    def flush(self, timeout: Optional[float] = None) -> int:
+        self.poll(0)
+        return len(self)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+_producer = None
+_poll_thread: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+_producer_lock = threading.Lock()
 
 def delivery_report(err, msg):
     """
@@ -14,28 +89,102 @@ def delivery_report(err, msg):
     else:
         print(f"Message delivered to topic '{msg.topic()}' [{msg.partition()}] at offset {msg.offset()}")
 
-def publish_score_update(user_id: str, answer_id: str, cognitive_score: float, semantic_score: float, timestamp: str):
+def _build_producer_config() -> dict:
+    return {
+        'bootstrap.servers': KAFKA_BROKER_URL,
+        'linger.ms': Config.KAFKA_LINGER_MS, # 배치로 묶기 위해 기다리는 시간
+        'batch.size': Config.KAFKA_BATCH_SIZE,
+        'compression.type': Config.KAFKA_COMPRESSION_TYPE,
+        'enable.idempotence': Config.KAFKA_ENABLE_IDEMPOTENCE, # 재시도 시 중복/순서 뒤바뀜 방지 (acks=all)
+        'queue.buffering.max.messages': Config.KAFKA_QUEUE_BUFFERING_MAX_MESSAGES,
+    }
+
+def _poll_loop(producer):
+    # delivery callback은 poll()을 호출하는 스레드에서 실행되므로 백그라운드에서 계속 poll
+    while not _stop_event.is_set():
+        producer.poll(0.1)
+
+def start_producer(producer=None):
     """
-    인지 건강 점수 및 맥락 점수 업데이트 메시지를 Kafka에 발행합니다.
+    프로세스 전역 Kafka 프로듀서와 delivery callback 처리용 poll 스레드를 시작합니다.
+    앱 lifespan 시작 시 호출되며, 테스트에서는 InMemoryProducer 등을 주입할 수 있습니다.
+    """
+    global _producer, _poll_thread
+    with _producer_lock:
+        if _producer is not None:
+            return _producer
+        if producer is None:
+            if KAFKA_BROKER_URL.startswith('memory://'):
+                producer = InMemoryProducer()
+            else:
+                producer = Producer(_build_producer_config())
+        _producer = producer
+        _stop_event.clear()
+        _poll_thread = threading.Thread(target=_poll_loop, args=(producer,), name="kafka-producer-poll", daemon=True)
+        _poll_thread.start()
+        print(f"Kafka producer started ({KAFKA_BROKER_URL})")
+        return _producer
+
+def stop_producer(timeout: Optional[float] = None):
+    """
+    poll 스레드를 멈추고 버퍼에 남은 메시지를 flush합니다. 앱 종료 시 호출됩니다.
+    """
+    global _producer, _poll_thread
+    with _producer_lock:
+        if _producer is None:
+            return
+        _stop_event.set()
+        if _poll_thread is not None:
+            _poll_thread.join()
+        remaining = _producer.flush(timeout if timeout is not None else Config.KAFKA_FLUSH_TIMEOUT_SECONDS)
+        if remaining:
+            print(f"Kafka producer stopped with {remaining} undelivered messages")
+        _producer = None
+        _poll_thread = None
+
+def get_producer():
     """
-    producer = Producer({'bootstrap.servers': KAFKA_BROKER_URL})
+    공유 Kafka 프로듀서를 반환합니다. lifespan 밖(배치 작업 등)에서는 최초 호출 시 시작합니다.
+    """
+    return _producer if _producer is not None else start_producer()
 
-    message_payload = {
+def build_score_update_payload(user_id: str, answer_id: str, cognitive_score: float, semantic_score: float, timestamp: str) -> dict:
+    """
+    score-updates 토픽 메시지 페이로드를 만듭니다.
+    """
+    return {
         "user_id": user_id,
         "answer_id": answer_id,
         "cognitive_score": cognitive_score,
         "semantic_score": semantic_score,
         "timestamp": timestamp
     }
+
+def publish_score_update(user_id: str, answer_id: str, cognitive_score: float, semantic_score: float, timestamp: str) -> bool:
+    """
+    인지 건강 점수 및 맥락 점수 업데이트 메시지를 Kafka에 발행합니다.
+    프로듀서 내부 큐에 넣기만 하고 바로 반환하며, 전송은 백그라운드에서 배치로 이루어집니다.
+    (답변 저장과 함께 발행해야 하는 이벤트는 outbox를 사용합니다.)
+    """
+    producer = get_producer()
+
+    message_payload = build_score_update_payload(user_id, answer_id, cognitive_score, semantic_score, timestamp)
     # 메시지 페이로드를 JSON 문자열로 변환
     message_json = json.dumps(message_payload)
 
-    # 'score-updates' 토픽으로 메시지 발행
-    producer.produce(
-        'score-updates',
+    produce_kwargs = dict(
         key=str(user_id), # user_id를 키로 사용하여 같은 유저의 메시지가 같은 파티션으로 가도록 함
         value=message_json.encode('utf-8'),
         callback=delivery_report
     )
-    # 버퍼에 있는 모든 메시지가 전송되도록 강제합니다.
-    producer.flush()
+    try:
+        producer.produce(SCORE_UPDATES_TOPIC, **produce_kwargs)
+    except BufferError:
+        # 로컬 큐가 가득 찬 경우 전송 완료된 메시지를 정리하고 한 번만 다시 시도
+        producer.poll(0)
+        try:
+            producer.produce(SCORE_UPDATES_TOPIC, **produce_kwargs)
+        except BufferError:
+            print(f"Kafka producer queue is full, dropping score update for answer {answer_id}")
+            return False
+    return True
@@ -1,11 +1,14 @@
 import os
+from pathlib import Path
 from typing import Optional, List
-from openai import OpenAI
+from openai import AsyncOpenAI
 import httpx
 import json
 
 from app.schemas import question_schema
 from app.config.config import Config
+from app.core.http_clients import http_clients
+from app.core import embedding_store
 
 OPENAI_API_KEY = Config.OPENAI_API_KEY
 DIFY_API_URL = Config.DIFY_API_URL
@@ -36,52 +39,149 @@ async def get_context_from_dify(user_id: int, prompt: str) -> Optional[str]:
         "user": f"user_{user_id}"
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(url, headers=headers, json=payload, timeout=60.0)
-            response.raise_for_status()
-            result = response.json()
-            
-            # Dify 워크플로우 응답 구조에 따라 llm_output 추출
-            # 실제 응답은 result.get("data", {}).get("outputs", {}).get("result") 에 있음
-            llm_output = result.get("data", {}).get("outputs", {}).get("result")
-            if llm_output:
-                print(f"Dify workflow successfully returned context for user {user_id}.")
-                return llm_output
-            else:
-                print(f"Dify workflow returned no llm_output for user {user_id}. Response: {result}")
-                return None
-        except httpx.HTTPStatusError as e:
-            print(f"Dify 워크플로우 호출 중 HTTP 오류 발생: {e.response.status_code} - {e.response.text}")
-            return None
-        except httpx.RequestError as e:
-            print(f"Dify 워크플로우 연결 오류 발생: {e}")
-            return None
-        except Exception as e:
-            print(f"Dify 워크플로우 호출 중 알 수 없는 오류 발생: {e}")
+    client = http_clients.get("dify") # 앱 전역 커넥션 풀 재사용 (타임아웃은 DIFY_TIMEOUT_SECONDS)
+    try:
+        response = await client.post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        result = response.json()
+        
+        # Dify 워크플로우 응답 구조에 따라 llm_output 추출
+        # 실제 응답은 result.get("data", {}).get("outputs", {}).get("result") 에 있음
+        llm_output = result.get("data", {}).get("outputs", {}).get("result")
+        if llm_output:
+            print(f"Dify workflow successfully returned context for user {user_id}.")
+            return llm_output
+        else:
+            print(f"Dify workflow returned no llm_output for user {user_id}. Response: {result}")
             return None
+    except httpx.HTTPStatusError as e:
+        print(f"Dify 워크플로우 호출 중 HTTP 오류 발생: {e.response.status_code} - {e.response.text}")
+        return None
+    except httpx.RequestError as e:
+        print(f"Dify 워크플로우 연결 오류 발생: {e}")
+        return None
+    except Exception as e:
+        print(f"Dify 워크플로우 호출 중 알 수 없는 오류 발생: {e}")
+        return None
 
-async def get_embedding(text: str, dimensions: int = 1024) -> List[float]:
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_MAX_BATCH_SIZE = 2048 # OpenAI Embeddings API 요청당 최대 입력 수
+EMBEDDING_MAX_BATCH_TOKENS = 250000 # 요청당 최대 토큰 수(300k)보다 여유 있게 설정, 문자 수로 보수적으로 추정
+
+_openai_client: Optional[AsyncOpenAI] = None
+
+def init_openai_client() -> Optional[AsyncOpenAI]:
     """
-    OpenAI Embeddings API를 호출하여 텍스트의 임베딩 벡터를 반환합니다.
-    MRL(Matryoshka Representation Learning)을 활용하여 임베딩 차원을 조절할 수 있습니다.
+    프로세스 전역에서 공유하는 OpenAI 비동기 클라이언트를 생성합니다.
+    앱 lifespan 시작 시 호출되며, 커넥션 풀/타임아웃/재시도(지수 백오프)는 Config에서 설정합니다.
+    """
+    global _openai_client
+    if not OPENAI_API_KEY:
+        print("OPENAI_API_KEY 환경 변수가 설정되지 않아 OpenAI 클라이언트를 생성하지 않습니다.")
+        return None
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            max_retries=Config.OPENAI_MAX_RETRIES,
+            timeout=httpx.Timeout(Config.OPENAI_TIMEOUT_SECONDS, connect=Config.OPENAI_CONNECT_TIMEOUT_SECONDS),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=Config.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        )
+    return _openai_client
+
+async def close_openai_client():
+    """
+    앱 종료 시 OpenAI 클라이언트의 커넥션 풀을 정리합니다.
+    """
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+
+def _get_openai_client() -> AsyncOpenAI:
+    """
+    공유 OpenAI 비동기 클라이언트를 반환합니다.
+    lifespan 밖(배치 작업 등)에서 호출되면 최초 호출 시 생성합니다.
     """
     if not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+    return init_openai_client()
+
+def _split_embedding_batches(texts: List[str]) -> List[List[int]]:
+    """
+    입력 텍스트 인덱스를 제공자 제한(입력 수, 토큰 수)을 넘지 않는 배치로 나눕니다.
+    """
+    batches = []
+    current_batch = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        estimated_tokens = max(len(text), 1) # 한국어는 대략 글자당 1토큰 이하
+        if current_batch and (
+            len(current_batch) >= EMBEDDING_MAX_BATCH_SIZE
+            or current_tokens + estimated_tokens > EMBEDDING_MAX_BATCH_TOKENS
+        ):
+            batches.append(current_batch)
+            current_batch = []
+            current_tokens = 0
+        current_batch.append(index)
+        current_tokens += estimated_tokens
+    if current_batch:
+        batches.append(current_batch)
+    return batches
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    model = "text-embedding-3-large"
+async def _create_embeddings(texts: List[str], dimensions: int) -> List[List[float]]:
+    """
+    OpenAI Embeddings API로 여러 텍스트의 임베딩을 한 번의 요청(제공자 제한 초과 시 자동 분할)으로 계산합니다.
+    """
+    client = _get_openai_client()
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
     try:
-        print(f"Creating embedding with model: {model} and dimensions: {dimensions}")
-        response = client.embeddings.create(
-            input=text,
-            model=model,
-            dimensions=dimensions
-        )
-        return response.data[0].embedding
+        for batch in _split_embedding_batches(texts):
+            print(f"Creating {len(batch)} embeddings with model: {EMBEDDING_MODEL} and dimensions: {dimensions}")
+            response = await client.embeddings.create(
+                input=[texts[i] for i in batch],
+                model=EMBEDDING_MODEL,
+                dimensions=dimensions
+            )
+            # 응답의 index는 배치 내 입력 위치이므로 원래 인덱스로 되돌림
+            for item in response.data:
+                embeddings[batch[item.index]] = item.embedding
     except Exception as e:
         print(f"OpenAI Embeddings API 호출 중 오류 발생: {e}")
         raise
+    return embeddings
+
+async def get_embeddings(texts: List[str], dimensions: int = 1024) -> List[List[float]]:
+    """
+    여러 텍스트의 임베딩을 반환합니다. 결과는 입력 순서와 동일한 순서로 반환됩니다.
+    같은 텍스트는 요청 안에서 한 번만, 임베딩 저장소에 있으면 API 호출 없이 가져오고
+    나머지만 한 번의 배치 요청으로 계산한 뒤 저장소에 저장합니다.
+    """
+    if not texts:
+        return []
+
+    unique_texts = list(dict.fromkeys(texts))
+    vectors = {}
+    if Config.EMBEDDING_STORE_ENABLED:
+        vectors = await embedding_store.lookup(unique_texts, EMBEDDING_MODEL, dimensions)
+    missing = [text for text in unique_texts if text not in vectors]
+    if missing:
+        created = await _create_embeddings(missing, dimensions)
+        vectors.update(zip(missing, created))
+        if Config.EMBEDDING_STORE_ENABLED:
+            await embedding_store.save(missing, created, EMBEDDING_MODEL, dimensions)
+    return [vectors[text] for text in texts]
+
+async def get_embedding(text: str, dimensions: int = 1024) -> List[float]:
+    """
+    OpenAI Embeddings API를 호출하여 텍스트의 임베딩 벡터를 반환합니다.
+    MRL(Matryoshka Representation Learning)을 활용하여 임베딩 차원을 조절할 수 있습니다.
+    """
+    return (await get_embeddings([text], dimensions=dimensions))[0]
 
 
 async def get_recommended_question(user_id: int) -> Optional[question_schema.Question]:
@@ -171,17 +271,14 @@ async def convert_voice_to_text(audio_file_path: str) -> str:
     """
     음성 파일을 텍스트로 변환합니다 (STT).
     """
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
-
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = _get_openai_client()
 
     try:
-        with open(audio_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1", 
-                file=audio_file
-            )
+        # Path를 넘기면 파일을 비동기로 읽어 이벤트 루프를 막지 않음
+        transcript = await client.audio.transcriptions.create(
+            model="whisper-1", 
+            file=Path(audio_file_path)
+        )
         return transcript.text
     except Exception as e:
         print(f"음성-텍스트 변환 중 오류 발생: {e}")
@@ -191,21 +288,20 @@ async def analyze_voice_with_service(s3_url: str) -> dict:
     """
     음성 분석 서비스에 S3 URL을 보내 음성 분석 결과를 받아옵니다.
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{VOICE_ANALYSIS_SERVICE_URL}/api/analyze",
-                json={"s3_url": s3_url},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            print(f"음성 분석 서비스 HTTP 오류 발생: {e.response.status_code} - {e.response.text}")
-            raise
-        except httpx.RequestError as e:
-            print(f"음성 분석 서비스 연결 오류 발생: {e}")
-            raise
-        except Exception as e:
-            print(f"음성 분석 서비스 호출 중 오류 발생: {e}")
-            raise
\ No newline at end of file
+    client = http_clients.get("voice_analysis") # 앱 전역 커넥션 풀 재사용 (타임아웃은 VOICE_ANALYSIS_TIMEOUT_SECONDS)
+    try:
+        response = await client.post(
+            f"{VOICE_ANALYSIS_SERVICE_URL}/api/analyze",
+            json={"s3_url": s3_url}
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        print(f"음성 분석 서비스 HTTP 오류 발생: {e.response.status_code} - {e.response.text}")
+        raise
+    except httpx.RequestError as e:
+        print(f"음성 분석 서비스 연결 오류 발생: {e}")
+        raise
+    except Exception as e:
+        print(f"음성 분석 서비스 호출 중 오류 발생: {e}")
+        raise
\ No newline at end of file
@@ -0,0 +1,213 @@
+import datetime
+import json
+import threading
+import time
+from typing import Optional
+
+from app.config.config import Config
+from app.core import crud_service
+from app.core.kafka_producer_service import get_producer
+from app.utils.db import SessionLocal
+
+class OutboxRelay:
+    """
+    outbox_events 테이블의 미발행 이벤트를 배치로 읽어 Kafka에 발행하는 백그라운드 스레드.
+    요청 처리 경로는 브로커를 기다리지 않고, 브로커 장애 시에도 이벤트는 테이블에 남아 재시도됩니다.
+    같은 키(user_id)의 이벤트는 id 순서대로 발행하며, 앞선 이벤트가 실패하면(전달 실패 포함) 같은 배치의 이후 이벤트는
+    발행 완료로 표시하지 않고 다음 배치에서 다시 발행합니다. (at-least-once, 키별 순서 보장)
+    """
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = Config.OUTBOX_RELAY_BATCH_SIZE,
+        poll_interval: float = Config.OUTBOX_RELAY_POLL_INTERVAL_SECONDS,
+        max_backoff: float = Config.OUTBOX_RELAY_MAX_BACKOFF_SECONDS,
+        delivery_timeout: float = Config.OUTBOX_RELAY_DELIVERY_TIMEOUT_SECONDS,
+        retention_days: float = Config.OUTBOX_RETENTION_DAYS,
+        prune_interval: float = Config.OUTBOX_PRUNE_INTERVAL_SECONDS,
+        prune_batch_size: int = Config.OUTBOX_PRUNE_BATCH_SIZE
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.delivery_timeout = delivery_timeout
+        self.retention = datetime.timedelta(days=retention_days)
+        self.prune_interval = prune_interval
+        self.prune_batch_size = prune_batch_size
+        self._last_pruned_at: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metrics = {
+            "batches": 0,
+            "published": 0,
+            "failed": 0,
+            "deferred": 0,
+            "pruned": 0,
+            "last_batch_size": 0,
+            "last_batch_seconds": 0.0,
+            "last_error": None,
+        }
+        self._metrics_lock = threading.Lock()
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+            self._thread.start()
+            print("Outbox relay started")
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+            print("Outbox relay stopped")
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def _run(self):
+        backoff = self.poll_interval
+        while not self._stop_event.is_set():
+            try:
+                processed, failed = self.run_once()
+            except Exception as e:
+                print(f"Outbox relay 배치 처리 중 오류 발생: {e}")
+                with self._metrics_lock:
+                    self._metrics["last_error"] = str(e)
+                processed, failed = 0, 1
+
+            if self._last_pruned_at is None or time.monotonic() - self._last_pruned_at >= self.prune_interval:
+                try:
+                    self.prune_once()
+                except Exception as e:
+                    print(f"Outbox relay 발행 완료 이벤트 정리 중 오류 발생: {e}")
+                self._last_pruned_at = time.monotonic()
+
+            if failed:
+                # 브로커 장애 등으로 실패하면 지수 백오프
+                backoff = min(backoff * 2, self.max_backoff)
+            elif processed >= self.batch_size:
+                backoff = 0 # 밀린 이벤트가 있으면 바로 다음 배치 처리
+            else:
+                backoff = self.poll_interval
+            if backoff:
+                self._stop_event.wait(backoff)
+
+    def prune_once(self) -> int:
+        """
+        보존 기간(OUTBOX_RETENTION_DAYS)이 지난 발행 완료 이벤트를 배치 단위로 삭제하고 삭제한 행 수를 반환합니다.
+        배치마다 커밋하여 잠금을 짧게 유지하며, 미발행 이벤트는 삭제하지 않습니다.
+        """
+        pruned = 0
+        while not self._stop_event.is_set():
+            db = self.session_factory()
+            try:
+                deleted = crud_service.delete_published_outbox_events(db, self.retention, limit=self.prune_batch_size)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            pruned += deleted
+            if deleted < self.prune_batch_size:
+                break
+        if pruned:
+            with self._metrics_lock:
+                self._metrics["pruned"] += pruned
+            print(f"Outbox relay: pruned {pruned} published events older than {self.retention.days} days")
+        return pruned
+
+    def run_once(self):
+        """
+        미발행 이벤트 한 배치를 발행하고 (발행 성공 수, 실패 수)를 반환합니다.
+        """
+        started = time.monotonic()
+        db = self.session_factory()
+        try:
+            events = crud_service.get_unpublished_outbox_events(db, limit=self.batch_size)
+            if not events:
+                db.commit()
+                return 0, 0
+
+            producer = get_producer()
+            condition = threading.Condition()
+            errors = {}
+            delivered = []
+            produced = []
+            blocked_keys = set()
+
+            def on_delivery(event_id):
+                def callback(err, msg):
+                    with condition:
+                        if err is not None:
+                            errors[event_id] = str(err)
+                        else:
+                            delivered.append(event_id)
+                        condition.notify_all()
+                return callback
+
+            for event in events:
+                if event.key in blocked_keys:
+                    continue
+                try:
+                    producer.produce(
+                        event.topic,
+                        key=event.key,
+                        value=json.dumps(event.payload).encode('utf-8'),
+                        on_delivery=on_delivery(event.id)
+                    )
+                    produced.append(event.id)
+                except Exception as e:
+                    errors[event.id] = str(e)
+                    blocked_keys.add(event.key)
+
+            producer.flush(self.delivery_timeout)
+            # delivery callback은 poll 스레드에서 실행될 수도 있으므로 모든 결과가 도착할 때까지 대기
+            with condition:
+                condition.wait_for(
+                    lambda: len(delivered) + len([i for i in produced if i in errors]) >= len(produced),
+                    timeout=self.delivery_timeout
+                )
+                delivered_ids = set(delivered)
+                failed = dict(errors)
+
+            # 같은 키의 앞선 이벤트가 실패했거나 전달 확인이 안 되었으면, 이후 이벤트가 전달되었더라도
+            # 발행 완료로 표시하지 않고 다음 배치에서 순서대로 다시 발행
+            published_ids = []
+            unconfirmed_keys = set()
+            for event in events:
+                if event.key in unconfirmed_keys:
+                    continue
+                if event.id in delivered_ids:
+                    published_ids.append(event.id)
+                else:
+                    unconfirmed_keys.add(event.key)
+
+            crud_service.mark_outbox_events_published(db, published_ids)
+            crud_service.mark_outbox_events_failed(db, failed)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        deferred = len(events) - len(published_ids) - len(failed)
+        with self._metrics_lock:
+            self._metrics["batches"] += 1
+            self._metrics["published"] += len(published_ids)
+            self._metrics["failed"] += len(failed)
+            self._metrics["deferred"] += deferred
+            self._metrics["last_batch_size"] = len(events)
+            self._metrics["last_batch_seconds"] = round(time.monotonic() - started, 4)
+            if failed:
+                self._metrics["last_error"] = next(iter(failed.values()))
+        if failed:
+            print(f"Outbox relay: {len(published_ids)} published, {len(failed)} failed, {deferred} deferred")
+        return len(published_ids), len(failed)
+
+outbox_relay = OutboxRelay()
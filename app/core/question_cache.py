@@ -0,0 +1,131 @@
+import asyncio
+import datetime
+import json
+from typing import Optional
+
+from sqlalchemy import Select, func, select
+
+from app import schemas
+from app.config.config import Config
+from app.utils.cache import CacheBackend, TTLCache
+from app.utils.db import async_engine
+
+# 질문 수정/삭제를 다른 워커/인스턴스에 알리는 Postgres NOTIFY 채널
+INVALIDATION_CHANNEL = "question_cache_invalidation"
+
+# 질문 조회용 read-through 캐시 저장소 (set_backend로 공유 저장소로 교체 가능)
+# 인프로세스 저장소는 InvalidationListener가 받은 수정/삭제 알림으로 무효화되며,
+# 리스너가 꺼져 있거나 재연결 중에는 다른 워커의 수정이 TTL 동안 반영되지 않을 수 있음
+_backend: CacheBackend = TTLCache(
+    maxsize=Config.QUESTION_CACHE_MAX_SIZE,
+    ttl=Config.QUESTION_CACHE_TTL_SECONDS
+)
+
+def set_backend(backend: CacheBackend):
+    global _backend
+    _backend = backend
+
+def get_backend() -> CacheBackend:
+    return _backend
+
+def question_key(question_id: int) -> str:
+    return f"question:id:{question_id}"
+
+def daily_question_key(user_id: int, daily_date: datetime.date) -> str:
+    return f"question:user:{user_id}:{daily_date.isoformat()}"
+
+def get(key: str) -> Optional[schemas.Question]:
+    if not Config.QUESTION_CACHE_ENABLED:
+        return None
+    return _backend.get(key)
+
+def store(question: schemas.Question):
+    # id와 (user_id, daily_date) 두 키로 모두 조회할 수 있도록 저장
+    if not Config.QUESTION_CACHE_ENABLED:
+        return
+    _backend.set(question_key(question.id), question)
+    if question.user_id is not None and question.daily_date is not None:
+        _backend.set(daily_question_key(question.user_id, question.daily_date), question)
+
+def invalidate(question_id: int, user_id: Optional[int] = None, daily_date: Optional[datetime.date] = None):
+    _backend.delete(question_key(question_id))
+    if user_id is not None and daily_date is not None:
+        _backend.delete(daily_question_key(user_id, daily_date))
+
+def build_invalidation_notify(question_id: int, user_id: Optional[int] = None, daily_date: Optional[datetime.date] = None) -> Select:
+    # 질문 수정/삭제와 같은 트랜잭션에서 실행하면 커밋될 때만 다른 워커에 알림이 전달됨
+    payload = json.dumps({
+        "id": question_id,
+        "user_id": user_id,
+        "daily_date": daily_date.isoformat() if daily_date is not None else None,
+    })
+    return select(func.pg_notify(INVALIDATION_CHANNEL, payload))
+
+class InvalidationListener:
+    """
+    다른 워커/인스턴스의 질문 수정/삭제 알림(LISTEN)을 받아 이 프로세스의 캐시 항목을 무효화합니다.
+    연결이 끊기면 다시 연결하며, 연결되지 않은 동안 놓친 알림이 있을 수 있으므로 (재)연결 시 캐시를 비웁니다.
+    """
+    def __init__(self, reconnect_delay: float = Config.QUESTION_CACHE_INVALIDATION_RECONNECT_SECONDS):
+        self.reconnect_delay = reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"listening": False, "received": 0, "reconnects": 0, "errors": 0}
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="question-cache-invalidation")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        self._stats["received"] += 1
+        try:
+            data = json.loads(payload)
+            invalidate(
+                data["id"],
+                data.get("user_id"),
+                datetime.date.fromisoformat(data["daily_date"]) if data.get("daily_date") else None
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            self._stats["errors"] += 1
+            print(f"질문 캐시 무효화 알림 처리 실패 ({payload}): {e}")
+
+    async def _loop(self):
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["errors"] += 1
+                print(f"질문 캐시 무효화 알림 수신 중 오류 발생: {e}")
+            self._stats["listening"] = False
+            self._stats["reconnects"] += 1
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _listen(self):
+        # LISTEN은 커넥션에 남으므로 전용 커넥션을 쓰고, 끝나면 풀로 돌려보내지 않고 폐기
+        async with async_engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                driver_connection = (await conn.get_raw_connection()).driver_connection
+                closed = asyncio.Event()
+                driver_connection.add_termination_listener(lambda _: closed.set())
+                await driver_connection.add_listener(INVALIDATION_CHANNEL, self._on_notification)
+                _backend.clear()
+                self._stats["listening"] = True
+                await closed.wait()
+            finally:
+                await conn.invalidate()
+
+invalidation_listener = InvalidationListener()
+
+def stats() -> dict:
+    return dict(_backend.stats(), invalidation=invalidation_listener.stats())
@@ -0,0 +1,68 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.config import Config
+from app.utils.cache import TTLCache
+from app.utils.functions import unpack_embeddings
+from app.utils.vector_index import VectorIndex
+
+DEDUP_DIMENSIONS = min(Config.QUESTION_DEDUP_DIMENSIONS, Config.EMBEDDING_DIMENSIONS)
+
+# 사용자별 최근 질문 벡터 인덱스 (TTL이 지나면 DB에서 다시 적재하여 다른 인스턴스의 질문도 반영)
+_indexes = TTLCache(
+    maxsize=Config.QUESTION_DEDUP_MAX_USERS,
+    ttl=Config.QUESTION_DEDUP_TTL_SECONDS
+)
+_stats = {"checks": 0, "duplicates": 0, "loads": 0}
+
+async def get_index(db: AsyncSession, user_id: int) -> VectorIndex:
+    """
+    사용자의 최근 질문 인덱스를 반환합니다. 메모리에 없으면 저장된 질문 임베딩으로 적재합니다.
+    """
+    # crud 모듈이 질문 수정/삭제 시 이 모듈을 호출하므로 순환 임포트를 피하기 위해 지연 임포트
+    from app.core import async_crud_service
+
+    index = _indexes.get(user_id)
+    if index is None:
+        rows = await async_crud_service.get_recent_question_embeddings(db, user_id, Config.QUESTION_DEDUP_WINDOW)
+        rows = [row for row in reversed(rows) if row.embedding_dimensions and row.embedding_dimensions >= DEDUP_DIMENSIONS]
+        index = VectorIndex(capacity=Config.QUESTION_DEDUP_WINDOW, dimensions=DEDUP_DIMENSIONS)
+        if rows:
+            index.add_many(
+                [row.id for row in rows],
+                np.stack([unpack_embeddings(row.content_embedding, row.embedding_dimensions)[0][:DEDUP_DIMENSIONS] for row in rows])
+            )
+        _indexes.set(user_id, index)
+        _stats["loads"] += 1
+    return index
+
+async def find_near_duplicate(db: AsyncSession, user_id: int, vector) -> Tuple[Optional[int], float]:
+    """
+    사용자의 최근 질문 중 가장 비슷한 질문의 (ID, 코사인 유사도)를 반환합니다.
+    유사도가 QUESTION_DEDUP_THRESHOLD 미만이면 ID는 None입니다.
+    """
+    question_id, similarity = (await get_index(db, user_id)).nearest(vector)
+    _stats["checks"] += 1
+    if similarity < Config.QUESTION_DEDUP_THRESHOLD:
+        return None, similarity
+    _stats["duplicates"] += 1
+    return question_id, similarity
+
+def add(user_id: int, question_id: int, vector):
+    # 적재되지 않은 사용자는 다음 검사 시 DB에서 이 질문까지 함께 적재됨
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.add(question_id, vector)
+
+def remove(user_id: Optional[int], question_id: int):
+    # 수정/삭제된 질문이 새 질문을 계속 중복으로 판단하지 않도록 인덱스에서 제거
+    if user_id is None:
+        return
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.remove(question_id)
+
+def stats() -> dict:
+    return dict(_stats, users=_indexes.stats())
@@ -1,4 +1,5 @@
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 import logging
 import os
@@ -38,6 +39,42 @@ class S3Service:
             return False
         return True
 
+    def upload_fileobj(self, fileobj, object_name: str):
+        """파일 객체(파이프 등)를 스트리밍으로 읽어 S3 멀티파트 업로드합니다.
+        전체 내용을 메모리에 올리지 않으며, 파트 크기만큼만 버퍼링합니다.
+
+        :param fileobj: read()를 지원하는 바이너리 파일 객체.
+        :param object_name: S3 객체 이름.
+        :return: 파일 업로드 성공 시 True, 실패 시 False.
+        """
+        if not self.bucket_name:
+            logger.error("S3_BUCKET_NAME 환경 변수가 설정되지 않았습니다.")
+            return False
+
+        transfer_config = TransferConfig(
+            multipart_threshold=Config.S3_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=Config.S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=2
+        )
+        try:
+            self.s3_client.upload_fileobj(fileobj, self.bucket_name, object_name, Config=transfer_config)
+            logger.info(f"파일 {object_name}이(가) {self.bucket_name}에 스트리밍 업로드되었습니다.")
+        except ClientError as e:
+            logger.error(f"파일 {object_name} 스트리밍 업로드 실패: {e}")
+            return False
+        return True
+
+    def delete_file(self, object_name: str):
+        """S3 객체를 삭제합니다. 성공 시 True, 실패 시 False."""
+        if not self.bucket_name:
+            return False
+        try:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=object_name)
+        except ClientError as e:
+            logger.error(f"파일 {object_name} 삭제 실패: {e}")
+            return False
+        return True
+
     def get_file_url(self, object_name: str):
         """S3 객체의 공개 URL을 생성합니다."""
         if not self.bucket_name:
@@ -0,0 +1,78 @@
+import time
+from typing import Optional, Tuple
+
+import httpx
+
+from app.config.config import Config
+from app.core.http_clients import http_clients
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+
+USER_SERVICE_URL = Config.USER_SERVICE_URL
+
+# user_id -> (존재 여부, 확인 시각). 긍정 결과는 만료 후에도 STALE_GRACE 동안 장애 대비용으로 보관
+_validated_users = TTLCache(maxsize=Config.USER_CACHE_MAX_SIZE, ttl=Config.USER_CACHE_POSITIVE_TTL_SECONDS)
+_user_lookup_flights = SingleFlight()
+_stale_hits = 0
+
+class UserServiceUnavailableError(Exception):
+    """
+    user-service 장애(연결 실패, 5xx 등)로 사용자 존재 여부를 확인할 수 없음. 잠시 후 다시 시도할 수 있는 일시적 오류입니다.
+    """
+    pass
+
+async def _fetch_user_exists(user_id: int) -> Tuple[bool, Optional[str]]:
+    """
+    user-service에 사용자 존재 여부를 조회합니다.
+    반환값: (존재 여부, 오류 메시지). user-service 장애로 판단할 수 없으면 UserServiceUnavailableError를 발생시킵니다.
+    """
+    client = http_clients.get("user_service") # 앱 전역 커넥션 풀 재사용
+    try:
+        user_response = await client.get(f"{USER_SERVICE_URL}/users/{user_id}")
+        user_response.raise_for_status()  # 2xx 외의 응답은 예외 발생
+        return True, None
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return False, f"User with ID {user_id} not found"
+        raise UserServiceUnavailableError(f"User service error: {e}")
+    except httpx.RequestError as e:
+        raise UserServiceUnavailableError(f"Could not connect to user service: {e}")
+
+async def validate_user_exists(user_id: int) -> Optional[str]:
+    """
+    사용자가 user-service에 존재하는지 확인하고, 문제가 있으면 오류 메시지를 반환합니다.
+    결과는 긍정/부정 TTL로 캐시하고 같은 ID의 동시 조회는 하나로 합치며,
+    user-service 장애 시에는 만료된 긍정 결과를 STALE_GRACE 동안 그대로 사용하고,
+    사용할 결과가 없으면 UserServiceUnavailableError를 발생시킵니다.
+    TRUST_JWT_SUB가 켜져 있으면 JWT의 sub 클레임을 신뢰하여 조회하지 않습니다.
+    """
+    global _stale_hits
+    if Config.TRUST_JWT_SUB:
+        return None
+
+    cached = _validated_users.get(user_id)
+    if cached is not None:
+        exists, checked_at = cached
+        fresh_ttl = Config.USER_CACHE_POSITIVE_TTL_SECONDS if exists else Config.USER_CACHE_NEGATIVE_TTL_SECONDS
+        if time.monotonic() - checked_at < fresh_ttl:
+            return None if exists else f"User with ID {user_id} not found"
+
+    try:
+        exists, error = await _user_lookup_flights.do(user_id, lambda: _fetch_user_exists(user_id))
+    except UserServiceUnavailableError as e:
+        if cached is not None and cached[0]:
+            _stale_hits += 1
+            print(f"user-service 조회 실패, 캐시된 사용자 {user_id} 검증 결과를 사용합니다: {e}")
+            return None
+        raise
+
+    _validated_users.set(
+        user_id,
+        (exists, time.monotonic()),
+        ttl=(Config.USER_CACHE_POSITIVE_TTL_SECONDS + Config.USER_CACHE_STALE_GRACE_SECONDS) if exists
+        else Config.USER_CACHE_NEGATIVE_TTL_SECONDS
+    )
+    return None if exists else error
+
+def stats() -> dict:
+    return dict(_validated_users.stats(), stale_hits=_stale_hits, **_user_lookup_flights.stats())
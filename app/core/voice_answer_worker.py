@@ -0,0 +1,138 @@
+import asyncio
+import os
+from typing import List, Optional
+
+from app.config.config import Config
+from app.core import async_crud_service
+from app.core.audio_service import TranscodeQueueFullError
+from app.utils.db import AsyncSessionLocal
+
+class VoiceAnswerJobWorker:
+    """
+    비동기 모드로 접수된 음성 답변 작업(voice_answer_jobs)을 처리하는 인프로세스 워커 풀.
+    작업 상태는 DB에 있으므로 재시작 후에도 이어서 처리되며,
+    heartbeat가 끊긴 작업은 주기적으로 회수하여 다시 대기열에 넣습니다.
+    """
+    def __init__(
+        self,
+        concurrency: int = Config.VOICE_JOB_WORKERS,
+        poll_interval: float = Config.VOICE_JOB_POLL_INTERVAL_SECONDS,
+        heartbeat_interval: float = Config.VOICE_JOB_HEARTBEAT_SECONDS,
+        stall_timeout: float = Config.VOICE_JOB_STALL_TIMEOUT_SECONDS,
+        max_attempts: int = Config.VOICE_JOB_MAX_ATTEMPTS
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stall_timeout = stall_timeout
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"processed": 0, "succeeded": 0, "failed": 0, "retried": 0, "reclaimed": 0, "active": 0}
+
+    async def start(self):
+        if self._tasks:
+            return
+        for index in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._worker_loop(), name=f"voice-job-worker-{index}"))
+        self._tasks.append(asyncio.create_task(self._reap_loop(), name="voice-job-reaper"))
+        print(f"Voice answer job worker started with {self.concurrency} workers")
+
+    async def stop(self):
+        # 처리 중이던 작업은 heartbeat가 끊겨 다음 기동 시 회수됨
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        print("Voice answer job worker stopped")
+
+    def stats(self) -> dict:
+        return dict(self._stats, concurrency=self.concurrency)
+
+    async def _worker_loop(self):
+        while True:
+            try:
+                job = await self._claim_next_job()
+            except Exception as e:
+                print(f"음성 답변 작업 조회 중 오류 발생: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._process(*job)
+
+    async def _claim_next_job(self) -> Optional[tuple]:
+        async with AsyncSessionLocal() as db:
+            db_job = await async_crud_service.claim_next_voice_answer_job(db)
+            if db_job is None:
+                return None
+            return db_job.id, db_job.user_id, db_job.question_id, db_job.audio_file_path, db_job.attempts
+
+    async def _run_with_session(self, func, *args, **kwargs):
+        async with AsyncSessionLocal() as db:
+            return await func(db, *args, **kwargs)
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self._run_with_session(async_crud_service.touch_voice_answer_job, job_id)
+            except Exception as e:
+                print(f"음성 답변 작업 {job_id} heartbeat 갱신 실패: {e}")
+
+    async def _process(self, job_id: str, user_id: int, question_id: int, audio_file_path: str, attempts: int):
+        # 순환 임포트를 피하기 위해 지연 임포트
+        from app.helper import question_helper
+
+        self._stats["active"] += 1
+        heartbeat_task = asyncio.create_task(self._heartbeat(job_id))
+        db = AsyncSessionLocal()
+        try:
+            if not os.path.exists(audio_file_path):
+                status, answer_id, error = "failed", None, "업로드된 오디오 파일을 찾을 수 없습니다."
+            else:
+                # 영구 오류만 (None, 메시지)로 반환되고, 업스트림 장애 등 일시적 오류는 예외로 전파되어 재시도됨
+                db_answer, error = await question_helper.process_voice_answer_file(
+                    db, question_id, user_id, audio_file_path, raise_retryable=True
+                )
+                status = "failed" if error or db_answer is None else "succeeded"
+                answer_id = db_answer.id if db_answer is not None else None
+                if status == "failed" and not error:
+                    error = "Answer could not be created or found."
+        except TranscodeQueueFullError:
+            # 트랜스코딩 풀 포화: 잠시 후 다시 처리하도록 대기열로 되돌림
+            status, answer_id, error = "pending", None, None
+        except Exception as e:
+            print(f"음성 답변 작업 {job_id} 처리 중 오류 발생: {e}")
+            status = "failed" if attempts >= self.max_attempts else "pending"
+            answer_id, error = None, f"오디오 처리 및 분석 중 오류 발생: {e}"
+        finally:
+            heartbeat_task.cancel()
+            await db.close()
+            self._stats["active"] -= 1
+
+        await self._run_with_session(async_crud_service.finish_voice_answer_job, job_id, status, answer_id, error)
+        self._stats["processed"] += 1
+        if status == "pending":
+            self._stats["retried"] += 1
+            await asyncio.sleep(self.poll_interval)
+            return
+        self._stats[status] += 1
+        if os.path.exists(audio_file_path):
+            os.remove(audio_file_path) # 처리가 끝난 업로드 파일 삭제
+
+    async def _reap_loop(self):
+        while True:
+            try:
+                reclaimed = await self._run_with_session(
+                    async_crud_service.requeue_stalled_voice_answer_jobs,
+                    self.stall_timeout,
+                    self.max_attempts
+                )
+                if reclaimed:
+                    self._stats["reclaimed"] += reclaimed
+                    print(f"Reclaimed {reclaimed} stalled voice answer jobs")
+            except Exception as e:
+                print(f"멈춘 음성 답변 작업 회수 중 오류 발생: {e}")
+            await asyncio.sleep(max(self.stall_timeout / 2, self.poll_interval))
+
+voice_answer_worker = VoiceAnswerJobWorker()
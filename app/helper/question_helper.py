@@ -1,183 +1,600 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, List, Optional, Tuple
 import os
 from fastapi import UploadFile # UploadFile 임포트
-import tempfile
+import asyncio
+import uuid
 import datetime # datetime 모듈 임포트
-from pydub import AudioSegment # pydub 임포트
+import time
+from collections import Counter
+from pydantic import ValidationError
+import numpy as np
 
 from app import models, schemas
-from app.core.llm_service import get_recommended_question, convert_voice_to_text, analyze_voice_with_service, get_embedding
+from app.core.llm_service import get_recommended_question, convert_voice_to_text, analyze_voice_with_service, get_embeddings
 from app.config.config import Config
 from app.core.s3_service import S3Service
-from app.core.kafka_producer_service import publish_score_update # publish_score_update 함수 임포트
-from app.core import crud_service # crud_service 임포트
-from app.utils.functions import cosine_similarity, sigmoid_mapping
+from app.core.audio_service import transcode_pool, save_upload_to_temp_file, TranscodeQueueFullError
+from app.core import async_crud_service # 이벤트 루프를 막지 않는 AsyncSession CRUD
+from app.core import question_cache
+from app.core import question_dedup
+from app.core.user_service import UserServiceUnavailableError, validate_user_exists
+from app.utils.functions import SemanticScorer, pack_embeddings, unpack_embeddings
+from app.utils.pipeline import Stage, StageError, run_stage_graph
+from app.utils.rate_limit import AsyncRateLimiter
+from app.utils.singleflight import SingleFlight
+from app.utils.db import AsyncSessionLocal
 
-USER_SERVICE_URL = Config.USER_SERVICE_URL
+EMBEDDING_DIMENSIONS = Config.EMBEDDING_DIMENSIONS
+
+# multi-row INSERT 한 번의 최대 행 수 (asyncpg 바인드 파라미터 한도 32767 / 행당 파라미터 4개)
+QUESTION_IMPORT_MAX_BATCH_SIZE = 32767 // 4
+
+# (user_id, daily_date, require_personalized)별 진행 중인 질문 생성
+_daily_question_flights = SingleFlight()
 
 # 기존 create_question, read_questions, read_question, update_question, delete_question 함수는 crud_service로 이동했으므로 제거
 # 기존 get_answers_by_user, get_answer_by_id, delete_answer 함수는 crud_service로 이동했으므로 제거
 
-async def get_daily_question(user_id: int, db: Session) -> Optional[schemas.Question]:
+async def compute_question_embeddings(content: str, expected_answers: Optional[List[str]]) -> Tuple[bytes, bytes]:
+    """
+    질문과 예상 답변들의 임베딩을 계산하여 DB에 저장할 수 있는 packed bytes로 반환합니다.
+    """
+    # 질문과 예상 답변을 한 번의 배치 요청으로 임베딩
+    embeddings = await get_embeddings([content] + list(expected_answers or []), dimensions=EMBEDDING_DIMENSIONS)
+    return pack_embeddings(embeddings[0]), pack_embeddings(embeddings[1:])
+
+async def create_question_with_embeddings(
+    db: AsyncSession,
+    question: schemas.QuestionCreate,
+    upsert: bool = False,
+    embeddings: Optional[Tuple[bytes, bytes]] = None
+) -> models.Question:
+    """
+    질문 저장 시 질문/예상 답변 임베딩을 한 번만 계산하여 함께 저장합니다.
+    임베딩 계산에 실패해도 질문은 저장하며, 임베딩은 채점 시점에 다시 계산됩니다.
+    upsert가 True이면 (user_id, daily_date) 충돌 시 이미 저장된 질문을 반환합니다.
+    embeddings가 주어지면 (중복 검사 등에서 이미 계산한 경우) 다시 계산하지 않습니다.
+    """
+    content_embedding = None
+    expected_answer_embeddings = None
+    try:
+        content_embedding, expected_answer_embeddings = embeddings or await compute_question_embeddings(
+            question.content, question.expected_answers
+        )
+    except Exception as e:
+        print(f"질문 임베딩 사전 계산 실패 (채점 시 다시 계산됩니다): {e}")
+
+    embedding_dimensions = EMBEDDING_DIMENSIONS if content_embedding is not None else None
+    if upsert:
+        db_question, _ = await async_crud_service.upsert_daily_question(
+            db=db,
+            question=question,
+            content_embedding=content_embedding,
+            expected_answer_embeddings=expected_answer_embeddings,
+            embedding_dimensions=embedding_dimensions
+        )
+        return db_question
+    return await async_crud_service.create_question(
+        db=db,
+        question=question,
+        content_embedding=content_embedding,
+        expected_answer_embeddings=expected_answer_embeddings,
+        embedding_dimensions=embedding_dimensions
+    )
+
+async def import_questions(
+    db: AsyncSession,
+    records: AsyncIterator[Tuple[int, Any]],
+    batch_size: int = Config.QUESTION_IMPORT_BATCH_SIZE
+) -> schemas.QuestionImportSummary:
+    """
+    (행 번호, 원본 객체) 스트림을 QuestionCreate로 검증하여 batch_size 행씩 multi-row INSERT로 저장합니다.
+    배치마다 커밋하며, (user_id, daily_date) 질문이 이미 있는 행과 검증에 실패한 행은 행 번호와 함께 보고합니다.
+    임베딩은 계산하지 않으며 채점 시점 또는 backfill_question_embeddings 작업에서 채워집니다.
+    """
+    batch_size = max(1, min(batch_size, QUESTION_IMPORT_MAX_BATCH_SIZE))
+    started = time.perf_counter()
+    counts = {"received": 0, "inserted": 0, "conflicts": 0, "invalid": 0, "batches": 0}
+    errors: List[schemas.QuestionImportRowError] = []
+    errors_truncated = False
+    batch: List[Tuple[int, schemas.QuestionCreate]] = []
+
+    def report(row: int, status: str, detail: str):
+        nonlocal errors_truncated
+        if len(errors) < Config.QUESTION_IMPORT_MAX_REPORTED_ERRORS:
+            errors.append(schemas.QuestionImportRowError(row=row, status=status, detail=detail))
+        else:
+            errors_truncated = True
+
+    async def flush():
+        inserted = await async_crud_service.bulk_insert_questions(db, [question for _, question in batch])
+        # 저장된 (user_id, daily_date)를 입력 순서대로 한 행씩 대응시키고, 남는 행은 충돌로 보고 (배치 내 중복 포함)
+        inserted_keys = Counter((user_id, daily_date) for _, user_id, daily_date in inserted)
+        for row, question in batch:
+            if question.user_id is None or question.daily_date is None:
+                continue # 유니크 제약 대상이 아니므로 항상 저장됨
+            key = (question.user_id, question.daily_date)
+            if inserted_keys[key]:
+                inserted_keys[key] -= 1
+            else:
+                counts["conflicts"] += 1
+                report(row, "conflict", f"user_id={question.user_id}, daily_date={question.daily_date} 질문이 이미 있습니다.")
+        counts["inserted"] += len(inserted)
+        counts["batches"] += 1
+        batch.clear()
+
+    async for row, record in records:
+        counts["received"] += 1
+        if isinstance(record, Exception):
+            counts["invalid"] += 1
+            report(row, "invalid", str(record))
+            continue
+        try:
+            question = schemas.QuestionCreate.model_validate(record)
+        except ValidationError as e:
+            counts["invalid"] += 1
+            report(row, "invalid", "; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc']) or 'row'}: {error['msg']}" for error in e.errors()
+            ))
+            continue
+        batch.append((row, question))
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    elapsed = time.perf_counter() - started
+    print(f"Imported {counts['inserted']} of {counts['received']} questions in {elapsed:.2f}s "
+          f"({counts['conflicts']} conflicts, {counts['invalid']} invalid)")
+    return schemas.QuestionImportSummary(
+        **counts,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(counts["received"] / elapsed, 1) if elapsed > 0 else 0.0,
+        errors=errors,
+        errors_truncated=errors_truncated
+    )
+
+async def get_question_embeddings(db: AsyncSession, question: models.Question) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    질문에 저장된 (질문 벡터, 예상 답변 행렬)을 반환합니다.
+    저장된 임베딩이 없거나 차원이 다르면 계산 후 저장합니다 (lazy backfill).
+    """
+    if (
+        question.content_embedding is None
+        or question.expected_answer_embeddings is None
+        or question.embedding_dimensions != EMBEDDING_DIMENSIONS
+    ):
+        content_embedding, expected_answer_embeddings = await compute_question_embeddings(
+            question.content, question.expected_answers
+        )
+        question = await async_crud_service.update_question_embeddings(
+            db=db,
+            db_question=question,
+            content_embedding=content_embedding,
+            expected_answer_embeddings=expected_answer_embeddings,
+            embedding_dimensions=EMBEDDING_DIMENSIONS
+        )
+
+    question_embedding = unpack_embeddings(question.content_embedding, question.embedding_dimensions)[0]
+    expected_answer_matrix = unpack_embeddings(question.expected_answer_embeddings, question.embedding_dimensions)
+    return question_embedding, expected_answer_matrix
+
+async def backfill_question_embeddings(db: AsyncSession, batch_size: int = 100) -> int:
+    """
+    임베딩이 저장되지 않은 기존 질문들의 임베딩을 계산하여 저장합니다.
+    처리한 질문 수를 반환합니다.
+    """
+    processed = 0
+    last_id = 0
+    while True:
+        questions = await async_crud_service.get_questions_missing_embeddings(db, after_id=last_id, limit=batch_size)
+        if not questions:
+            break
+        last_id = questions[-1].id
+
+        # 배치 내 모든 질문/예상 답변 텍스트를 모아 한 번에 임베딩
+        texts = []
+        spans = []
+        for question in questions:
+            start = len(texts)
+            texts.append(question.content)
+            texts.extend(question.expected_answers or [])
+            spans.append((start, len(texts)))
+        try:
+            embeddings = await get_embeddings(texts, dimensions=EMBEDDING_DIMENSIONS)
+        except Exception as e:
+            print(f"질문 {questions[0].id}~{last_id} 임베딩 백필 실패: {e}")
+            continue
+
+        for question, (start, end) in zip(questions, spans):
+            await async_crud_service.update_question_embeddings(
+                db=db,
+                db_question=question,
+                content_embedding=pack_embeddings(embeddings[start]),
+                expected_answer_embeddings=pack_embeddings(embeddings[start + 1:end]),
+                embedding_dimensions=EMBEDDING_DIMENSIONS
+            )
+            processed += 1
+        print(f"Backfilled question embeddings up to id {last_id} ({processed} processed)")
+    return processed
+
+async def generate_daily_question(
+    db: AsyncSession,
+    user_id: int,
+    daily_date: datetime.date,
+    require_personalized: bool = False
+) -> Optional[schemas.Question]:
+    """
+    LLM(Dify)으로 사용자의 질문을 생성하여 daily_date의 질문으로 저장합니다.
+    require_personalized가 True이면 Dify 실패 시의 기본 질문은 저장하지 않고 None을 반환합니다.
+    사전 생성(require_personalized)에서는 최근 질문과 거의 같은 질문이 생성되면 QUESTION_DEDUP_MAX_REGENERATIONS번까지
+    다시 생성하고, 그래도 중복이면 그중 가장 덜 비슷한 질문을 저장합니다. (저장하지 않으면 재시도와 아침 요청 경로에서
+    Dify를 더 호출한 뒤 결국 중복 검사 없이 저장되므로) 사용자 요청 경로는 advisory lock과 커넥션을 잡은 채
+    Dify를 여러 번 기다리지 않도록 한 번만 생성하여 그대로 저장합니다.
+    """
+    check_duplicates = Config.QUESTION_DEDUP_ENABLED and require_personalized
+    best = None # (유사도, 추천 질문, 임베딩)
+    attempts = Config.QUESTION_DEDUP_MAX_REGENERATIONS + 1 if check_duplicates else 1
+    for attempt in range(attempts):
+        recommended_question_from_llm = await get_recommended_question(user_id)
+        if not recommended_question_from_llm:
+            break
+        if not recommended_question_from_llm.expected_answers:
+            # Dify 실패 시의 기본 질문은 다시 생성해도 같으므로 중복 검사하지 않음
+            if best is None:
+                best = (None, recommended_question_from_llm, None)
+            break
+
+        embeddings = None
+        try:
+            embeddings = await compute_question_embeddings(
+                recommended_question_from_llm.content, recommended_question_from_llm.expected_answers
+            )
+        except Exception as e:
+            print(f"질문 임베딩 사전 계산 실패 (채점 시 다시 계산됩니다): {e}")
+        if embeddings is None or not check_duplicates:
+            best = (None, recommended_question_from_llm, embeddings)
+            break
+
+        content_vector = unpack_embeddings(embeddings[0], EMBEDDING_DIMENSIONS)[0]
+        duplicate_id, similarity = await question_dedup.find_near_duplicate(db, user_id, content_vector)
+        if best is None or best[0] is None or similarity < best[0]:
+            best = (similarity, recommended_question_from_llm, embeddings)
+        if duplicate_id is None:
+            break
+        print(f"사용자 {user_id}의 질문 {duplicate_id}와 비슷한 질문이 생성되었습니다 "
+              f"(유사도 {similarity:.3f}, 시도 {attempt + 1}/{attempts})")
+
+    if best is None:
+        return None
+    similarity, recommended_question_from_llm, embeddings = best
+    if similarity is not None and similarity >= Config.QUESTION_DEDUP_THRESHOLD:
+        print(f"사용자 {user_id}의 {daily_date} 질문이 최근 질문과 계속 비슷하여 가장 덜 비슷한 질문을 저장합니다 (유사도 {similarity:.3f}).")
+    if require_personalized and not recommended_question_from_llm.expected_answers:
+        print(f"Dify에서 개인화 질문을 받지 못해 사용자 {user_id}의 {daily_date} 질문을 저장하지 않습니다.")
+        return None
+
+    # LLM에서 받은 질문에 user_id와 daily_date를 추가하여 DB에 저장
+    # 다른 경로에서 먼저 저장했다면 (유니크 제약 충돌) 저장된 질문을 그대로 사용
+    question_to_create = schemas.QuestionCreate(
+        content=recommended_question_from_llm.content,
+        expected_answers=recommended_question_from_llm.expected_answers,
+        user_id=user_id,
+        daily_date=daily_date
+    )
+    db_question = await create_question_with_embeddings(
+        db=db, question=question_to_create, upsert=True, embeddings=embeddings
+    )
+    if db_question.content_embedding is not None and db_question.embedding_dimensions:
+        question_dedup.add(
+            user_id, db_question.id,
+            unpack_embeddings(db_question.content_embedding, db_question.embedding_dimensions)[0]
+        )
+    return schemas.Question.model_validate(db_question)
+
+async def get_or_create_daily_question(
+    user_id: int,
+    daily_date: datetime.date,
+    require_personalized: bool = False,
+    session_factory=AsyncSessionLocal
+) -> Optional[schemas.Question]:
+    """
+    (user_id, daily_date) 질문을 조회하고 없으면 생성합니다.
+    같은 프로세스의 동시 요청은 하나의 생성을 함께 기다리고(single-flight),
+    다른 프로세스와는 advisory lock으로 순서를 맞춰 Dify 호출이 사용자/날짜당 한 번만 일어나도록 합니다.
+    """
+    async def generate():
+        # 요청 세션이 먼저 닫혀도 생성이 계속될 수 있도록 별도 세션 사용
+        async with session_factory() as db:
+            await async_crud_service.lock_daily_question_generation(db, user_id, daily_date)
+            existing_question = await async_crud_service.get_question_by_user_and_date(db, user_id, daily_date)
+            if existing_question:
+                question = schemas.Question.model_validate(existing_question)
+            else:
+                question = await generate_daily_question(db, user_id, daily_date, require_personalized=require_personalized)
+            if question is not None:
+                question_cache.store(question)
+            return question
+
+    # 사전 생성(require_personalized)은 기본 질문 대신 None을 반환할 수 있으므로 사용자 요청과 결과를 공유하지 않음
+    # (같은 사용자/날짜의 두 생성은 advisory lock으로 순서가 맞춰져 나중 쪽이 저장된 질문을 사용)
+    return await _daily_question_flights.do((user_id, daily_date, require_personalized), generate)
+
+async def get_daily_question(user_id: int, db: AsyncSession) -> Optional[schemas.Question]:
     today = datetime.date.today()
     
-    # 1. 먼저 user_id와 현재 날짜를 기준으로 데이터베이스에서 기존 질문을 조회
-    existing_question = crud_service.get_question_by_user_and_date(db, user_id, today)
+    # 1. 먼저 user_id와 현재 날짜를 기준으로 기존 질문을 조회 (대부분 사전 생성되어 있고, 캐시 적중 시 DB 조회 없음)
+    existing_question = await async_crud_service.get_question_by_user_and_date_cached(db, user_id, today)
     if existing_question:
         return existing_question
 
-    # 2. 기존 질문이 없다면 LLM을 통해 새로운 질문을 생성
-    recommended_question_from_llm = await get_recommended_question(user_id)
-    
-    if recommended_question_from_llm:
-        # 3. LLM에서 받은 질문에 user_id와 daily_date를 추가하여 DB에 저장
-        question_to_create = schemas.QuestionCreate(
-            content=recommended_question_from_llm.content,
-            expected_answers=recommended_question_from_llm.expected_answers,
-            user_id=user_id,
-            daily_date=today
-        )
-        db_question = crud_service.create_question(db=db, question=question_to_create)
-        
-        # LLM에서 받은 질문 객체에 DB에서 생성된 ID와 created_at 업데이트
-        recommended_question_from_llm.id = db_question.id
-        recommended_question_from_llm.created_at = db_question.created_at
-        recommended_question_from_llm.user_id = db_question.user_id
-        recommended_question_from_llm.daily_date = db_question.daily_date
-        
-        return recommended_question_from_llm
-    return None
-
-async def create_answer(db: Session, answer: schemas.AnswerCreate):
-    # 1. user-service를 호출하여 user_id 유효성 검증
-    async with httpx.AsyncClient() as client:
-        try:
-            user_response = await client.get(f"{USER_SERVICE_URL}/users/{answer.user_id}")
-            user_response.raise_for_status()  # 2xx 외의 응답은 예외 발생
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return None, f"User with ID {answer.user_id} not found"
-            return None, f"User service error: {e}"
-        except httpx.RequestError as e:
-            return None, f"Could not connect to user service: {e}"
+    # 2. 기존 질문이 없다면 LLM을 통해 새로운 질문을 생성 (동시 요청은 하나의 생성을 공유)
+    return await get_or_create_daily_question(user_id, today)
+
+async def pregenerate_daily_questions(
+    daily_date: datetime.date,
+    concurrency: int = Config.PREGENERATE_CONCURRENCY,
+    rate_per_second: float = Config.PREGENERATE_RATE_PER_SECOND,
+    progress: Optional[dict] = None,
+    session_factory=AsyncSessionLocal
+) -> dict:
+    """
+    활성 사용자 전원의 daily_date 질문을 미리 생성합니다.
+    이미 질문이 있는 사용자는 건너뛰므로 실패 후 다시 실행하면 남은 사용자만 이어서 처리합니다.
+    진행 상황은 progress 딕셔너리에 기록되며 최종 결과로 반환됩니다.
+    """
+    progress = progress if progress is not None else {}
+    async with session_factory() as db:
+        since_date = daily_date - datetime.timedelta(days=Config.ACTIVE_USER_WINDOW_DAYS)
+        user_ids = await async_crud_service.get_active_user_ids(db, since_date)
+        existing_user_ids = set(await async_crud_service.get_user_ids_with_question_on(db, daily_date))
+
+    pending_user_ids = [user_id for user_id in user_ids if user_id not in existing_user_ids]
+    progress.update({
+        "daily_date": daily_date.isoformat(),
+        "total": len(user_ids),
+        "skipped": len(user_ids) - len(pending_user_ids),
+        "processed": 0,
+        "generated": 0,
+        "failed": 0,
+        "failed_user_ids": [],
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "finished_at": None,
+    })
+    print(f"Pre-generating {daily_date} questions for {len(pending_user_ids)} of {len(user_ids)} active users")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    rate_limiter = AsyncRateLimiter(rate_per_second)
+    report_every = max(len(pending_user_ids) // 10, 1)
+
+    async def generate_for(user_id: int):
+        async with semaphore:
+            await rate_limiter.wait()
+            try:
+                async with session_factory() as user_db:
+                    already_exists = await async_crud_service.get_question_by_user_and_date(user_db, user_id, daily_date)
+                if already_exists:
+                    progress["skipped"] += 1
+                elif await get_or_create_daily_question(
+                    user_id, daily_date, require_personalized=True, session_factory=session_factory
+                ):
+                    progress["generated"] += 1
+                else:
+                    progress["failed"] += 1
+                    progress["failed_user_ids"].append(user_id)
+            except Exception as e:
+                print(f"사용자 {user_id}의 {daily_date} 질문 사전 생성 실패: {e}")
+                progress["failed"] += 1
+                progress["failed_user_ids"].append(user_id)
+
+            progress["processed"] += 1
+            processed = progress["processed"]
+            if processed % report_every == 0 or processed == len(pending_user_ids):
+                print(f"Pre-generation progress: {processed}/{len(pending_user_ids)} "
+                      f"(generated {progress['generated']}, failed {progress['failed']})")
+
+    await asyncio.gather(*(generate_for(user_id) for user_id in pending_user_ids))
+    progress["finished_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return progress
+
+async def create_answer(db: AsyncSession, answer: schemas.AnswerCreate, raise_retryable: bool = False):
+    # 1. user-service를 호출하여 user_id 유효성 검증 (TTL 캐시 및 동시 조회 병합)
+    try:
+        user_error = await validate_user_exists(answer.user_id)
+    except UserServiceUnavailableError as e:
+        # user-service 장애는 일시적 오류이므로 비동기 작업에서는 재시도하도록 전파
+        if raise_retryable:
+            raise
+        return None, f"user-service 장애로 사용자를 확인하지 못했습니다: {e}"
+    if user_error:
+        return None, user_error
 
     # 2. question_id 유효성 검증 (daily-question-service 내에서)
-    question = crud_service.read_question(db=db, question_id=answer.question_id) # crud_service.read_question 사용
+    question = await async_crud_service.read_question(db=db, question_id=answer.question_id)
     if not question:
         return None, f"Question with ID {answer.question_id} not found"
 
-    # 3. 답변 저장 (crud_service의 create_answer_db 사용)
-    db_answer = crud_service.create_answer_db(db=db, answer=answer)
+    # 3. 답변 저장 (async_crud_service의 create_answer_db 사용)
+    # 점수 업데이트 이벤트는 같은 트랜잭션에서 outbox에 기록되고 outbox relay가 Kafka로 발행
+    db_answer = await async_crud_service.create_answer_db(db=db, answer=answer, with_score_event=True)
     return db_answer, None
 
+class VoiceAnswerError(Exception):
+    """
+    음성 답변 처리 중 사용자에게 그대로 전달할 메시지를 가진 오류. 다시 시도해도 같은 결과인 영구 오류에 사용합니다.
+    """
+    pass
+
+class AudioUploadError(Exception):
+    """
+    MP3 변환/S3 업로드 실패. 일시적인 장애일 수 있으므로 비동기 작업에서는 재시도합니다.
+    """
+    pass
+
+def build_semantic_scorer(question_embedding: np.ndarray, expected_answer_embeddings: np.ndarray) -> SemanticScorer:
+    """
+    질문/예상 답변 임베딩으로 설정값(Config.SEMANTIC_*)이 적용된 의미 점수 계산기를 만듭니다.
+    """
+    return SemanticScorer(
+        question_embedding,
+        expected_answer_embeddings,
+        dimensions=Config.SEMANTIC_SCORING_DIMENSIONS,
+        top_k=Config.SEMANTIC_TOP_K,
+        relevance_threshold=Config.SEMANTIC_RELEVANCE_THRESHOLD,
+        sigmoid_k=Config.SEMANTIC_SIGMOID_K,
+        sigmoid_x0=Config.SEMANTIC_SIGMOID_X0
+    )
+
+async def compute_semantic_score(db: AsyncSession, question: models.Question, text_content: str) -> Optional[float]:
+    """
+    사용자 답변 텍스트와 질문/예상 답변 임베딩을 비교하여 의미 유사도 점수(0~100)를 계산합니다.
+    """
+    # 질문/예상 답변 임베딩은 질문 생성 시 저장된 값을 재사용하고, 사용자 답변만 새로 임베딩
+    question_embedding, expected_answer_embeddings = await get_question_embeddings(db, question)
+    user_answer_embedding = (await get_embeddings([text_content], dimensions=EMBEDDING_DIMENSIONS))[0]
+    if not user_answer_embedding:
+        return None
+
+    # 관련성 게이트, 상위 k개 평균, 시그모이드 매핑을 행렬 연산 한 번으로 계산
+    result = build_semantic_scorer(question_embedding, expected_answer_embeddings).score_many(user_answer_embedding)
+    relevance_similarity = float(result.relevance[0])
+    semantic_score = float(result.scores[0])
+    print(f"Relevance similarity between user answer and question: {relevance_similarity}")
+    if relevance_similarity < Config.SEMANTIC_RELEVANCE_THRESHOLD:
+        print("Relevance gate activated: semantic_score set to 0.0")
+        return 0.0
+    if np.isnan(semantic_score):
+        return None
+
+    print(f"Top {Config.SEMANTIC_TOP_K} average semantic similarity score (before sigmoid): {float(result.raw_scores[0])}")
+    print(f"Mapped semantic score (after sigmoid): {semantic_score}")
+    return semantic_score
+
 async def upload_and_save_voice_answer(
-    db: Session,
+    db: AsyncSession,
     question_id: int,
     user_id: int,
     audio_file: UploadFile
 ):
-    s3_service = S3Service()
+    # 업로드를 청크 단위로 임시 WebM 파일에 기록 (크기 제한 초과 시 AudioTooLargeError)
+    webm_tmp_file_path = await save_upload_to_temp_file(audio_file, suffix=".webm")
+    print(f"Temporary WebM file saved to: {webm_tmp_file_path}")
+    try:
+        return await process_voice_answer_file(db, question_id, user_id, webm_tmp_file_path)
+    finally:
+        if os.path.exists(webm_tmp_file_path):
+            os.remove(webm_tmp_file_path) # 임시 WebM 파일 삭제
+            print(f"Temporary WebM file removed: {webm_tmp_file_path}")
 
-    file_content = await audio_file.read()
-    original_file_extension = os.path.splitext(audio_file.filename)[1]
-    
-    # 임시 WAV 파일 경로
-    webm_tmp_file_path = None
-    # 임시 MP3 파일 경로
-    mp3_tmp_file_path = None
-    
-    audio_file_url = None
-    text_content = None
-    cognitive_score = None
-    analysis_details = None
-    semantic_score = None
+async def enqueue_voice_answer_job(
+    db: AsyncSession,
+    question_id: int,
+    user_id: int,
+    audio_file: UploadFile
+) -> models.VoiceAnswerJob:
+    """
+    업로드를 영구 저장소(VOICE_JOB_STORAGE_DIR)에 기록하고 비동기 처리 작업을 등록합니다.
+    실제 처리는 voice_answer_worker가 담당합니다.
+    """
+    os.makedirs(Config.VOICE_JOB_STORAGE_DIR, exist_ok=True)
+    audio_file_path = await save_upload_to_temp_file(audio_file, suffix=".webm", directory=Config.VOICE_JOB_STORAGE_DIR)
+    try:
+        return await async_crud_service.create_voice_answer_job(
+            db=db,
+            job_id=uuid.uuid4().hex,
+            user_id=user_id,
+            question_id=question_id,
+            audio_file_path=audio_file_path
+        )
+    except Exception:
+        os.remove(audio_file_path)
+        raise
+
+async def process_voice_answer_file(
+    db: AsyncSession,
+    question_id: int,
+    user_id: int,
+    webm_file_path: str,
+    raise_retryable: bool = False
+):
+    """
+    디스크에 저장된 WebM 음성 답변을 처리(MP3 변환/S3 업로드, STT, 음성 분석, 의미 점수)하고 답변을 저장합니다.
+    영구 오류(VoiceAnswerError)는 (None, 메시지)로 반환합니다. raise_retryable이 True이면(비동기 작업)
+    S3/STT/음성 분석/user-service 장애 등 나머지 오류는 재시도할 수 있도록 예외를 그대로 전파합니다.
+    """
+    s3_service = S3Service()
 
     try:
-        # 1. 원본 오디오(WebM)를 임시 파일에 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp_webm_file:
-            tmp_webm_file.write(file_content)
-            webm_tmp_file_path = tmp_webm_file.name
-        print(f"Temporary WebM file saved to: {webm_tmp_file_path}")
-
-        # 2. WebM 파일을 MP3로 변환
-        mp3_tmp_file_path = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
-        AudioSegment.from_file(webm_tmp_file_path, format="webm").export(mp3_tmp_file_path, format="mp3")
-        print(f"Converted WebM to MP3: {mp3_tmp_file_path}")
-
-        # 3. MP3 파일을 S3에 업로드
         mp3_object_name = f"voice_answers/{user_id}_{question_id}_{os.urandom(4).hex()}.mp3"
-        with open(mp3_tmp_file_path, "rb") as mp3_file_content:
-            if not s3_service.upload_file(mp3_file_content.read(), mp3_object_name):
+
+        async def upload():
+            # ffmpeg 변환 출력을 S3 멀티파트 업로드로 바로 스트리밍 (프로세스 풀에서 실행)
+            if not await transcode_pool.transcode_and_upload_mp3(webm_file_path, mp3_object_name):
                 print("S3 MP3 upload failed.")
-                return None, "MP3 오디오 파일을 S3에 업로드하지 못했습니다."
-        print("S3 MP3 upload successful.")
-        audio_file_url = s3_service.get_file_url(mp3_object_name)
-        if not audio_file_url:
-            print("Failed to get S3 MP3 file URL.")
-            return None, "S3 MP3 파일 URL을 가져오지 못했습니다."
-        print(f"S3 MP3 file URL: {audio_file_url}")
-
-        # 4. STT 변환 (원본 WebM 파일 사용)
-        text_content = await convert_voice_to_text(webm_tmp_file_path)
-        print(f"STT conversion successful. Text: {text_content}")
-
-        # 5. 음성 분석 서비스 호출 (MP3 URL 사용)
-        print(f"Calling voice analysis service for URL: {audio_file_url}")
-        analysis_result = await analyze_voice_with_service(audio_file_url)
-        cognitive_score = analysis_result.get("cognitive_score")
-        analysis_details = analysis_result.get("details")
-        print(f"Voice analysis successful. Score: {cognitive_score}, Details: {analysis_details}")
-
-        # 6. 의미 유사도 점수 계산
-        if text_content and question_id:
-            question = crud_service.read_question(db=db, question_id=question_id) # crud_service.read_question 사용
-            if question and question.content:
-                question_embedding = await get_embedding(question.content, dimensions=1024)
-                user_answer_embedding = await get_embedding(text_content, dimensions=1024)
-
-                if question_embedding and user_answer_embedding:
-                    relevance_similarity = cosine_similarity(user_answer_embedding, question_embedding)
-                    print(f"Relevance similarity between user answer and question: {relevance_similarity}")
-
-                    # 관련성 게이트: 유사도 임계값 이하일 경우 semantic_score를 0으로 설정
-                    if relevance_similarity < 0.2: # 임계값 설정 (조정 가능)
-                        semantic_score = 0.0
-                        print(f"Relevance gate activated: semantic_score set to {semantic_score}")
-                    else:
-                        similarities = []
-                        for expected_ans in question.expected_answers:
-                            expected_ans_embedding = await get_embedding(expected_ans, dimensions=1024)
-                            if expected_ans_embedding:
-                                similarity = cosine_similarity(user_answer_embedding, expected_ans_embedding)
-                                similarities.append(similarity)
-                        
-                        if similarities:
-                            # 유사도 점수를 내림차순으로 정렬하고 상위 3개의 평균을 계산
-                            similarities.sort(reverse=True)
-                            top_n_similarities = similarities[:3] # 상위 3개 선택
-                            average_similarity = sum(top_n_similarities) / len(top_n_similarities)
-                            semantic_score = round((average_similarity + 1) / 2 * 100, 2) # -1~1 스케일을 0~100 스케일로 변환
-                            
-                            # 시그모이드 매핑 적용
-                            mapped_semantic_score = sigmoid_mapping(semantic_score, k=0.1, x0=50.0)
-                            semantic_score = round(mapped_semantic_score, 2)
-
-                            print(f"Semantic similarity scores: {similarities}")
-                            print(f"Top 3 average semantic similarity score (before sigmoid): {round((average_similarity + 1) / 2 * 100, 2)}")
-                            print(f"Mapped semantic score (after sigmoid): {semantic_score}")
+                raise AudioUploadError("MP3 오디오 파일을 S3에 업로드하지 못했습니다.")
+            print("S3 MP3 upload successful.")
+            audio_file_url = s3_service.get_file_url(mp3_object_name)
+            if not audio_file_url:
+                print("Failed to get S3 MP3 file URL.")
+                raise VoiceAnswerError("S3 MP3 파일 URL을 가져오지 못했습니다.")
+            print(f"S3 MP3 file URL: {audio_file_url}")
+            return audio_file_url
 
+        async def stt():
+            # STT 변환 (원본 WebM 파일 사용)
+            text_content = await convert_voice_to_text(webm_file_path)
+            print(f"STT conversion successful. Text: {text_content}")
+            return text_content
+
+        async def question():
+            # 질문 조회 (없으면 나머지 단계를 취소하고 바로 실패)
+            db_question = await async_crud_service.read_question(db, question_id)
+            if not db_question:
+                raise VoiceAnswerError(f"Question with ID {question_id} not found")
+            return db_question
+
+        async def analysis(upload):
+            # 음성 분석 서비스 호출 (MP3 URL 사용)
+            print(f"Calling voice analysis service for URL: {upload}")
+            analysis_result = await analyze_voice_with_service(upload)
+            print(f"Voice analysis successful. Score: {analysis_result.get('cognitive_score')}, Details: {analysis_result.get('details')}")
+            return analysis_result
+
+        async def scoring(stt, question):
+            # 의미 유사도 점수 계산
+            if not stt or not question.content:
+                return None
+            return await compute_semantic_score(db, question, stt)
+
+        # 단계 간 의존 관계: 음성 분석은 S3 URL만, 의미 점수는 STT 결과와 질문만 기다림
+        results = await run_stage_graph({
+            "upload": Stage(deps=[], func=upload),
+            "stt": Stage(deps=[], func=stt),
+            "question": Stage(deps=[], func=question),
+            "analysis": Stage(deps=["upload"], func=analysis),
+            "scoring": Stage(deps=["stt", "question"], func=scoring),
+        })
+        audio_file_url = results["upload"]
+        text_content = results["stt"]
+        cognitive_score = results["analysis"].get("cognitive_score")
+        analysis_details = results["analysis"].get("details")
+        semantic_score = results["scoring"]
+
+    except StageError as e:
+        print(f"오디오 처리 및 분석 중 오류 발생 ({e.stage}): {e.error}")
+        if isinstance(e.error, TranscodeQueueFullError):
+            raise e.error # 라우터에서 503으로 응답
+        if isinstance(e.error, VoiceAnswerError):
+            return None, str(e.error)
+        if raise_retryable:
+            raise
+        return None, f"오디오 처리 및 분석 중 오류 발생: {e.error}"
     except Exception as e:
         print(f"오디오 처리 및 분석 중 오류 발생: {e}")
+        if raise_retryable:
+            raise
         return None, f"오디오 처리 및 분석 중 오류 발생: {e}"
-    finally:
-        if webm_tmp_file_path and os.path.exists(webm_tmp_file_path):
-            os.remove(webm_tmp_file_path) # 임시 WebM 파일 삭제
-            print(f"Temporary WebM file removed: {webm_tmp_file_path}")
-        if mp3_tmp_file_path and os.path.exists(mp3_tmp_file_path):
-            os.remove(mp3_tmp_file_path) # 임시 MP3 파일 삭제
-            print(f"Temporary MP3 file removed: {mp3_tmp_file_path}")
 
     answer_create = schemas.AnswerCreate(
         question_id=question_id,
@@ -189,20 +606,9 @@ async def upload_and_save_voice_answer(
         semantic_score=semantic_score # 의미 유사도 점수 저장
     )
     print(f"Attempting to create answer with data: {answer_create.model_dump_json()}")
-    db_answer, error_message = await create_answer(db=db, answer=answer_create)
+    db_answer, error_message = await create_answer(db=db, answer=answer_create, raise_retryable=raise_retryable)
     print(f"create_answer returned: db_answer={db_answer}, error_message={error_message}")
     if error_message:
         return None, error_message
 
-    # Kafka 메시지 발행
-    if cognitive_score is not None and semantic_score is not None:
-        current_timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        publish_score_update(
-            user_id=str(user_id),
-            answer_id=str(db_answer.id) if db_answer else "", # db_answer가 None일 경우 빈 문자열
-            cognitive_score=cognitive_score,
-            semantic_score=semantic_score,
-            timestamp=current_timestamp
-        )
-
     return db_answer, None
\ No newline at end of file
@@ -0,0 +1,27 @@
+import argparse
+import asyncio
+
+from app.utils.db import AsyncSessionLocal, async_engine
+from app.helper import question_helper
+
+def main():
+    """
+    임베딩이 저장되지 않은 기존 질문들의 임베딩을 계산하여 저장합니다.
+    사용법: python -m app.jobs.backfill_question_embeddings --batch-size 100
+    """
+    parser = argparse.ArgumentParser(description="기존 질문의 질문/예상 답변 임베딩 백필")
+    parser.add_argument("--batch-size", type=int, default=100, help="한 번에 조회할 질문 수")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await question_helper.backfill_question_embeddings(db, batch_size=args.batch_size)
+        finally:
+            await async_engine.dispose() # 이벤트 루프 종료 전에 커넥션 정리
+
+    processed = asyncio.run(run())
+    print(f"Backfilled embeddings for {processed} questions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+
+from app.config.config import Config
+from app.core import embedding_store
+from app.core.llm_service import EMBEDDING_MODEL
+from app.utils.db import AsyncSessionLocal, async_engine
+
+def main():
+    """
+    임베딩 저장소의 벡터를 .npy(N x D)와 텍스트 해시 .keys.npy 파일로 내보냅니다.
+    내보낸 파일은 embedding_store.load_npy로 메모리 맵으로 열어 대량 스캔/분석에 사용합니다.
+    사용법: python -m app.jobs.export_embeddings --output embeddings.npy --dtype float16
+    """
+    parser = argparse.ArgumentParser(description="저장된 임베딩을 메모리 맵용 .npy 파일로 내보내기")
+    parser.add_argument("--output", default="embeddings.npy", help="벡터 파일 경로 (해시는 <이름>.keys.npy에 저장)")
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--dimensions", type=int, default=Config.EMBEDDING_DIMENSIONS)
+    parser.add_argument("--dtype", choices=sorted(embedding_store.STORE_DTYPES), default="float32", help="내보낼 벡터 형식")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await embedding_store.export_npy(db, args.output, args.model, args.dimensions, args.dtype)
+        finally:
+            await async_engine.dispose() # 이벤트 루프 종료 전에 커넥션 정리
+
+    exported = asyncio.run(run())
+    print(f"Exported {exported} embeddings to {args.output} ({embedding_store.keys_path(args.output)})")
+
+if __name__ == "__main__":
+    main()
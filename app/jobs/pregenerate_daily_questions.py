@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+import datetime
+
+from app.config.config import Config
+from app.helper import question_helper
+from app.utils.db import async_engine
+
+def main():
+    """
+    활성 사용자들의 '오늘의 질문'을 미리 생성합니다. 중단 후 다시 실행하면 남은 사용자만 처리합니다.
+    사용법: python -m app.jobs.pregenerate_daily_questions --date 2025-07-12
+    """
+    parser = argparse.ArgumentParser(description="활성 사용자의 오늘의 질문 사전 생성")
+    parser.add_argument("--date", type=datetime.date.fromisoformat,
+                        default=datetime.date.today() + datetime.timedelta(days=1),
+                        help="질문 날짜 (기본값: 내일)")
+    parser.add_argument("--concurrency", type=int, default=Config.PREGENERATE_CONCURRENCY, help="동시 Dify 호출 수")
+    parser.add_argument("--rate", type=float, default=Config.PREGENERATE_RATE_PER_SECOND, help="초당 Dify 호출 시작 수")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            return await question_helper.pregenerate_daily_questions(
+                args.date, concurrency=args.concurrency, rate_per_second=args.rate
+            )
+        finally:
+            await async_engine.dispose() # 이벤트 루프 종료 전에 커넥션 정리
+
+    result = asyncio.run(run())
+    print(f"Pre-generation finished for {args.date}: generated {result['generated']}, "
+          f"skipped {result['skipped']}, failed {result['failed']}")
+    if result["failed_user_ids"]:
+        print(f"Failed user IDs: {result['failed_user_ids']}")
+
+if __name__ == "__main__":
+    main()
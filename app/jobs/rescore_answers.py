@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config.config import Config
+from app.core import async_crud_service
+from app.core.kafka_producer_service import SCORE_UPDATES_TOPIC, build_score_update_payload
+from app.core.llm_service import get_embeddings
+from app.helper import question_helper
+from app.utils.db import AsyncSessionLocal, async_engine
+from app.utils.functions import SemanticScorer
+
+QUESTION_EMBEDDING_CACHE_SIZE = 10000 # 청크 간에 재사용할 질문 임베딩 수
+
+def score_groups(groups: List[Tuple[np.ndarray, np.ndarray, List[int], np.ndarray]], scoring: dict) -> List[Tuple[int, Optional[float]]]:
+    """
+    (질문 벡터, 예상 답변 행렬, 답변 ID 목록, 답변 임베딩 행렬) 묶음별로 의미 점수를 계산합니다.
+    프로세스 풀 워커에서 실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    results = []
+    for question_embedding, expected_answer_embeddings, answer_ids, answer_embeddings in groups:
+        scores = SemanticScorer(question_embedding, expected_answer_embeddings, **scoring).score_many(answer_embeddings).scores
+        results.extend(
+            (answer_id, None if np.isnan(score) else float(score))
+            for answer_id, score in zip(answer_ids, scores)
+        )
+    return results
+
+def load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # 중간에 종료되어도 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+class AnswerRescorer:
+    """
+    저장된 답변의 semantic_score를 현재 채점 설정으로 다시 계산합니다.
+    답변은 서버 측 커서로 청크 단위로 읽고, 답변 텍스트는 청크마다 한 번의 배치 요청으로 임베딩하며,
+    질문 임베딩은 DB에 저장된 값을 재사용합니다. 채점은 프로세스 풀에서 병렬로 수행하고
+    결과는 청크 순서대로 bulk UPDATE한 뒤 체크포인트를 기록하므로 중단 후 이어서 실행할 수 있습니다.
+    """
+    def __init__(
+        self,
+        scoring: dict,
+        chunk_size: int,
+        workers: int,
+        checkpoint_path: str,
+        emit_events: bool = False,
+        dry_run: bool = False,
+        min_change: float = 0.01
+    ):
+        self.scoring = scoring
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.emit_events = emit_events
+        self.dry_run = dry_run
+        self.min_change = min_change
+        self._question_embeddings: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._stats = {"processed": 0, "updated": 0, "unchanged": 0, "errors": 0, "events": 0}
+
+    async def _load_question_embeddings(self, db, question_ids) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        question_ids = set(question_ids)
+        if len(self._question_embeddings) + len(question_ids) > QUESTION_EMBEDDING_CACHE_SIZE:
+            # 현재 청크에 필요한 질문만 남기고 제거
+            self._question_embeddings = {
+                question_id: embeddings for question_id, embeddings in self._question_embeddings.items()
+                if question_id in question_ids
+            }
+        missing = [question_id for question_id in question_ids if question_id not in self._question_embeddings]
+        for question in await async_crud_service.get_questions_by_ids(db, missing):
+            # 저장된 임베딩이 없으면 계산 후 저장 (lazy backfill)
+            self._question_embeddings[question.id] = await question_helper.get_question_embeddings(db, question)
+        return self._question_embeddings
+
+    async def _prepare_chunk(self, db, rows) -> list:
+        # 청크의 답변 텍스트를 한 번에 임베딩하고 질문별로 묶음
+        question_embeddings = await self._load_question_embeddings(db, {row.question_id for row in rows})
+        missing = {row.question_id for row in rows} - question_embeddings.keys()
+        if missing:
+            # 건너뛰면 체크포인트가 이 답변들을 지나가 다시 채점되지 않으므로 작업을 중단
+            self._stats["errors"] += 1
+            raise RuntimeError(f"질문 {sorted(missing)}의 임베딩을 불러오지 못했습니다.")
+        answer_embeddings = np.asarray(
+            await get_embeddings([row.text_content for row in rows], dimensions=Config.EMBEDDING_DIMENSIONS),
+            dtype=np.float32
+        )
+        indices_by_question: Dict[int, List[int]] = {}
+        for index, row in enumerate(rows):
+            indices_by_question.setdefault(row.question_id, []).append(index)
+        return [
+            (
+                *question_embeddings[question_id],
+                [rows[index].id for index in indices],
+                answer_embeddings[indices]
+            )
+            for question_id, indices in indices_by_question.items()
+        ]
+
+    async def _write_chunk(self, db, rows, results: List[Tuple[int, Optional[float]]]):
+        rows_by_id = {row.id: row for row in rows}
+        updates = []
+        events = []
+        timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        for answer_id, score in results:
+            row = rows_by_id[answer_id]
+            old_score = row.semantic_score
+            if score == old_score or (score is not None and old_score is not None and abs(score - old_score) < self.min_change):
+                self._stats["unchanged"] += 1
+                continue
+            updates.append({"id": answer_id, "semantic_score": score})
+            if self.emit_events and score is not None and row.cognitive_score is not None:
+                events.append({
+                    "topic": SCORE_UPDATES_TOPIC,
+                    "key": str(row.user_id),
+                    "payload": build_score_update_payload(
+                        user_id=str(row.user_id),
+                        answer_id=str(answer_id),
+                        cognitive_score=row.cognitive_score,
+                        semantic_score=score,
+                        timestamp=timestamp
+                    )
+                })
+        if not self.dry_run:
+            await async_crud_service.update_answer_semantic_scores(db, updates, events)
+        self._stats["updated"] += len(updates)
+        self._stats["events"] += len(events)
+
+    async def run(self, restart: bool = False) -> dict:
+        checkpoint = {} if restart else load_checkpoint(self.checkpoint_path)
+        last_answer_id = checkpoint.get("last_answer_id", 0)
+        if checkpoint:
+            if checkpoint.get("scoring") != self.scoring:
+                print(f"경고: 체크포인트의 채점 설정 {checkpoint.get('scoring')}이 현재 설정과 다릅니다.")
+            self._stats.update(checkpoint.get("stats", {}))
+            print(f"Resuming from answer id {last_answer_id}")
+
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) if self.workers > 0 else None
+        pending = deque() # (청크 행, 채점 future) - 청크 순서대로 기록하여 체크포인트가 항상 연속 구간을 가리키도록 함
+
+        async def drain(limit: int):
+            nonlocal last_answer_id
+            while len(pending) > limit:
+                rows, future = pending.popleft()
+                await self._write_chunk(write_db, rows, await future)
+                self._stats["processed"] += len(rows)
+                last_answer_id = rows[-1].id
+                if not self.dry_run:
+                    save_checkpoint(self.checkpoint_path, {
+                        "last_answer_id": last_answer_id,
+                        "scoring": self.scoring,
+                        "stats": self._stats,
+                        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    })
+                print(f"Rescored up to answer id {last_answer_id}: {self._stats}")
+
+        try:
+            async with AsyncSessionLocal() as read_db, AsyncSessionLocal() as write_db:
+                async for rows in async_crud_service.stream_answers_for_rescoring(
+                    read_db, after_id=last_answer_id, chunk_size=self.chunk_size
+                ):
+                    try:
+                        groups = await self._prepare_chunk(write_db, rows)
+                    except Exception:
+                        # 앞선 청크까지 기록하고 체크포인트를 남긴 뒤 중단 (다시 실행하면 이 청크부터 이어서 처리)
+                        await drain(0)
+                        raise
+                    if executor is not None:
+                        future = loop.run_in_executor(executor, score_groups, groups, self.scoring)
+                    else:
+                        future = loop.create_future()
+                        future.set_result(score_groups(groups, self.scoring))
+                    pending.append((rows, future))
+                    # 워커 수만큼의 청크를 채점하는 동안 다음 청크를 읽고 임베딩
+                    await drain(max(self.workers, 1))
+                await drain(0)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return dict(self._stats, last_answer_id=last_answer_id)
+
+def main():
+    """
+    저장된 답변의 semantic_score를 현재 채점 설정(Config.SEMANTIC_* 또는 인자)으로 다시 계산합니다.
+    중단 후 다시 실행하면 체크포인트 파일의 마지막 답변 ID 다음부터 이어서 처리합니다.
+    사용법: python -m app.jobs.rescore_answers --chunk-size 1000 --workers 4 --emit-events
+    """
+    parser = argparse.ArgumentParser(description="기존 답변 의미 점수 일괄 재계산")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="한 번에 읽고 임베딩할 답변 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="채점 프로세스 수 (0이면 현재 프로세스에서 채점)")
+    parser.add_argument("--checkpoint", default="rescore_answers.checkpoint.json", help="체크포인트 파일 경로")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 실행")
+    parser.add_argument("--emit-events", action="store_true", help="점수가 바뀐 답변의 점수 업데이트 이벤트를 outbox에 기록")
+    parser.add_argument("--dry-run", action="store_true", help="DB에 쓰지 않고 바뀔 답변 수만 집계")
+    parser.add_argument("--min-change", type=float, default=0.01, help="이 값 미만의 점수 변화는 무시")
+    parser.add_argument("--dimensions", type=int, default=Config.SEMANTIC_SCORING_DIMENSIONS)
+    parser.add_argument("--relevance-threshold", type=float, default=Config.SEMANTIC_RELEVANCE_THRESHOLD)
+    parser.add_argument("--top-k", type=int, default=Config.SEMANTIC_TOP_K)
+    parser.add_argument("--sigmoid-k", type=float, default=Config.SEMANTIC_SIGMOID_K)
+    parser.add_argument("--sigmoid-x0", type=float, default=Config.SEMANTIC_SIGMOID_X0)
+    args = parser.parse_args()
+
+    rescorer = AnswerRescorer(
+        scoring={
+            "dimensions": args.dimensions,
+            "top_k": args.top_k,
+            "relevance_threshold": args.relevance_threshold,
+            "sigmoid_k": args.sigmoid_k,
+            "sigmoid_x0": args.sigmoid_x0,
+        },
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        emit_events=args.emit_events,
+        dry_run=args.dry_run,
+        min_change=args.min_change
+    )
+
+    async def run():
+        try:
+            return await rescorer.run(restart=args.restart)
+        finally:
+            await async_engine.dispose() # 이벤트 루프 종료 전에 커넥션 정리
+
+    result = asyncio.run(run())
+    print(f"Rescoring finished: {result}")
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,4 @@
 from .question import Question, Answer
+from .outbox import OutboxEvent
+from .voice_answer_job import VoiceAnswerJob
+from .embedding import StoredEmbedding
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, LargeBinary
+from app.utils.db import Base
+
+class StoredEmbedding(Base):
+    __tablename__ = "embeddings"
+
+    # (텍스트 해시, 모델, 차원)이 같으면 같은 벡터이므로 기본 키로 사용
+    text_hash = Column(String(64), primary_key=True) # 텍스트의 sha256 hex
+    model = Column(String, primary_key=True) # 임베딩 모델 이름
+    dimensions = Column(Integer, primary_key=True) # 임베딩 차원
+    dtype = Column(String, nullable=False) # 저장 형식 (float32 또는 float16)
+    vector = Column(LargeBinary, nullable=False) # 임베딩 벡터 (packed bytes)
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, Text, JSON, Index, text
+from app.utils.db import Base
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic = Column(String, nullable=False) # 발행할 Kafka 토픽
+    key = Column(String, nullable=True) # 메시지 키 (같은 키는 순서대로 발행)
+    payload = Column(JSON, nullable=False) # 메시지 본문
+    attempts = Column(Integer, nullable=False, default=0) # 발행 실패 횟수
+    last_error = Column(Text, nullable=True) # 마지막 발행 실패 사유
+    created_at = Column(DateTime, server_default=func.now())
+    published_at = Column(DateTime, nullable=True) # 발행 완료 시각 (NULL이면 미발행)
+
+    # 미발행 이벤트만 빠르게 찾기 위한 부분 인덱스, 보존 기간이 지난 발행 완료 이벤트 삭제용 부분 인덱스
+    __table_args__ = (
+        Index('ix_outbox_events_unpublished', 'id', postgresql_where=text('published_at IS NULL')),
+        Index('ix_outbox_events_published_at', 'published_at', postgresql_where=text('published_at IS NOT NULL')),
+    )
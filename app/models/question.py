@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Text, Float, JSON, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Text, Float, JSON, Date, UniqueConstraint, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from app.utils.db import Base
 
@@ -10,6 +10,9 @@ class Question(Base):
     expected_answers = Column(JSON, nullable=True) # LLM이 생성한 예상 답변 목록
     user_id = Column(Integer, nullable=True, index=True) # 사용자 ID 추가
     daily_date = Column(Date, nullable=True) # 오늘의 질문 날짜 (YYYY-MM-DD)
+    content_embedding = Column(LargeBinary, nullable=True) # 질문 임베딩 (float32 packed bytes)
+    expected_answer_embeddings = Column(LargeBinary, nullable=True) # 예상 답변 임베딩 행렬 (float32 packed bytes, N x D)
+    embedding_dimensions = Column(Integer, nullable=True) # 저장된 임베딩 차원
     created_at = Column(DateTime, server_default=func.now())
 
     __table_args__ = (UniqueConstraint('user_id', 'daily_date', name='_user_daily_question_uc'),)
@@ -22,7 +25,7 @@ class Answer(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Question과의 관계 (같은 서비스 내이므로 FK 사용)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False, index=True)
     
     # User와의 관계 (다른 서비스이므로 FK 없이 ID만 저장)
     user_id = Column(Integer, index=True, nullable=False)
@@ -35,4 +38,9 @@ class Answer(Base):
 
     created_at = Column(DateTime, server_default=func.now())
 
+    # 사용자별 질문별 최신 답변 조회(DISTINCT ON)를 인덱스 순서대로 읽기 위한 복합 인덱스 (id는 같은 시각 답변의 순서 결정용)
+    __table_args__ = (
+        Index('ix_answers_user_question_created_at', user_id, question_id, created_at.desc(), id.desc()),
+    )
+
     question = relationship("Question", back_populates="answers")
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Text
+from sqlalchemy.orm import relationship
+from app.utils.db import Base
+
+class VoiceAnswerJob(Base):
+    __tablename__ = "voice_answer_jobs"
+
+    id = Column(String(32), primary_key=True) # uuid4 hex
+    user_id = Column(Integer, index=True, nullable=False)
+    question_id = Column(Integer, nullable=False)
+    audio_file_path = Column(String, nullable=False) # 영구 저장된 업로드 파일 경로
+    status = Column(String(20), nullable=False, default="pending", index=True) # pending, processing, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0) # 처리 시도 횟수
+    answer_id = Column(Integer, ForeignKey("answers.id"), nullable=True) # 처리 완료 시 생성된 답변
+    error = Column(Text, nullable=True) # 실패 사유
+    heartbeat_at = Column(DateTime, nullable=True) # 처리 중인 워커가 주기적으로 갱신 (멈춘 작업 회수용)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    answer = relationship("Answer")
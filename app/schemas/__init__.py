@@ -2,8 +2,13 @@ from .question_schema import (
     QuestionBase,
     QuestionCreate,
     Question,
+    QuestionImportRowError,
+    QuestionImportSummary,
     AnswerBase,
     AnswerCreate,
     Answer,
-    AnswerWithQuestion
+    AnswerWithQuestion,
+    AnswersBulkQuery,
+    UserAnswers,
+    VoiceAnswerJob
 )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime, date # date 타입 임포트
 
@@ -19,6 +19,24 @@ class Question(QuestionBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# 질문 일괄 가져오기 결과
+class QuestionImportRowError(BaseModel):
+    row: int # 입력 행 번호 (JSON 배열은 1부터 시작하는 순번, NDJSON은 줄 번호)
+    status: str # invalid, conflict
+    detail: str
+
+class QuestionImportSummary(BaseModel):
+    received: int
+    inserted: int
+    conflicts: int # (user_id, daily_date) 질문이 이미 있어 건너뛴 행 수
+    invalid: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: List[QuestionImportRowError] = [] # 충돌/검증 실패 행 (최대 QUESTION_IMPORT_MAX_REPORTED_ERRORS건)
+    errors_truncated: bool = False
+
+
 # Answer 스키마
 class AnswerBase(BaseModel):
     audio_file_url: str
@@ -46,3 +64,30 @@ class Answer(AnswerBase):
 # 답변 조회 시, 관련된 질문 정보까지 포함하는 상세 스키마
 class AnswerWithQuestion(Answer):
     question: Question
+
+# 여러 사용자의 최신 답변 일괄 조회 (대시보드용)
+class AnswersBulkQuery(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1)
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    per_user_limit: Optional[int] = None # 사용자당 최대 답변 수 (없으면 BULK_ANSWERS_DEFAULT_PER_USER)
+
+class UserAnswers(BaseModel):
+    user_id: int
+    answers: List[Answer] # 질문별 최신 답변, 최근 순
+
+
+# 비동기 음성 답변 처리 작업 스키마
+class VoiceAnswerJob(BaseModel):
+    id: str
+    status: str # pending, processing, succeeded, failed
+    question_id: int
+    user_id: int
+    attempts: int
+    answer_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    answer: Optional[Answer] = None # 처리 완료 시 결과
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,5 @@
 import numpy as np
-from typing import List
+from typing import List, NamedTuple, Optional
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
@@ -20,12 +20,97 @@ def sigmoid_mapping(score: float, k: float = 0.1, x0: float = 50.0) -> float:
     k: 곡선의 가파른 정도를 조절하는 파라미터 (클수록 가파름)
     x0: 곡선의 중간점 (변곡점)을 조절하는 파라미터
     """
+    return float(_sigmoid_scores(score, k, x0))
+
+def _sigmoid_scores(scores, k: float, x0: float):
+    # sigmoid_mapping의 계산부 (스칼라/배열 모두 지원)
     # 점수를 0-1 스케일로 정규화 (0-100 -> 0-1)
-    normalized_score = score / 100.0
+    normalized_score = np.asarray(scores, dtype=np.float64) / 100.0
     
     # 시그모이드 함수 적용 (입력값을 -6 ~ 6 범위로 매핑하여 시그모이드의 유효 구간 활용)
     # x0를 0-1 스케일에 맞춰 변환
     mapped_score = 1 / (1 + np.exp(-k * (normalized_score * 100 - x0)))
     
     # 다시 0-100 스케일로 변환
-    return float(mapped_score * 100)
+    return mapped_score * 100
+
+def pack_embeddings(vectors) -> bytes:
+    """
+    임베딩 벡터(또는 벡터 목록)를 float32 바이트로 직렬화합니다.
+    JSON 리스트 대비 약 1/4 크기로 DB 컬럼에 저장할 수 있습니다.
+    """
+    return np.asarray(vectors, dtype=np.float32).tobytes()
+
+def unpack_embeddings(data: bytes, dimensions: int) -> np.ndarray:
+    """
+    pack_embeddings로 직렬화된 바이트를 (N x dimensions) float32 행렬로 복원합니다.
+    """
+    return np.frombuffer(data, dtype=np.float32).reshape(-1, dimensions)
+
+def normalize_rows(vectors, dimensions: Optional[int] = None) -> np.ndarray:
+    """
+    벡터(또는 N x D 행렬)를 float32 행렬로 변환하고 각 행을 L2 정규화합니다.
+    dimensions가 주어지면 앞쪽 dimensions 차원만 남긴 뒤 정규화합니다 (Matryoshka 임베딩 축소).
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if dimensions is not None and dimensions < matrix.shape[1]:
+        matrix = matrix[:, :dimensions]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class SemanticScores(NamedTuple):
+    relevance: np.ndarray # 답변-질문 코사인 유사도
+    raw_scores: np.ndarray # 상위 k개 예상 답변 유사도 평균을 0~100으로 변환한 점수 (시그모이드 전)
+    scores: np.ndarray # 최종 의미 점수. 관련성 게이트에 걸리면 0, 예상 답변이 없으면 NaN
+
+class SemanticScorer:
+    """
+    질문 벡터와 예상 답변 행렬을 미리 정규화(float32)해 두고,
+    하나 또는 여러 답변 벡터의 의미 점수를 행렬 곱 한 번으로 계산합니다.
+    점수 계산 방식: 관련성 게이트 → 상위 top_k 예상 답변 유사도 평균 → 0~100 변환 → 시그모이드 매핑
+    """
+    def __init__(
+        self,
+        question_vector,
+        expected_answer_matrix,
+        dimensions: Optional[int] = None,
+        top_k: int = 3,
+        relevance_threshold: float = 0.2,
+        sigmoid_k: float = 0.1,
+        sigmoid_x0: float = 50.0
+    ):
+        question = normalize_rows(question_vector, dimensions)
+        self.dimensions = question.shape[1]
+        expected = np.asarray(expected_answer_matrix, dtype=np.float32).reshape(-1, np.shape(question_vector)[-1])
+        expected = normalize_rows(expected, self.dimensions)
+        self.expected_count = len(expected)
+        self.top_k = min(top_k, self.expected_count)
+        self.relevance_threshold = relevance_threshold
+        self.sigmoid_k = sigmoid_k
+        self.sigmoid_x0 = sigmoid_x0
+        # 0행은 질문, 나머지는 예상 답변. 답변 행렬과 한 번만 곱하면 관련성과 유사도를 함께 얻음
+        self._reference_t = np.ascontiguousarray(np.vstack([question, expected]).T)
+
+    def score_many(self, answer_vectors) -> SemanticScores:
+        answers = normalize_rows(answer_vectors, self.dimensions)
+        similarities = answers @ self._reference_t # (M x (1 + N))
+        relevance = similarities[:, 0]
+        raw_scores = np.full(len(answers), np.nan)
+        scores = np.full(len(answers), np.nan)
+        if self.top_k:
+            expected = similarities[:, 1:]
+            # 정렬 없이 상위 k개만 선택 (O(N))
+            top = np.partition(expected, self.expected_count - self.top_k, axis=1)[:, -self.top_k:]
+            average_similarity = top.astype(np.float64).mean(axis=1)
+            raw_scores = np.round((average_similarity + 1) / 2 * 100, 2) # -1~1 스케일을 0~100 스케일로 변환
+            scores = np.round(_sigmoid_scores(raw_scores, self.sigmoid_k, self.sigmoid_x0), 2)
+        # 관련성 게이트: 질문과의 유사도가 임계값 미만이면 0점
+        scores = np.where(relevance < self.relevance_threshold, 0.0, scores)
+        return SemanticScores(relevance=relevance, raw_scores=raw_scores, scores=scores)
+
+    def score(self, answer_vector) -> Optional[float]:
+        score = self.score_many(answer_vector).scores[0]
+        return None if np.isnan(score) else float(score)
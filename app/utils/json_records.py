@@ -0,0 +1,39 @@
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Tuple
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e: # JSONDecodeError, UnicodeDecodeError
+        return ValueError(f"JSON 파싱 실패: {e}")
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    NDJSON 바이트 스트림을 한 줄씩 파싱하여 (줄 번호, 객체)를 반환합니다.
+    본문 전체를 메모리에 올리지 않으며, 파싱에 실패한 줄은 객체 대신 ValueError를 반환합니다. 빈 줄은 건너뜁니다.
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, _parse_line(line)
+    if buffer.strip():
+        yield line_number + 1, _parse_line(buffer)
+
+def iter_json_array(body: bytes) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    JSON 배열 본문의 각 항목을 (1부터 시작하는 순번, 객체)로 반환하는 비동기 이터레이터를 만듭니다.
+    본문은 바로 파싱하므로 JSON 배열이 아니면 이 함수 호출 시점에 ValueError가 발생합니다.
+    """
+    records = json.loads(body)
+    if not isinstance(records, list):
+        raise ValueError("요청 본문은 JSON 배열이어야 합니다.")
+
+    async def generate():
+        for index, record in enumerate(records, start=1):
+            yield index, record
+    return generate()
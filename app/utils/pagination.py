@@ -0,0 +1,60 @@
+import base64
+import datetime
+import json
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from app.config.config import Config
+
+T = TypeVar("T")
+
+class InvalidCursorError(ValueError):
+    """
+    클라이언트가 보낸 커서를 해석할 수 없을 때 발생하는 오류.
+    """
+    pass
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+def encode_cursor(*values) -> str:
+    """
+    정렬 키 값들을 불투명한(opaque) URL-safe 커서 문자열로 인코딩합니다.
+    """
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str, *parsers: Callable) -> tuple:
+    """
+    encode_cursor로 만든 커서를 정렬 키 값 튜플로 되돌립니다.
+    parsers는 각 값을 원래 타입으로 바꾸는 함수입니다 (예: int, datetime.date.fromisoformat).
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor length mismatch")
+        return tuple(parser(value) for parser, value in zip(parsers, values))
+    except (ValueError, TypeError) as e: # binascii.Error, JSONDecodeError는 ValueError의 하위 클래스
+        raise InvalidCursorError("유효하지 않은 커서입니다.") from e
+
+def optional(parser: Callable) -> Callable:
+    # null일 수 있는 정렬 키용 파서 (커서에 null이 들어 있으면 None을 그대로 반환)
+    return lambda value: None if value is None else parser(value)
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    # 페이지 크기를 1 ~ MAX_PAGE_SIZE로 제한
+    if limit is None:
+        return Config.DEFAULT_PAGE_SIZE
+    return max(1, min(limit, Config.MAX_PAGE_SIZE))
+
+def paginate(rows: Sequence[T], limit: int, cursor_key: Callable[[T], tuple]) -> Tuple[List[T], Optional[str]]:
+    """
+    limit + 1개를 조회한 결과에서 한 페이지를 잘라내고 다음 페이지 커서를 만듭니다.
+    다음 페이지가 없으면 커서는 None입니다.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(*cursor_key(page[-1]))
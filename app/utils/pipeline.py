@@ -0,0 +1,84 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional
+
+class Stage(NamedTuple):
+    """
+    파이프라인 단계 정의.
+    deps: 먼저 끝나야 하는 단계 이름 목록 (결과가 같은 이름의 키워드 인자로 전달됨)
+    func: 실행할 코루틴 함수
+    timeout: 단계별 제한 시간(초), None이면 제한 없음
+    """
+    deps: Iterable[str]
+    func: Callable[..., Awaitable[Any]]
+    timeout: Optional[float] = None
+
+class StageError(Exception):
+    """
+    파이프라인 단계 실행 중 발생한 오류. 실패한 단계 이름과 원래 예외를 담습니다.
+    """
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"{stage} 단계 실패: {error}")
+        self.stage = stage
+        self.error = error
+
+def _check_graph(stages: Dict[str, Stage]):
+    # 존재하지 않는 의존 단계와 순환 의존을 미리 검사 (순환 시 서로를 무한히 기다리게 됨)
+    visiting, visited = set(), set()
+
+    def visit(name: str):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"파이프라인 단계에 순환 의존이 있습니다: {name}")
+        visiting.add(name)
+        for dep in stages[name].deps:
+            if dep not in stages:
+                raise ValueError(f"알 수 없는 의존 단계입니다: {name} -> {dep}")
+            visit(dep)
+        visiting.discard(name)
+        visited.add(name)
+
+    for name in stages:
+        visit(name)
+
+async def run_stage_graph(stages: Dict[str, Stage]) -> Dict[str, Any]:
+    """
+    의존 관계가 있는 비동기 단계들을 동시에 실행하고 단계별 결과를 반환합니다.
+    각 단계는 의존 단계가 끝나는 즉시 시작되므로 전체 소요 시간은 임계 경로(critical path)로 결정됩니다.
+    한 단계라도 실패하면 나머지 단계를 모두 취소하고 StageError를 발생시킵니다.
+    """
+    _check_graph(stages)
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(name: str):
+        stage = stages[name]
+        # 의존 단계가 실패하면 그 StageError가 그대로 전파됨
+        kwargs = {dep: await tasks[dep] for dep in stage.deps}
+        try:
+            if stage.timeout is not None:
+                return await asyncio.wait_for(stage.func(**kwargs), timeout=stage.timeout)
+            return await stage.func(**kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise StageError(name, e) from e
+
+    for name in stages:
+        tasks[name] = asyncio.create_task(run(name), name=f"stage:{name}")
+
+    try:
+        done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+        failed = [task for task in done if not task.cancelled() and task.exception() is not None]
+        if failed:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise failed[0].exception()
+    except BaseException:
+        # 호출자가 취소된 경우(클라이언트 연결 종료 등)에도 남은 단계를 정리
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,23 @@
+import asyncio
+
+class AsyncRateLimiter:
+    """
+    호출 시작 간격을 맞춰 초당 rate_per_second회 이하로 제한하는 단순 rate limiter.
+    rate_per_second가 0 이하이면 제한하지 않습니다.
+    """
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            delay = self._next_slot - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+                now = self._next_slot
+            self._next_slot = now + self.interval
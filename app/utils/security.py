@@ -2,14 +2,26 @@ import bcrypt
 import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError, DecodeError
 from datetime import datetime, timedelta
+import hashlib
 import os
+import time
+from typing import Callable, Optional
 
 from fastapi import HTTPException, status
 
+from app.config.config import Config
+from app.utils.cache import TTLCache
+
 SECRET_KEY = os.environ.get("SECRET_KEY")
+SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8") if SECRET_KEY else None # 요청마다 인코딩하지 않도록 미리 계산
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "5256000"))
 
+# 검증이 끝난 토큰의 클레임 캐시: sha256(토큰) -> claims
+# 항목은 TOKEN_CACHE_TTL_SECONDS와 토큰 exp 중 이른 시점에 만료되며, 검증에 실패한 토큰은 캐시하지 않음
+_verified_tokens = TTLCache(maxsize=Config.TOKEN_CACHE_MAX_SIZE, ttl=Config.TOKEN_CACHE_TTL_SECONDS)
+_revocation_hook: Optional[Callable[[dict], bool]] = None
+
 def hash_password(password : str) -> str :
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
@@ -23,9 +35,54 @@ def create_access_token(data : dict, expires_delta : timedelta = None) :
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm = ALGORITHM)
     return encoded_jwt
 
+def set_token_revocation_hook(hook: Optional[Callable[[dict], bool]]):
+    """
+    토큰 폐기 여부를 판단하는 함수(claims -> 폐기 여부)를 등록합니다. None을 넘기면 해제합니다.
+    캐시 적중 시에도 매 요청 호출되므로 빠르게 동작해야 합니다 (예: 메모리에 둔 jti/sub 차단 목록 조회).
+    """
+    global _revocation_hook
+    _revocation_hook = hook
+
+def invalidate_cached_token(token: str):
+    # 특정 토큰의 캐시된 검증 결과 제거 (다음 요청에서 다시 서명 검증)
+    _verified_tokens.delete(_token_digest(token))
+
+def clear_token_cache():
+    _verified_tokens.clear()
+
+def token_cache_stats() -> dict:
+    return dict(_verified_tokens.stats(), enabled=Config.TOKEN_CACHE_ENABLED, revocation_hook=_revocation_hook is not None)
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
 def decode_access_token(token : str) :
+    # 같은 토큰이 반복해서 들어오므로 서명 검증 결과를 캐시하여 HMAC 검증을 건너뜀
+    digest = _token_digest(token) if Config.TOKEN_CACHE_ENABLED else None
+    payload = _verified_tokens.get(digest) if digest is not None else None
+    if payload is None:
+        payload = _verify_access_token(token)
+        if digest is not None:
+            ttl = Config.TOKEN_CACHE_TTL_SECONDS
+            exp = payload.get("exp")
+            if exp is not None:
+                ttl = min(ttl, float(exp) - time.time())
+            if ttl > 0:
+                _verified_tokens.set(digest, payload, ttl=ttl)
+
+    if _revocation_hook is not None and _revocation_hook(payload):
+        if digest is not None:
+            _verified_tokens.delete(digest)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="폐기된 토큰입니다.",
+            headers={"WWW-Authenticate": "Bearer error=\"invalid_token\""}
+        )
+    return dict(payload) # 캐시된 클레임이 호출 측에서 변경되지 않도록 복사본 반환
+
+def _verify_access_token(token : str) :
     try : 
-        payload = jwt.decode(token, SECRET_KEY.encode('utf-8'), algorithms = [ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY_BYTES, algorithms = [ALGORITHM])
         return payload
     except ExpiredSignatureError:
         raise HTTPException(
@@ -0,0 +1,30 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    같은 키에 대한 동시 호출을 하나의 실행으로 합칩니다.
+    먼저 들어온 호출이 작업을 시작하고, 이후 호출들은 같은 결과(또는 예외)를 함께 기다립니다.
+    작업은 별도 태스크로 실행되므로 처음 호출한 쪽이 취소되어도 나머지 호출자는 결과를 받습니다.
+    """
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+
+            def forget(done_task, key=key):
+                if self._in_flight.get(key) is done_task:
+                    del self._in_flight[key]
+
+            task.add_done_callback(forget)
+        else:
+            self._shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._in_flight), "shared": self._shared}
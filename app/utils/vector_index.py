@@ -0,0 +1,75 @@
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.functions import normalize_rows
+
+class VectorIndex:
+    """
+    최근 벡터를 최대 capacity개까지 정규화된 float32 행렬(링 버퍼)에 보관하는 코사인 유사도 인덱스.
+    가득 차면 가장 오래된 벡터를 덮어쓰며(eviction), 질의는 행렬-벡터 곱 한 번으로 계산합니다.
+    dimensions가 입력 벡터보다 작으면 앞쪽 차원만 사용합니다 (Matryoshka 임베딩 축소).
+    """
+    def __init__(self, capacity: int, dimensions: int):
+        self.capacity = capacity
+        self.dimensions = dimensions
+        self._vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self._keys = np.full(capacity, -1, dtype=np.int64) # -1은 빈 칸 (삭제된 항목 포함)
+        self._size = 0
+        self._next = 0 # 다음에 덮어쓸 위치 (가장 오래된 항목)
+        self._removed = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size - self._removed
+
+    def add(self, key: int, vector):
+        self.add_many([key], [vector])
+
+    def add_many(self, keys: Iterable[int], vectors):
+        # 오래된 것부터 순서대로 넣어야 eviction 순서가 맞음
+        keys = list(keys)
+        if not keys:
+            return
+        matrix = normalize_rows(vectors, self.dimensions)
+        with self._lock:
+            for key, vector in zip(keys, matrix):
+                if self._keys[self._next] == -1 and self._next < self._size:
+                    self._removed -= 1
+                self._vectors[self._next] = vector
+                self._keys[self._next] = key
+                self._next = (self._next + 1) % self.capacity
+                self._size = min(self._size + 1, self.capacity)
+
+    def remove(self, key: int) -> bool:
+        with self._lock:
+            positions = np.flatnonzero(self._keys[:self._size] == key)
+            self._vectors[positions] = 0.0
+            self._keys[positions] = -1
+            self._removed += len(positions)
+            return len(positions) > 0
+
+    def search(self, vector, k: int = 1) -> List[Tuple[int, float]]:
+        """
+        가장 유사한 k개 항목을 [(키, 코사인 유사도)]로 유사도 내림차순 반환합니다.
+        """
+        query = normalize_rows(vector, self.dimensions)[0]
+        with self._lock:
+            similarities = self._vectors[:self._size] @ query
+            keys = self._keys[:self._size].copy()
+        if self._removed:
+            similarities[keys == -1] = -np.inf
+        k = min(k, len(similarities))
+        if k <= 0:
+            return []
+        top = np.argpartition(-similarities, k - 1)[:k] if k < len(similarities) else np.arange(len(similarities))
+        top = top[np.argsort(-similarities[top])]
+        return [(int(keys[i]), float(similarities[i])) for i in top if keys[i] != -1]
+
+    def nearest(self, vector) -> Tuple[Optional[int], float]:
+        """
+        가장 유사한 항목의 (키, 코사인 유사도)를 반환합니다. 비어 있으면 (None, -1.0)입니다.
+        """
+        result = self.search(vector, k=1)
+        return result[0] if result else (None, -1.0)
@@ -0,0 +1,118 @@
+"""
+답변 목록 응답의 행당 변환/직렬화 비용 마이크로벤치마크.
+
+변경 전: ORM 엔티티 조회 → __dict__ 복사 → schemas.Answer 생성 → FastAPI response_model 재검증 → json.dumps
+변경 후: 필요한 컬럼만 조회 → row mapping dict → orjson 한 번 직렬화
+
+쿼리 비용을 빼고 행 처리 비용만 비교하기 위해 인메모리 SQLite에 같은 행을 넣고 측정합니다.
+DATABASE_URL은 앱 모듈 임포트에만 쓰이며 접속하지 않습니다.
+
+사용법:
+    python -m benchmarks.answer_listing_serialization --rows 1000 --detail-keys 50
+"""
+import argparse
+import datetime
+import json
+import random
+import statistics
+import time
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import crud_service
+
+def seed(engine, rows: int, detail_keys: int):
+    models.Question.__table__.create(bind=engine)
+    models.Answer.__table__.create(bind=engine)
+    random.seed(0)
+    started_at = datetime.datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Question.__table__), [
+            {"id": index + 1, "content": f"질문 {index + 1}: 오늘 가장 기억에 남는 일은 무엇인가요?", "user_id": 1,
+             "daily_date": started_at.date() + datetime.timedelta(days=index), "created_at": started_at}
+            for index in range(rows)
+        ])
+        conn.execute(insert(models.Answer.__table__), [
+            {
+                "id": index + 1,
+                "question_id": index + 1,
+                "user_id": 1,
+                "audio_file_url": f"https://bucket.s3.amazonaws.com/voice_answers/1_{index + 1}.mp3",
+                "text_content": "오늘은 가족과 함께 공원에 산책을 다녀왔습니다. " * 5,
+                "cognitive_score": random.uniform(0, 100),
+                "analysis_details": {
+                    f"feature_{key}": {"value": random.random(), "percentile": random.randint(0, 100)}
+                    for key in range(detail_keys)
+                },
+                "semantic_score": random.uniform(0, 100),
+                "created_at": started_at + datetime.timedelta(days=index, minutes=index),
+            }
+            for index in range(rows)
+        ])
+
+def legacy_listing(engine, adapter: TypeAdapter) -> bytes:
+    # 변경 전 경로: ORM 객체 → dict 복사 → schemas.Answer → response_model 검증 → 표준 json 직렬화
+    with Session(engine) as db:
+        query = select(models.Answer, models.Question.content.label("question_content")) \
+            .join(models.Question, models.Answer.question_id == models.Question.id)
+        answers: List[schemas.Answer] = []
+        for answer, question_content in db.execute(query).all():
+            answer_dict = answer.__dict__.copy()
+            answer_dict["question_content"] = question_content
+            answers.append(schemas.Answer(**answer_dict))
+        # FastAPI serialize_response와 같은 순서: dump → 검증 → json 모드 dump → JSONResponse.render
+        validated = adapter.validate_python([answer.model_dump() for answer in answers])
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def fast_listing(engine) -> bytes:
+    # 변경 후 경로: 컬럼 조회 → dict → orjson (ORJSONResponse.render와 같은 옵션)
+    with Session(engine) as db:
+        query = select(*crud_service.ANSWER_LISTING_COLUMNS, models.Question.content.label("question_content")) \
+            .join(models.Question, models.Answer.question_id == models.Question.id)
+        rows = crud_service.rows_to_dicts(db.execute(query))
+        return orjson.dumps(rows, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def measure(func, repeat: int, rows: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        timings.append(time.perf_counter() - started)
+    mean = statistics.mean(timings)
+    return {
+        "mean_ms": round(mean * 1000, 2),
+        "per_row_us": round(mean / rows * 1_000_000, 2),
+        "body_bytes": len(body),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="답변 목록 행당 직렬화 비용 비교 (ORM + 재검증 vs 컬럼 조회 + orjson)")
+    parser.add_argument("--rows", type=int, default=1000, help="응답 한 번의 행 수")
+    parser.add_argument("--detail-keys", type=int, default=50, help="analysis_details JSON의 항목 수")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    seed(engine, args.rows, args.detail_keys)
+    adapter = TypeAdapter(List[schemas.Answer])
+
+    # 두 경로가 같은 내용을 반환하는지 확인
+    assert json.loads(legacy_listing(engine, adapter)) == json.loads(fast_listing(engine))
+    legacy_listing(engine, adapter)
+    fast_listing(engine)
+
+    legacy = measure(lambda: legacy_listing(engine, adapter), args.repeat, args.rows)
+    fast = measure(lambda: fast_listing(engine), args.repeat, args.rows)
+    print(f"rows: {args.rows}, analysis_details keys: {args.detail_keys}")
+    print(f"before (ORM + re-validation + json): {legacy}")
+    print(f"after  (columns + orjson)          : {fast}")
+    print(f"speedup (per row): {legacy['per_row_us'] / fast['per_row_us']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+질문별 최신 답변 조회(GET /questions/answers) 벤치마크.
+
+기존 GROUP BY max(created_at) + 타임스탬프 조인 쿼리(복합 인덱스 없음)와
+DISTINCT ON + ix_answers_user_question_created_at 쿼리를 같은 시드 데이터에서 비교합니다.
+데이터는 별도 스키마에 생성하고 종료 시 삭제하므로 운영 테이블에는 영향이 없습니다.
+
+사용법:
+    DATABASE_URL=postgresql://... python -m benchmarks.answers_latest_per_question \\
+        --users 200 --questions-per-user 365 --answers-per-question 3
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.config.config import Config
+from app.core import crud_service
+from app.utils.db import Base
+
+SCHEMA = "bench_answers_latest"
+NEW_INDEXES = ("ix_answers_user_question_created_at", "ix_answers_question_id")
+
+def legacy_get_answers_by_user(db: Session, user_id: int):
+    # 변경 전 구현: question_id별 max(created_at) 서브쿼리를 타임스탬프 동등 조건으로 다시 조인
+    subquery = db.query(
+        models.Answer.question_id,
+        func.max(models.Answer.created_at).label("max_created_at")
+    ).filter(models.Answer.user_id == user_id).group_by(models.Answer.question_id).subquery()
+    query = db.query(models.Answer, models.Question.content.label("question_content")) \
+        .join(subquery,
+              (models.Answer.question_id == subquery.c.question_id) &
+              (models.Answer.created_at == subquery.c.max_created_at)) \
+        .join(models.Question, models.Answer.question_id == models.Question.id)
+    answers = []
+    for answer, question_content in query.all():
+        answer_dict = answer.__dict__.copy()
+        answer_dict["question_content"] = question_content
+        answers.append(schemas.Answer(**answer_dict))
+    return answers
+
+def seed(engine, users: int, questions_per_user: int, answers_per_question: int):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO questions (content, user_id, daily_date, created_at) "
+            "SELECT 'benchmark question ' || u || '-' || d, u, DATE '2024-01-01' + d, TIMESTAMP '2024-01-01' + d * INTERVAL '1 day' "
+            "FROM generate_series(1, :users) AS u, generate_series(0, :days - 1) AS d"
+        ), {"users": users, "days": questions_per_user})
+        # 질문 10개 중 1개는 마지막 두 답변의 created_at이 같도록 만들어 동일 시각 처리도 비교
+        conn.execute(text(
+            "INSERT INTO answers (question_id, user_id, audio_file_url, text_content, cognitive_score, semantic_score, created_at) "
+            "SELECT q.id, q.user_id, 's3://benchmark/' || q.id || '-' || a || '.mp3', 'benchmark answer', 50, 50, "
+            "       q.created_at + (CASE WHEN q.id % 10 = 0 THEN LEAST(a, :answers - 1) ELSE a END) * INTERVAL '1 minute' "
+            "FROM questions q, generate_series(1, :answers) AS a"
+        ), {"answers": answers_per_question})
+        conn.execute(text("ANALYZE questions"))
+        conn.execute(text("ANALYZE answers"))
+
+def measure(engine, func, user_ids, repeat: int):
+    timings = []
+    result_sizes = []
+    with Session(engine) as db:
+        for _ in range(repeat):
+            for user_id in user_ids:
+                started = time.perf_counter()
+                rows = func(db, user_id)
+                timings.append((time.perf_counter() - started) * 1000)
+                result_sizes.append(len(rows))
+                db.expunge_all()
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        "rows_per_user": round(statistics.mean(result_sizes), 1),
+    }
+
+def explain(engine, user_id: int, new: bool) -> str:
+    with Session(engine) as db:
+        if new:
+            query = crud_service.build_latest_answers_query(user_id)
+            compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+        else:
+            compiled = text(
+                "SELECT answers.* FROM answers JOIN (SELECT question_id, max(created_at) AS max_created_at FROM answers "
+                f"WHERE user_id = {user_id} GROUP BY question_id) AS latest "
+                "ON answers.question_id = latest.question_id AND answers.created_at = latest.max_created_at "
+                "JOIN questions ON answers.question_id = questions.id"
+            )
+        rows = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}")).all()
+        return "\n".join(row[0] for row in rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="질문별 최신 답변 쿼리 벤치마크 (GROUP BY 조인 vs DISTINCT ON)")
+    parser.add_argument("--database-url", default=Config.DATABASE_URL)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--questions-per-user", type=int, default=365)
+    parser.add_argument("--answers-per-question", type=int, default=3)
+    parser.add_argument("--sample-users", type=int, default=20, help="측정할 사용자 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--explain", action="store_true", help="두 쿼리의 실행 계획 출력")
+    parser.add_argument("--keep", action="store_true", help="벤치마크 스키마를 삭제하지 않음")
+    args = parser.parse_args()
+
+    admin_engine = create_engine(args.database_url)
+    with admin_engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(args.database_url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    try:
+        Base.metadata.create_all(bind=engine, tables=[models.Question.__table__, models.Answer.__table__])
+        started = time.perf_counter()
+        seed(engine, args.users, args.questions_per_user, args.answers_per_question)
+        total_answers = args.users * args.questions_per_user * args.answers_per_question
+        print(f"Seeded {total_answers} answers in {time.perf_counter() - started:.1f}s")
+
+        step = max(args.users // args.sample_users, 1)
+        user_ids = list(range(1, args.users + 1, step))[:args.sample_users]
+        new_indexes = [index for index in models.Answer.__table__.indexes if index.name in NEW_INDEXES]
+
+        # 변경 전: 복합 인덱스 없이 GROUP BY 조인
+        for index in new_indexes:
+            index.drop(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE answers"))
+        legacy = measure(engine, legacy_get_answers_by_user, user_ids, args.repeat)
+        if args.explain:
+            print(explain(engine, user_ids[0], new=False))
+
+        # 변경 후: 복합 인덱스 + DISTINCT ON
+        for index in new_indexes:
+            index.create(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE answers"))
+        current = measure(engine, crud_service.get_answers_by_user, user_ids, args.repeat)
+        if args.explain:
+            print(explain(engine, user_ids[0], new=True))
+
+        print(f"questions per user: {args.questions_per_user} (ties every 10th question)")
+        print(f"legacy  GROUP BY join : {legacy}")
+        print(f"current DISTINCT ON   : {current}")
+        print(f"speedup (mean): {legacy['mean_ms'] / current['mean_ms']:.1f}x")
+    finally:
+        engine.dispose()
+        if not args.keep:
+            with admin_engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin_engine.dispose()
+
+if __name__ == "__main__":
+    main()
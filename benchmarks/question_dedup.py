@@ -0,0 +1,83 @@
+"""
+비슷한 질문 검사(VectorIndex.nearest) 지연 시간 벤치마크.
+
+인덱스 없이: 검사할 때마다 저장된 임베딩 바이트를 복원/정규화한 뒤 비교 (DB 조회 시간 제외)
+인덱스 사용: 정규화된 float32 링 버퍼에 대한 행렬-벡터 곱 한 번
+
+--sizes의 저장 질문 수마다 추가 처리량, 검사 지연 시간(p50/p99), 인덱스 메모리를 측정합니다.
+사용자별 인덱스는 QUESTION_DEDUP_WINDOW(기본 365)개 수준이고, 10k/1M은 전체 사용자를 한 인덱스에 둘 때의 상한입니다.
+DATABASE_URL은 앱 모듈 임포트에만 쓰이며 접속하지 않습니다.
+
+사용법:
+    python -m benchmarks.question_dedup --sizes 365 10000 1000000 --dimensions 1024 --truncate 256
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.functions import normalize_rows, pack_embeddings, unpack_embeddings
+from app.utils.vector_index import VectorIndex
+
+ADD_BATCH_SIZE = 10000
+
+def make_vectors(count: int, dimensions: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(count, dimensions)).astype(np.float32)
+
+def latency(func, queries: np.ndarray) -> dict:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return {
+        "p50_us": round(timings[len(timings) // 2], 1),
+        "p99_us": round(timings[int(len(timings) * 0.99) - 1], 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="질문 중복 검사 벡터 인덱스 지연 시간 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[365, 10000, 1000000], help="인덱스에 저장할 질문 수")
+    parser.add_argument("--dimensions", type=int, default=1024, help="저장된 임베딩 차원")
+    parser.add_argument("--truncate", type=int, default=256, help="인덱스에 사용할 앞쪽 차원 수 (Matryoshka)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--baseline-max-size", type=int, default=10000, help="인덱스 없는 방식은 이 크기까지만 측정")
+    args = parser.parse_args()
+
+    queries = make_vectors(args.queries, args.dimensions, seed=1)
+    print(f"dimensions: {args.dimensions} (index uses {args.truncate}), queries: {args.queries}")
+    for size in args.sizes:
+        index = VectorIndex(capacity=size, dimensions=args.truncate)
+        added = 0
+        add_seconds = 0.0
+        for start in range(0, size, ADD_BATCH_SIZE):
+            batch = make_vectors(min(ADD_BATCH_SIZE, size - start), args.dimensions, seed=start)
+            started = time.perf_counter()
+            index.add_many(range(start, start + len(batch)), batch)
+            add_seconds += time.perf_counter() - started
+            added += len(batch)
+        # 가득 찬 상태에서 가장 오래된 항목을 덮어쓰는 추가(eviction) 비용
+        started = time.perf_counter()
+        for offset, vector in enumerate(queries[:100]):
+            index.add(size + offset, vector)
+        evict_us = (time.perf_counter() - started) / 100 * 1_000_000
+
+        result = {
+            "adds_per_s": round(added / add_seconds),
+            "add_with_eviction_us": round(evict_us, 1),
+            "index_mb": round(index._vectors.nbytes / 1024 / 1024, 1),
+            "nearest": latency(index.nearest, queries),
+        }
+
+        if size <= args.baseline_max_size:
+            stored = [pack_embeddings(vector) for vector in make_vectors(size, args.dimensions, seed=size)]
+            def without_index(query):
+                matrix = normalize_rows(np.stack([unpack_embeddings(data, args.dimensions)[0] for data in stored]), args.truncate)
+                return float(np.max(matrix @ normalize_rows(query, args.truncate)[0]))
+            result["without_index"] = latency(without_index, queries[:max(args.queries // 10, 10)])
+
+        print(f"stored questions {size:>9}: {result}")
+
+if __name__ == "__main__":
+    main()
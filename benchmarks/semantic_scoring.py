@@ -0,0 +1,91 @@
+"""
+의미 유사도 채점 처리량 벤치마크.
+
+변경 전: 예상 답변마다 cosine_similarity(파이썬 리스트 → float64 배열 변환, 노름 재계산) 루프 + sort + sigmoid_mapping
+변경 후: 정규화된 float32 행렬에 대한 SemanticScorer 행렬 곱 (답변 1건씩 / 여러 답변 일괄 / Matryoshka 축소 차원)
+
+두 방식의 점수가 같은지도 함께 확인합니다. DATABASE_URL은 앱 모듈 임포트에만 쓰이며 접속하지 않습니다.
+
+사용법:
+    python -m benchmarks.semantic_scoring --answers 2000 --expected 10 --dimensions 1024 --truncate 256
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.functions import SemanticScorer, cosine_similarity, sigmoid_mapping
+
+def legacy_score(user_answer_embedding, question_embedding, expected_answer_embeddings):
+    # 변경 전 question_helper.compute_semantic_score의 계산부
+    relevance_similarity = cosine_similarity(user_answer_embedding, question_embedding)
+    if relevance_similarity < 0.2:
+        return 0.0
+    similarities = []
+    for expected_ans_embedding in expected_answer_embeddings:
+        similarities.append(cosine_similarity(user_answer_embedding, expected_ans_embedding))
+    if not similarities:
+        return None
+    similarities.sort(reverse=True)
+    top_n_similarities = similarities[:3]
+    average_similarity = sum(top_n_similarities) / len(top_n_similarities)
+    semantic_score = round((average_similarity + 1) / 2 * 100, 2)
+    return round(sigmoid_mapping(semantic_score, k=0.1, x0=50.0), 2)
+
+def make_dataset(answers: int, expected: int, dimensions: int, seed: int = 0):
+    # 질문 주제 벡터 주변에 예상 답변/사용자 답변을 흩뿌린 합성 데이터 (관련성 게이트를 대부분 통과)
+    rng = np.random.default_rng(seed)
+    topic = rng.normal(size=dimensions)
+    question = (topic + rng.normal(size=dimensions) * 0.8).astype(np.float32)
+    expected_matrix = (topic + rng.normal(size=(expected, dimensions))).astype(np.float32)
+    answer_matrix = (topic + rng.normal(size=(answers, dimensions)) * rng.uniform(0.5, 3.0, size=(answers, 1))).astype(np.float32)
+    return question, expected_matrix, answer_matrix
+
+def rate(count: int, elapsed: float) -> dict:
+    return {"total_ms": round(elapsed * 1000, 2), "answers_per_s": round(count / elapsed), "per_answer_us": round(elapsed / count * 1_000_000, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description="의미 점수 계산 처리량 비교 (파이썬 루프 vs 행렬 곱)")
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--expected", type=int, default=10, help="질문당 예상 답변 수")
+    parser.add_argument("--dimensions", type=int, default=1024)
+    parser.add_argument("--truncate", type=int, default=256, help="Matryoshka 축소 차원")
+    args = parser.parse_args()
+
+    question, expected_matrix, answer_matrix = make_dataset(args.answers, args.expected, args.dimensions)
+    # 변경 전에는 사용자 답변 임베딩이 API 응답의 파이썬 리스트였음
+    answer_lists = [answer.astype(np.float64).tolist() for answer in answer_matrix]
+
+    started = time.perf_counter()
+    legacy = [legacy_score(answer, question, expected_matrix) for answer in answer_lists]
+    legacy_rate = rate(args.answers, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    single = [SemanticScorer(question, expected_matrix).score(answer) for answer in answer_lists] # 요청당 1건 (계산기 생성 포함)
+    single_rate = rate(args.answers, time.perf_counter() - started)
+
+    scorer = SemanticScorer(question, expected_matrix)
+    started = time.perf_counter()
+    batch = scorer.score_many(answer_matrix).scores
+    batch_rate = rate(args.answers, time.perf_counter() - started)
+
+    truncated_scorer = SemanticScorer(question, expected_matrix, dimensions=args.truncate)
+    started = time.perf_counter()
+    truncated = truncated_scorer.score_many(answer_matrix).scores
+    truncated_rate = rate(args.answers, time.perf_counter() - started)
+
+    legacy_array = np.array(legacy, dtype=np.float64)
+    max_diff = float(np.max(np.abs(legacy_array - np.array(single, dtype=np.float64))))
+    batch_diff = float(np.max(np.abs(legacy_array - batch)))
+    truncated_diff = float(np.mean(np.abs(legacy_array - truncated)))
+
+    print(f"answers: {args.answers}, expected answers: {args.expected}, dimensions: {args.dimensions}")
+    print(f"before (python loop)               : {legacy_rate}")
+    print(f"after, one answer per call         : {single_rate}")
+    print(f"after, batched score_many          : {batch_rate}")
+    print(f"after, batched @ {args.truncate} dims          : {truncated_rate}")
+    print(f"max |score diff| vs before: single {max_diff}, batched {batch_diff}")
+    print(f"mean |score diff| after truncation to {args.truncate} dims: {truncated_diff:.3f}")
+
+if __name__ == "__main__":
+    main()
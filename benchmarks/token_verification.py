@@ -0,0 +1,65 @@
+"""
+요청당 인증(JWT 검증) 오버헤드 벤치마크.
+
+변경 전: 매 요청 SECRET_KEY를 인코딩하고 PyJWT로 HMAC 서명/클레임을 검증
+변경 후: sha256(토큰) 기반 검증 결과 캐시 적중 시 서명 검증 생략 (decode_access_token)
+
+적은 수의 토큰이 반복해서 들어오는 실제 트래픽처럼 --tokens 개의 토큰을 순환하며 측정합니다.
+DATABASE_URL은 앱 모듈 임포트에만 쓰이며 접속하지 않습니다. SECRET_KEY가 없으면 벤치마크용 키를 사용합니다.
+
+사용법:
+    python -m benchmarks.token_verification --tokens 100 --requests 200000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import jwt
+
+from app.utils import security
+
+def legacy_decode(token: str) -> dict:
+    # 변경 전 구현과 같은 호출 (요청마다 키 인코딩 + 서명 검증)
+    return jwt.decode(token, security.SECRET_KEY.encode("utf-8"), algorithms=[security.ALGORITHM])
+
+def measure(func, tokens, requests: int) -> dict:
+    started = time.perf_counter()
+    for index in range(requests):
+        func(tokens[index % len(tokens)])
+    elapsed = time.perf_counter() - started
+    return {
+        "total_s": round(elapsed, 3),
+        "per_request_us": round(elapsed / requests * 1_000_000, 2),
+        "requests_per_s": round(requests / elapsed),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT 검증 캐시 전후 요청당 인증 오버헤드 비교")
+    parser.add_argument("--tokens", type=int, default=100, help="순환할 서로 다른 토큰 수")
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+
+    tokens = [security.create_access_token({"sub": str(user_id)}) for user_id in range(1, args.tokens + 1)]
+
+    legacy = measure(legacy_decode, tokens, args.requests)
+
+    security.clear_token_cache()
+    cold = measure(security.decode_access_token, tokens, len(tokens)) # 최초 요청: 검증 + 캐시 저장
+    cached = measure(security.decode_access_token, tokens, args.requests)
+
+    security.set_token_revocation_hook(lambda claims: False)
+    with_hook = measure(security.decode_access_token, tokens, args.requests)
+    security.set_token_revocation_hook(None)
+
+    print(f"distinct tokens: {args.tokens}, requests: {args.requests}")
+    print(f"before (PyJWT verify every request): {legacy}")
+    print(f"after, first request per token     : {cold}")
+    print(f"after, cached                      : {cached}")
+    print(f"after, cached + revocation hook    : {with_hook}")
+    print(f"speedup (cached): {legacy['per_request_us'] / cached['per_request_us']:.1f}x")
+    print(f"cache stats: {security.token_cache_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+-- 질문/예상 답변 임베딩을 질문 생성 시점에 저장하기 위한 컬럼 추가
+-- 기존 행은 python -m app.jobs.backfill_question_embeddings 로 백필합니다.
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS content_embedding BYTEA;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS expected_answer_embeddings BYTEA;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS embedding_dimensions INTEGER;
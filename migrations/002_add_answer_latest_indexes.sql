@@ -0,0 +1,5 @@
+-- 사용자별 질문별 최신 답변 조회(DISTINCT ON)용 복합 인덱스와 answers.question_id 인덱스 추가
+-- CONCURRENTLY는 트랜잭션 안에서 실행할 수 없으므로 psql에서 문장 단위(autocommit)로 실행합니다.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_answers_user_question_created_at
+    ON answers (user_id, question_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_answers_question_id ON answers (question_id);
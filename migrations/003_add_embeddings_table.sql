@@ -0,0 +1,10 @@
+-- 임베딩 API 결과를 (텍스트 해시, 모델, 차원) 기준으로 재사용하기 위한 저장소 테이블
+CREATE TABLE IF NOT EXISTS embeddings (
+    text_hash VARCHAR(64) NOT NULL,
+    model VARCHAR NOT NULL,
+    dimensions INTEGER NOT NULL,
+    dtype VARCHAR NOT NULL,
+    vector BYTEA NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+    PRIMARY KEY (text_hash, model, dimensions)
+);
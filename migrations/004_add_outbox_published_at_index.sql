@@ -0,0 +1,4 @@
+-- 보존 기간이 지난 발행 완료 outbox 이벤트를 삭제할 때 전체 테이블을 읽지 않도록 하는 부분 인덱스
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_outbox_events_published_at
+    ON outbox_events (published_at)
+    WHERE published_at IS NOT NULL;
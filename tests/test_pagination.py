@@ -0,0 +1,45 @@
+import datetime
+
+import pytest
+
+from app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor, optional, paginate
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(datetime.date(2025, 3, 1), 42)
+    assert "=" not in cursor # URL에 그대로 넣을 수 있도록 패딩 제거
+    assert decode_cursor(cursor, datetime.date.fromisoformat, int) == (datetime.date(2025, 3, 1), 42)
+
+def test_datetime_cursor_round_trip():
+    created_at = datetime.datetime(2025, 3, 1, 9, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 7)
+    assert decode_cursor(cursor, datetime.datetime.fromisoformat, int) == (created_at, 7)
+
+def test_optional_parser_keeps_null():
+    # daily_date가 없는 질문 뒤의 커서
+    cursor = encode_cursor(None, 9)
+    assert decode_cursor(cursor, optional(datetime.date.fromisoformat), int) == (None, 9)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, datetime.date.fromisoformat, int)
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    encode_cursor(1), # 값 개수 불일치
+    encode_cursor("2025-13-01", 1), # 날짜 형식 오류
+    encode_cursor("2025-03-01", "abc"), # 숫자 아님
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, datetime.date.fromisoformat, int)
+
+def test_paginate_returns_cursor_of_last_row_when_more_rows():
+    rows = [(datetime.date(2025, 3, day), day) for day in range(1, 5)] # limit + 1개 조회 결과
+    page, next_cursor = paginate(rows, 3, lambda row: row)
+    assert page == rows[:3]
+    assert decode_cursor(next_cursor, datetime.date.fromisoformat, int) == rows[2]
+
+@pytest.mark.parametrize("count", [0, 2, 3])
+def test_paginate_last_page_has_no_cursor(count):
+    rows = list(range(count))
+    page, next_cursor = paginate(rows, 3, lambda row: (row,))
+    assert page == rows
+    assert next_cursor is None
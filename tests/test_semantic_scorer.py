@@ -0,0 +1,91 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.utils.functions import SemanticScorer, cosine_similarity, sigmoid_mapping
+
+def legacy_score(user_answer_embedding, question_embedding, expected_answer_embeddings):
+    # 벡터화 이전 question_helper의 답변별 채점 루프 (기준값)
+    relevance_similarity = cosine_similarity(user_answer_embedding, question_embedding)
+    if relevance_similarity < 0.2:
+        return 0.0
+    similarities = [
+        cosine_similarity(user_answer_embedding, expected_ans_embedding)
+        for expected_ans_embedding in expected_answer_embeddings
+    ]
+    if not similarities:
+        return None
+    similarities.sort(reverse=True)
+    top_n_similarities = similarities[:3]
+    average_similarity = sum(top_n_similarities) / len(top_n_similarities)
+    semantic_score = round((average_similarity + 1) / 2 * 100, 2)
+    return round(sigmoid_mapping(semantic_score, k=0.1, x0=50.0), 2)
+
+def make_dataset(answers: int, expected: int, dimensions: int = 64, seed: int = 0):
+    # 질문 주제 벡터 주변에 예상 답변/사용자 답변을 흩뿌린 합성 데이터 (관련성 게이트 통과/차단이 섞이도록 잡음 크기를 다양하게)
+    rng = np.random.default_rng(seed)
+    topic = rng.normal(size=dimensions)
+    question = (topic + rng.normal(size=dimensions) * 0.8).astype(np.float32)
+    expected_matrix = (topic + rng.normal(size=(expected, dimensions))).astype(np.float32)
+    answer_matrix = (topic + rng.normal(size=(answers, dimensions)) * rng.uniform(0.5, 8.0, size=(answers, 1))).astype(np.float32)
+    return question, expected_matrix, answer_matrix
+
+def assert_matches_legacy(scorer, question, expected_matrix, answer_matrix):
+    scores = scorer.score_many(answer_matrix).scores
+    for answer, score in zip(answer_matrix, scores):
+        expected = legacy_score(answer.astype(np.float64).tolist(), question, expected_matrix)
+        single = scorer.score(answer)
+        if expected is None:
+            assert math.isnan(score)
+            assert single is None
+        else:
+            # float32 행렬 곱과 float64 루프의 차이는 소수 둘째 자리 반올림 한 단위 이내
+            assert score == pytest.approx(expected, abs=0.011)
+            assert single == pytest.approx(expected, abs=0.011)
+
+@pytest.mark.parametrize("expected_count", [5, 10])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_score_many_matches_legacy_loop(seed, expected_count):
+    question, expected_matrix, answer_matrix = make_dataset(300, expected_count, seed=seed)
+    scorer = SemanticScorer(question, expected_matrix)
+    gated = scorer.score_many(answer_matrix).relevance < 0.2
+    assert gated.any() and not gated.all() # 두 경로를 모두 확인하도록
+    assert_matches_legacy(scorer, question, expected_matrix, answer_matrix)
+
+@pytest.mark.parametrize("expected_count", [1, 2])
+def test_fewer_expected_answers_than_top_k_averages_all(expected_count):
+    question, expected_matrix, answer_matrix = make_dataset(100, expected_count, seed=3)
+    scorer = SemanticScorer(question, expected_matrix)
+    assert scorer.top_k == expected_count
+    assert_matches_legacy(scorer, question, expected_matrix, answer_matrix)
+
+def test_relevance_gate_scores_zero():
+    question = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+    expected_matrix = np.array([[0.0, 1.0, 0.0, 0.0], [0.0, 0.9, 0.1, 0.0]], dtype=np.float32)
+    answer = np.array([0.1, 1.0, 0.0, 0.0], dtype=np.float32) # 예상 답변과는 비슷하지만 질문과의 유사도가 0.2 미만
+    result = SemanticScorer(question, expected_matrix).score_many(answer)
+    assert result.relevance[0] < 0.2
+    assert result.scores[0] == 0.0
+    assert SemanticScorer(question, expected_matrix).score(answer) == 0.0
+    assert legacy_score(answer.tolist(), question, expected_matrix) == 0.0
+
+def test_no_expected_answers_returns_none():
+    question, _, answer_matrix = make_dataset(50, 1, seed=4)
+    scorer = SemanticScorer(question, np.empty((0, len(question)), dtype=np.float32))
+    result = scorer.score_many(answer_matrix)
+    passed = result.relevance >= 0.2
+    assert passed.any()
+    # 관련성 게이트를 통과했지만 비교할 예상 답변이 없으면 NaN (score는 None), 게이트에 걸리면 0
+    assert np.isnan(result.scores[passed]).all()
+    assert (result.scores[~passed] == 0.0).all()
+    for answer, is_passed in zip(answer_matrix, passed):
+        assert scorer.score(answer) == (None if is_passed else 0.0)
+        assert legacy_score(answer.astype(np.float64).tolist(), question, []) == (None if is_passed else 0.0)
+
+def test_packed_expected_answers_are_reshaped():
+    # DB에 저장된 예상 답변 임베딩은 1차원으로 이어 붙인 배열로 복원될 수 있음
+    question, expected_matrix, answer_matrix = make_dataset(20, 4, seed=5)
+    flat = SemanticScorer(question, expected_matrix.reshape(-1)).score_many(answer_matrix).scores
+    matrix = SemanticScorer(question, expected_matrix).score_many(answer_matrix).scores
+    np.testing.assert_array_equal(flat, matrix)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from app.utils.vector_index import VectorIndex
+
+def unit(index: int, dimensions: int = 8) -> np.ndarray:
+    vector = np.zeros(dimensions, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+def test_nearest_returns_most_similar_key():
+    index = VectorIndex(capacity=4, dimensions=8)
+    index.add_many([10, 11, 12], [unit(0), unit(1), unit(2)])
+    key, similarity = index.nearest(unit(1) * 3 + unit(2) * 0.1) # 정규화되므로 크기는 무관
+    assert key == 11
+    assert similarity == pytest.approx(3 / np.sqrt(9.01))
+
+def test_empty_index():
+    index = VectorIndex(capacity=2, dimensions=8)
+    assert len(index) == 0
+    assert index.search(unit(0)) == []
+    assert index.nearest(unit(0)) == (None, -1.0)
+
+def test_full_index_evicts_oldest_first():
+    index = VectorIndex(capacity=3, dimensions=8)
+    index.add_many([1, 2, 3], [unit(1), unit(2), unit(3)])
+    index.add(4, unit(4))
+    assert len(index) == 3
+    # 가장 오래된 1이 제거되고 나머지는 유지됨
+    assert index.nearest(unit(1))[0] != 1
+    assert {key for key, _ in index.search(unit(0), k=3)} == {2, 3, 4}
+    index.add_many([5, 6], [unit(5), unit(6)])
+    assert {key for key, _ in index.search(unit(0), k=3)} == {4, 5, 6}
+
+def test_add_many_larger_than_capacity_keeps_latest():
+    index = VectorIndex(capacity=2, dimensions=8)
+    index.add_many([1, 2, 3, 4], [unit(1), unit(2), unit(3), unit(4)])
+    assert {key for key, _ in index.search(unit(0), k=5)} == {3, 4}
+
+def test_remove_excludes_key_and_slot_is_reused():
+    index = VectorIndex(capacity=3, dimensions=8)
+    index.add_many([1, 2, 3], [unit(1), unit(2), unit(3)])
+    assert index.remove(2)
+    assert not index.remove(2)
+    assert len(index) == 2
+    assert index.nearest(unit(2))[0] != 2
+    assert all(key != 2 for key, _ in index.search(unit(2), k=3))
+    # 다음 추가는 가장 오래된 1의 자리에 들어가고, 삭제된 칸은 그 다음 추가 때 채워짐
+    index.add(4, unit(4))
+    assert len(index) == 2
+    assert {key for key, _ in index.search(unit(0), k=3)} == {3, 4}
+    index.add(5, unit(5))
+    assert len(index) == 3
+    assert {key for key, _ in index.search(unit(0), k=3)} == {3, 4, 5}
+
+def test_search_orders_by_similarity_and_limits_k():
+    index = VectorIndex(capacity=4, dimensions=8)
+    index.add_many([1, 2, 3], [unit(0), unit(0) + unit(1), unit(1)])
+    result = index.search(unit(0), k=2)
+    assert [key for key, _ in result] == [1, 2]
+    assert result[0][1] >= result[1][1]
+
+def test_truncates_to_leading_dimensions():
+    # 앞쪽 dimensions 차원만 비교 (Matryoshka 임베딩 축소)
+    index = VectorIndex(capacity=2, dimensions=2)
+    index.add_many([1, 2], [unit(0) + unit(5), unit(1)])
+    key, similarity = index.nearest(unit(0) + unit(6))
+    assert key == 1
+    assert similarity == pytest.approx(1.0)